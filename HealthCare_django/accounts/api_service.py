@@ -1,17 +1,37 @@
 import requests
 import json
 
+from django.conf import settings
+
+from .http_client import get_flask_client
+
+
+def login_headers(client_ip=None):
+    """Headers for a login forwarded to Flask.
+
+    The shared secret tells Flask's throttle the attempt was already
+    counted by ours (accounts/throttling.py), so it is not charged twice.
+    """
+    headers = {}
+    if client_ip:
+        headers['X-Forwarded-For'] = client_ip
+    secret = getattr(settings, 'FLASK_LOGIN_PROXY_SECRET', None)
+    if secret:
+        headers['X-Login-Proxy-Secret'] = secret
+    return headers
+
 class FlaskAPIService:
     """Service to interact with Flask API endpoints"""
     
-    def __init__(self, base_url='http://127.0.0.1:5000/api'):
+    def __init__(self, base_url='http://127.0.0.1:5000/api', client=None):
         self.base_url = base_url
+        self.client = client or get_flask_client()
         
     def register_user(self, user_data):
         """Register a new user via Flask API"""
         url = f"{self.base_url}/register"
         try:
-            response = requests.post(
+            response = self.client.post(
                 url, 
                 json=user_data,
                 headers={'Content-Type': 'application/json'}
@@ -20,14 +40,15 @@ class FlaskAPIService:
         except Exception as e:
             return {'message': f'API Error: {str(e)}'}, 500
             
-    def login_user(self, credentials):
-        """Login user via Flask API"""
+    def login_user(self, credentials, client_ip=None):
+        """Login user via Flask API, which leaves the throttling to us"""
         url = f"{self.base_url}/login"
+        headers = {'Content-Type': 'application/json', **login_headers(client_ip)}
         try:
-            response = requests.post(
+            response = self.client.post(
                 url, 
                 json=credentials,
-                headers={'Content-Type': 'application/json'}
+                headers=headers
             )
             return response.json(), response.status_code
         except Exception as e:
@@ -37,7 +58,7 @@ class FlaskAPIService:
         """Get user profile data"""
         url = f"{self.base_url}/profile"
         try:
-            response = requests.get(
+            response = self.client.get(
                 url,
                 headers={
                     'Content-Type': 'application/json',
@@ -52,7 +73,7 @@ class FlaskAPIService:
         """Get user appointments"""
         url = f"{self.base_url}/appointments"
         try:
-            response = requests.get(
+            response = self.client.get(
                 url,
                 headers={
                     'Content-Type': 'application/json',
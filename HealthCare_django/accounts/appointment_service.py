@@ -5,27 +5,34 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.conf import settings
 
+from .http_client import get_flask_client
+from .middleware import flask_token_required
 from .appointment_service import AppointmentService
 appointment_service = AppointmentService(base_url=settings.FLASK_API_URL)
 
 class AppointmentService:
     """Service to interact with Flask API appointments"""
     
-    def __init__(self, base_url='http://localhost:5000'):
+    def __init__(self, base_url='http://localhost:5000', client=None):
         self.base_url = base_url
+        self.client = client or get_flask_client()
         
-    def get_user_appointments(self, auth_token, email):
+    def get_user_appointments(self, auth_token, email, page_size=100):
         """Get appointments for a specific user"""
         headers = {'Authorization': f'Bearer {auth_token}'}
-        response = requests.get(f"{self.base_url}/api/appointments", headers=headers)
-        
-        if response.status_code == 200:
-            all_appointments = response.json()
-            # Filter appointments for the current user
-            user_appointments = [appt for appt in all_appointments if appt.get('email') == email]
-            return user_appointments, 200
-        else:
-            return [], response.status_code
+        # Flask filters by email server-side; follow cursors until the last page
+        params = {'email': email, 'limit': page_size}
+        user_appointments = []
+        while True:
+            response = self.client.get(f"{self.base_url}/api/appointments", headers=headers, params=params)
+            if response.status_code != 200:
+                return [], response.status_code
+
+            page = response.json()
+            user_appointments.extend(page['appointments'])
+            if not page.get('next_cursor'):
+                return user_appointments, 200
+            params['cursor'] = page['next_cursor']
     
     
 @login_required
@@ -49,6 +56,7 @@ def book_appointment(request):
     return render(request, "appointment_form.html")
 
 @login_required
+@flask_token_required
 def payment(request):
     # Check if appointment data exists in session
     if "appointment_data" not in request.session:
@@ -102,6 +110,7 @@ def payment(request):
     return render(request, "payment.html")
 
 @login_required
+@flask_token_required
 def my_appointments(request):
     auth_token = request.session.get('auth_token')
     email = request.session.get('user_data', {}).get('email')
@@ -114,6 +123,7 @@ def my_appointments(request):
     return render(request, "myappointments.html", {"appointments": appointments})
 
 @login_required
+@flask_token_required
 def cancel_appointment(request, appointment_id):
     if request.method == "POST":
         auth_token = request.session.get('auth_token')
@@ -0,0 +1,163 @@
+import asyncio
+import time
+import weakref
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .api_service import login_headers
+from .http_client import FlaskHTTPClient, LatencyMetrics
+
+try:
+    import httpx
+except ImportError:  # only needed when FLASK_API_ASYNC is enabled
+    httpx = None
+
+
+class AsyncFlaskHTTPClient:
+    """asyncio counterpart of FlaskHTTPClient, built on httpx.AsyncClient.
+
+    httpx clients are tied to the event loop that created them, so one
+    pooled client is kept per running loop: under ASGI that is a single
+    client for the whole process.
+    """
+
+    def __init__(self, pool_size=100, connect_timeout=3.05, read_timeout=10,
+                 retries=3, backoff_factor=0.3):
+        if httpx is None:
+            raise ImproperlyConfigured("FLASK_API_ASYNC requires the 'httpx' package.")
+        self.pool_size = pool_size
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.metrics = LatencyMetrics()
+        self._clients = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            pool_size=getattr(settings, 'FLASK_API_ASYNC_POOL_SIZE', 100),
+            connect_timeout=getattr(settings, 'FLASK_API_CONNECT_TIMEOUT', 3.05),
+            read_timeout=getattr(settings, 'FLASK_API_READ_TIMEOUT', 10),
+            retries=getattr(settings, 'FLASK_API_RETRIES', 3),
+            backoff_factor=getattr(settings, 'FLASK_API_BACKOFF', 0.3),
+        )
+
+    def _client(self):
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            client = httpx.AsyncClient(
+                limits=limits,
+                timeout=self.timeout,
+                # Shared between users, so never keep cookies
+                cookies=httpx.Cookies(CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))),
+            )
+            self._clients[loop] = client
+        return client
+
+    async def request(self, method, url, **kwargs):
+        method = method.upper()
+        attempts = self.retries + 1 if method in FlaskHTTPClient.IDEMPOTENT_METHODS else 1
+        endpoint = f"{method} {urlsplit(url).path}"
+        start = time.perf_counter()
+        ok = False
+        try:
+            for attempt in range(attempts):
+                last_attempt = attempt == attempts - 1
+                try:
+                    response = await self._client().request(method, url, **kwargs)
+                except httpx.TransportError:
+                    if last_attempt:
+                        raise
+                else:
+                    if response.status_code not in (502, 503, 504) or last_attempt:
+                        ok = response.status_code < 500
+                        return response
+                await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+        finally:
+            self.metrics.record(endpoint, time.perf_counter() - start, ok)
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    async def aclose(self):
+        for client in list(self._clients.values()):
+            await client.aclose()
+        self._clients.clear()
+
+
+_client = None
+
+
+def get_async_flask_client():
+    """Return the process-wide AsyncFlaskHTTPClient, creating it on first use"""
+    global _client
+    if _client is None:
+        _client = AsyncFlaskHTTPClient.from_settings()
+    return _client
+
+
+class AsyncFlaskAPIService:
+    """Async mirror of FlaskAPIService for ASGI deployments"""
+
+    def __init__(self, base_url='http://127.0.0.1:5000/api', client=None):
+        self.base_url = base_url
+        self.client = client or get_async_flask_client()
+
+    async def _call(self, method, path, token=None, headers=None, **kwargs):
+        headers = {'Content-Type': 'application/json', **(headers or {})}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        try:
+            response = await self.client.request(method, f"{self.base_url}{path}", headers=headers, **kwargs)
+            return response.json(), response.status_code
+        except Exception as e:
+            return {'message': f'API Error: {str(e)}'}, 500
+
+    async def register_user(self, user_data):
+        """Register a new user via Flask API"""
+        return await self._call('POST', '/register', json=user_data)
+
+    async def login_user(self, credentials, client_ip=None):
+        """Login user via Flask API, which leaves the throttling to us"""
+        headers = login_headers(client_ip)
+        return await self._call('POST', '/login', headers=headers, json=credentials)
+
+    async def get_user_profile(self, token):
+        """Get user profile data"""
+        return await self._call('GET', '/profile', token=token)
+
+    async def get_appointments(self, token):
+        """Get user appointments"""
+        return await self._call('GET', '/appointments', token=token)
+
+
+class AsyncAppointmentService:
+    """Async mirror of AppointmentService for ASGI deployments"""
+
+    def __init__(self, base_url='http://localhost:5000', client=None):
+        self.base_url = base_url
+        self.client = client or get_async_flask_client()
+
+    async def get_user_appointments(self, auth_token, email, page_size=100):
+        """Get appointments for a specific user"""
+        headers = {'Authorization': f'Bearer {auth_token}'}
+        params = {'email': email, 'limit': page_size}
+        user_appointments = []
+        while True:
+            response = await self.client.get(f"{self.base_url}/api/appointments", headers=headers, params=params)
+            if response.status_code != 200:
+                return [], response.status_code
+
+            page = response.json()
+            user_appointments.extend(page['appointments'])
+            if not page.get('next_cursor'):
+                return user_appointments, 200
+            params['cursor'] = page['next_cursor']
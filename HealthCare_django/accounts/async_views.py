@@ -0,0 +1,67 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.views import redirect_to_login
+from django.shortcuts import render
+
+from .async_api_service import AsyncAppointmentService, AsyncFlaskAPIService
+from .middleware import flask_token_required
+from .views import finish_login, finish_signup, throttle_login, validate_signup
+
+# Async counterparts of the Flask-backed views. Only the Flask call is
+# awaited; session, ORM and template work stays sync and runs in a thread.
+async_flask_api = AsyncFlaskAPIService()
+async_appointment_service = AsyncAppointmentService(base_url=settings.FLASK_API_URL)
+
+arender = sync_to_async(render)
+
+
+async def signup(request):
+    if request.method == 'POST':
+        user_data, error = validate_signup(request.POST)
+        if error:
+            messages.error(request, error)
+            return await arender(request, 'signup.html')
+
+        response, status_code = await async_flask_api.register_user(user_data)
+        return await sync_to_async(finish_signup)(request, response, status_code)
+
+    return await arender(request, 'signup.html')
+
+
+async def user_login(request):
+    if request.method == 'POST':
+        email = request.POST.get('email')
+        password = request.POST.get('password')
+
+        throttled = await sync_to_async(throttle_login)(request, email)
+        if throttled:
+            return throttled
+
+        credentials = {
+            "email": email,
+            "password": password
+        }
+
+        response, status_code = await async_flask_api.login_user(credentials, client_ip=request.META.get('REMOTE_ADDR'))
+        return await sync_to_async(finish_login)(request, email, response, status_code)
+
+    return await arender(request, 'login.html')
+
+
+@flask_token_required
+async def my_appointments(request):
+    user = await request.auser()
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+
+    auth_token = await request.session.aget('auth_token')
+    user_data = await request.session.aget('user_data', {})
+    email = (user_data or {}).get('email')
+
+    appointments, status_code = await async_appointment_service.get_user_appointments(auth_token, email)
+
+    if status_code != 200:
+        messages.error(request, "Failed to retrieve your appointments. Please try again later.")
+
+    return await arender(request, "myappointments.html", {"appointments": appointments})
@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+from collections import deque
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyMetrics:
+    """Thread-safe call counts and latency percentiles per endpoint"""
+
+    def __init__(self, sample_size=1000):
+        self.sample_size = sample_size
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, endpoint, elapsed, ok):
+        with self._lock:
+            stats = self._stats.setdefault(endpoint, {
+                'calls': 0,
+                'errors': 0,
+                'total': 0.0,
+                'max': 0.0,
+                'samples': deque(maxlen=self.sample_size),
+            })
+            stats['calls'] += 1
+            stats['errors'] += 0 if ok else 1
+            stats['total'] += elapsed
+            stats['max'] = max(stats['max'], elapsed)
+            stats['samples'].append(elapsed)
+
+    def snapshot(self):
+        """Return {endpoint: stats} with latencies in milliseconds"""
+        with self._lock:
+            result = {}
+            for endpoint, stats in self._stats.items():
+                samples = sorted(stats['samples'])
+                result[endpoint] = {
+                    'calls': stats['calls'],
+                    'errors': stats['errors'],
+                    'avg_ms': stats['total'] / stats['calls'] * 1000,
+                    'p50_ms': percentile(samples, 50) * 1000,
+                    'p95_ms': percentile(samples, 95) * 1000,
+                    'p99_ms': percentile(samples, 99) * 1000,
+                    'max_ms': stats['max'] * 1000,
+                }
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+def percentile(sorted_samples, pct):
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(len(sorted_samples) * pct / 100))
+    return sorted_samples[index]
+
+
+class FlaskHTTPClient:
+    """Pooled keep-alive HTTP client for calls from Django to the Flask API.
+
+    One client is shared by every thread in the process: connections are
+    reused from a bounded urllib3 pool, every call has connect and read
+    timeouts, and idempotent calls are retried with exponential backoff.
+    """
+
+    IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+    def __init__(self, pool_size=10, connect_timeout=3.05, read_timeout=10,
+                 retries=3, backoff_factor=0.3):
+        self.timeout = (connect_timeout, read_timeout)
+        self.metrics = LatencyMetrics()
+
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=self.IDEMPOTENT_METHODS,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # The session is shared between users, so it must never keep cookies
+        self.session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            pool_size=getattr(settings, 'FLASK_API_POOL_SIZE', 10),
+            connect_timeout=getattr(settings, 'FLASK_API_CONNECT_TIMEOUT', 3.05),
+            read_timeout=getattr(settings, 'FLASK_API_READ_TIMEOUT', 10),
+            retries=getattr(settings, 'FLASK_API_RETRIES', 3),
+            backoff_factor=getattr(settings, 'FLASK_API_BACKOFF', 0.3),
+        )
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        endpoint = f"{method.upper()} {urlsplit(url).path}"
+        start = time.perf_counter()
+        ok = False
+        try:
+            response = self.session.request(method, url, **kwargs)
+            ok = response.status_code < 500
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+            self.metrics.record(endpoint, elapsed, ok)
+            logger.debug("%s took %.1f ms", endpoint, elapsed * 1000)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_flask_client():
+    """Return the process-wide FlaskHTTPClient, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = FlaskHTTPClient.from_settings()
+    return _client
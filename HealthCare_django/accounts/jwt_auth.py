@@ -0,0 +1,167 @@
+import threading
+import time
+from collections import OrderedDict
+
+import jwt
+from django.conf import settings
+
+from .http_client import get_flask_client
+
+
+class InvalidFlaskToken(Exception):
+    """The Flask access token is malformed, forged or expired"""
+
+
+class TokenCache:
+    """Bounded LRU of verified tokens, each kept only until it expires"""
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[1] <= time.time():
+                self._entries.pop(token, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, token, claims):
+        with self._lock:
+            self._entries[token] = (claims, claims['exp'])
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class JWKSKeySet:
+    """Flask's published verification keys, cached for cache_seconds.
+
+    An unknown key id triggers an early refresh so key rotation is picked
+    up, but at most once every min_refresh seconds.
+    """
+
+    def __init__(self, url, cache_seconds=300, min_refresh=30, client=None):
+        self.url = url
+        self.cache_seconds = cache_seconds
+        self.min_refresh = min_refresh
+        self.client = client or get_flask_client()
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._fetched_at = 0.0
+
+    def _refresh(self):
+        response = self.client.get(self.url)
+        response.raise_for_status()
+        keys = {}
+        for data in response.json().get('keys', []):
+            key = jwt.PyJWK.from_dict(data)
+            keys[key.key_id] = key
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+    def get_key(self, kid):
+        with self._lock:
+            age = time.monotonic() - self._fetched_at
+            if age > self.cache_seconds or (kid not in self._keys and age > self.min_refresh):
+                try:
+                    self._refresh()
+                except Exception as e:
+                    if not self._keys:
+                        raise InvalidFlaskToken(f"Could not load signing keys: {e}") from e
+            key = self._keys.get(kid)
+            if key is None and kid is None and len(self._keys) == 1:
+                key = next(iter(self._keys.values()))
+            if key is None:
+                raise InvalidFlaskToken(f"Unknown signing key: {kid}")
+            return key.key
+
+
+class FlaskTokenVerifier:
+    """Verify Flask-issued JWTs in-process instead of asking Flask.
+
+    Tokens are checked against the shared secret, a configured public key
+    or the key set published at FLASK_JWKS_URL, and verified tokens are
+    cached until they expire.
+    """
+
+    def __init__(self, algorithms=('HS256',), secret=None, public_key=None,
+                 jwks_url=None, jwks_cache_seconds=300, cache_size=1024, leeway=0):
+        self.algorithms = list(algorithms)
+        self.secret = secret
+        self.public_key = public_key
+        self.key_set = JWKSKeySet(jwks_url, cache_seconds=jwks_cache_seconds) if jwks_url else None
+        self.cache = TokenCache(cache_size)
+        self.leeway = leeway
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            algorithms=getattr(settings, 'FLASK_JWT_ALGORITHMS', ['HS256']),
+            secret=getattr(settings, 'FLASK_JWT_SECRET', None),
+            public_key=getattr(settings, 'FLASK_JWT_PUBLIC_KEY', None),
+            jwks_url=getattr(settings, 'FLASK_JWKS_URL', None),
+            jwks_cache_seconds=getattr(settings, 'FLASK_JWKS_CACHE_SECONDS', 300),
+            cache_size=getattr(settings, 'FLASK_TOKEN_CACHE_SIZE', 1024),
+            leeway=getattr(settings, 'FLASK_JWT_LEEWAY', 0),
+        )
+
+    def _key_for(self, token):
+        header = jwt.get_unverified_header(token)
+        if header.get('alg') not in self.algorithms:
+            raise InvalidFlaskToken(f"Algorithm {header.get('alg')} is not allowed")
+        if header['alg'].startswith('HS'):
+            if not self.secret:
+                raise InvalidFlaskToken("No shared secret configured")
+            return self.secret
+        if self.public_key:
+            return self.public_key
+        if self.key_set:
+            return self.key_set.get_key(header.get('kid'))
+        raise InvalidFlaskToken("No public key or JWKS URL configured")
+
+    def verify(self, token):
+        """Return the token's claims, or raise InvalidFlaskToken"""
+        claims = self.cache.get(token)
+        if claims is not None:
+            return claims
+        try:
+            claims = jwt.decode(
+                token,
+                self._key_for(token),
+                algorithms=self.algorithms,
+                options={'require': ['exp', 'sub']},
+                leeway=self.leeway,
+            )
+        except jwt.PyJWTError as e:
+            raise InvalidFlaskToken(str(e)) from e
+        # Refresh tokens are signed with the same key but only buy new access tokens
+        if claims.get('type') != 'access':
+            raise InvalidFlaskToken(f"Expected an access token, got {claims.get('type')!r}")
+        self.cache.set(token, claims)
+        return claims
+
+
+_verifier = None
+_verifier_lock = threading.Lock()
+
+
+def get_token_verifier():
+    """Return the process-wide FlaskTokenVerifier, creating it on first use"""
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                _verifier = FlaskTokenVerifier.from_settings()
+    return _verifier
@@ -0,0 +1,62 @@
+import time
+
+from django.contrib.sessions.backends.signed_cookies import SessionStore
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.urls import reverse
+
+from accounts.middleware import FlaskAuthMiddleware
+
+
+def legacy_is_exempt(path):
+    """Exemption check as FlaskAuthMiddleware did it before: eight reverse() calls per request"""
+    exempt_urls = [
+        reverse('login'),
+        reverse('logout'),
+        reverse('signup'),
+        reverse('index'),
+        reverse('about'),
+        reverse('contact'),
+        reverse('blog'),
+        reverse('forgot_password'),
+    ]
+    return path in exempt_urls or path.startswith('/static/')
+
+
+class Command(BaseCommand):
+    help = 'Measure the per-request overhead of FlaskAuthMiddleware'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        middleware = FlaskAuthMiddleware(lambda request: None)
+        paths = ['/', '/about/', '/static/css/site.css', '/dashboard/', '/medicine/']
+
+        for label, check in [
+            ('legacy exemption check', legacy_is_exempt),
+            ('precompiled exemption check', middleware.is_exempt),
+        ]:
+            start = time.perf_counter()
+            for i in range(iterations):
+                check(paths[i % len(paths)])
+            self.report(label, time.perf_counter() - start, iterations)
+
+        factory = RequestFactory()
+        requests = []
+        for path in paths:
+            request = factory.get(path)
+            request.session = SessionStore()
+            requests.append(request)
+
+        start = time.perf_counter()
+        for i in range(iterations):
+            middleware.process_view(requests[i % len(requests)], lambda request: None, (), {})
+        self.report('process_view (no token)', time.perf_counter() - start, iterations)
+        self.stdout.write(f"middleware counters: {middleware.stats()}")
+
+    def report(self, label, elapsed, iterations):
+        self.stdout.write(self.style.SUCCESS(
+            f"{label:<30} {elapsed / iterations * 1e6:8.2f} us/request"
+        ))
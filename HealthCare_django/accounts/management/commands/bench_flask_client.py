@@ -0,0 +1,78 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from django.core.management.base import BaseCommand
+
+from accounts.http_client import FlaskHTTPClient, percentile
+
+
+class StubFlaskHandler(BaseHTTPRequestHandler):
+    """Answers every request like Flask's /api/appointments would"""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    body = json.dumps({'appointments': [], 'next_cursor': None}).encode()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Compare the pooled Flask API client with one connection per request against a local stub server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--pool-size', type=int, default=8)
+
+    def handle(self, *args, **options):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StubFlaskHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/api/appointments"
+
+        client = FlaskHTTPClient(pool_size=options['pool_size'])
+        try:
+            for label, call in [
+                ('per-request connection', lambda: requests.get(url)),
+                ('pooled client', lambda: client.get(url)),
+            ]:
+                self.run_case(label, call, options['requests'], options['threads'])
+        finally:
+            client.close()
+            server.shutdown()
+
+        for endpoint, stats in client.metrics.snapshot().items():
+            self.stdout.write(
+                f"client metrics {endpoint}: {stats['calls']} calls, "
+                f"p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms"
+            )
+
+    def run_case(self, label, call, total, threads):
+        def timed(_):
+            start = time.perf_counter()
+            call().json()
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            latencies = sorted(executor.map(timed, range(total)))
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{label:<24} {total / elapsed:8.0f} req/s  "
+            f"p50 {percentile(latencies, 50) * 1000:6.2f} ms  "
+            f"p95 {percentile(latencies, 95) * 1000:6.2f} ms  "
+            f"p99 {percentile(latencies, 99) * 1000:6.2f} ms"
+        ))
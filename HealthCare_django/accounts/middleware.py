@@ -1,30 +1,93 @@
+import threading
+
+from django.conf import settings
 from django.shortcuts import redirect
 from django.contrib import messages
 from django.urls import reverse
 from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import cached_property
+
+from .jwt_auth import InvalidFlaskToken, get_token_verifier
+
+# Login, logout, signup and public pages
+DEFAULT_EXEMPT_URL_NAMES = [
+    'login',
+    'logout',
+    'signup',
+    'index',
+    'about',
+    'contact',
+    'blog',
+    'forgot_password',
+]
+DEFAULT_EXEMPT_PREFIXES = ['/static/']
+
+
+def flask_token_required(view_func):
+    """Mark a view that calls the Flask API with the session's token.
+
+    FlaskAuthMiddleware sends the user back to the login page when that
+    token is missing or no longer verifies. Other views only get
+    request.flask_claims when the token is valid, so an expired token never
+    ends a Django session that is still good.
+    """
+    view_func.flask_token_required = True
+    return view_func
+
 
 class FlaskAuthMiddleware(MiddlewareMixin):
     """Middleware to check Flask API authentication token"""
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self._stats_lock = threading.Lock()
+        self.exempt_count = 0
+        self.checked_count = 0
+
+    @cached_property
+    def exempt_paths(self):
+        """Exempt URL names resolved to paths once, on the first request"""
+        names = getattr(settings, 'FLASK_AUTH_EXEMPT_URL_NAMES', DEFAULT_EXEMPT_URL_NAMES)
+        return frozenset(reverse(name) for name in names)
+
+    @cached_property
+    def exempt_prefixes(self):
+        return tuple(getattr(settings, 'FLASK_AUTH_EXEMPT_PREFIXES', DEFAULT_EXEMPT_PREFIXES))
+
+    def is_exempt(self, path):
+        return path in self.exempt_paths or path.startswith(self.exempt_prefixes)
+
+    def stats(self):
+        with self._stats_lock:
+            return {'exempt': self.exempt_count, 'checked': self.checked_count}
     
     def process_view(self, request, view_func, view_args, view_kwargs):
-        # Exempt login, logout, signup and public pages
-        exempt_urls = [
-            reverse('login'),
-            reverse('logout'),
-            reverse('signup'),
-            reverse('index'),
-            reverse('about'),
-            reverse('contact'),
-            reverse('blog'),
-            reverse('forgot_password'),
-        ]
-        
-        if request.path in exempt_urls or request.path.startswith('/static/'):
+        if self.is_exempt(request.path):
+            with self._stats_lock:
+                self.exempt_count += 1
             return None
+
+        with self._stats_lock:
+            self.checked_count += 1
             
+        # Verify the Flask token locally; verified tokens are cached until expiry
+        needs_token = getattr(view_func, 'flask_token_required', False)
+        token = request.session.get('auth_token')
+        request.flask_claims = None
+        if token:
+            try:
+                request.flask_claims = get_token_verifier().verify(token)
+            except InvalidFlaskToken:
+                # Only views that pass the token on to Flask need a fresh one
+                if needs_token:
+                    request.session.pop('auth_token', None)
+                    request.session.pop('user_data', None)
+                    messages.error(request, "Your session has expired. Please log in again.")
+                    return redirect('login')
+
         # Check if user has Flask API token
-        if 'auth_token' not in request.session and hasattr(view_func, 'login_required'):
+        if 'auth_token' not in request.session and (needs_token or hasattr(view_func, 'login_required')):
             messages.error(request, "Please log in to access this page.")
             return redirect('login')
             
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,103 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class LoginThrottle:
+    """Per-address and per-email token buckets for login attempts, kept in Django's cache.
+
+    Each bucket holds up to N tokens and refills N per period seconds,
+    with N and period from LOGIN_THROTTLE_PER_IP and
+    LOGIN_THROTTLE_PER_EMAIL. A bucket is stored with a timeout of one
+    period, after which it would be full anyway. An email's token is
+    handed back when its login succeeds, so only failures count against
+    the account. With the default local-memory cache each process keeps
+    its own buckets; a shared cache (CACHE_BACKEND) shares them, though
+    concurrent updates from different processes may let an extra attempt
+    or two through.
+
+    These buckets are the only login limit for users signing in through
+    Django: Flask does not count again a login forwarded with
+    FLASK_LOGIN_PROXY_SECRET, and keeps its own buckets for clients
+    calling its API directly.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {'allowed': 0, 'blocked_ip': 0, 'blocked_email': 0}
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'LOGIN_THROTTLE_CACHE', 'default')]
+
+    @staticmethod
+    def email_key(email):
+        # Emails can hold characters some cache backends reject in keys
+        return 'email:' + hashlib.sha1(email.strip().lower().encode()).hexdigest()
+
+    def _take(self, key, capacity, period, now):
+        """Take a token; return 0 if one was available, else seconds until one is"""
+        key = f'login-throttle:{key}'
+        rate = capacity / period
+        with self._lock:
+            tokens, updated = self.cache.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            wait = 0 if tokens >= 1 else (1 - tokens) / rate
+            if not wait:
+                tokens -= 1
+            self.cache.set(key, (tokens, now), period)
+        return wait
+
+    def _count(self, outcome):
+        with self._lock:
+            self._counts[outcome] += 1
+
+    def check(self, request, email):
+        """Return 0 to let a login attempt through, else the seconds to wait before retrying"""
+        if not getattr(settings, 'LOGIN_THROTTLE_ENABLED', True):
+            return 0
+        now = time.time()
+        wait = self._take(f"ip:{request.META.get('REMOTE_ADDR')}",
+                          *getattr(settings, 'LOGIN_THROTTLE_PER_IP', (30, 60)), now)
+        if wait:
+            self._count('blocked_ip')
+            return wait
+        if email:
+            wait = self._take(self.email_key(email),
+                              *getattr(settings, 'LOGIN_THROTTLE_PER_EMAIL', (10, 900)), now)
+            if wait:
+                self._count('blocked_email')
+                return wait
+        self._count('allowed')
+        return 0
+
+    def succeeded(self, email):
+        if not getattr(settings, 'LOGIN_THROTTLE_ENABLED', True) or not email:
+            return
+        capacity, period = getattr(settings, 'LOGIN_THROTTLE_PER_EMAIL', (10, 900))
+        key = f'login-throttle:{self.email_key(email)}'
+        with self._lock:
+            bucket = self.cache.get(key)
+            if bucket is not None:
+                self.cache.set(key, (min(capacity, bucket[0] + 1), bucket[1]), period)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counts)
+
+
+_throttle = None
+_throttle_lock = threading.Lock()
+
+
+def get_login_throttle():
+    """Return the process-wide LoginThrottle, creating it on first use"""
+    global _throttle
+    if _throttle is None:
+        with _throttle_lock:
+            if _throttle is None:
+                _throttle = LoginThrottle()
+    return _throttle
@@ -1,11 +1,17 @@
+from django.conf import settings
 from django.urls import path
 from django.contrib.auth import views as auth_views
 from . import views
 
+if settings.FLASK_API_ASYNC:
+    from . import async_views as flask_views
+else:
+    flask_views = views
+
 urlpatterns = [
-    path('login/', views.user_login, name='login'),
+    path('login/', flask_views.user_login, name='login'),
     path('logout/', views.logout_view, name='logout'),
-    path('signup/', views.signup, name='signup'),
+    path('signup/', flask_views.signup, name='signup'),
     path('profile/', views.profile, name='profile'),
     path('settings/', views.settings, name='settings'),
 
@@ -8,64 +8,122 @@ from django.contrib.auth import get_user_model
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
 from datetime import datetime
+import math
 import re
 import json
 
 from .forms import ProfileForm, HealthForm
 from .models import Profile
 from .api_service import FlaskAPIService
+from .throttling import get_login_throttle
 
 User = get_user_model()
 flask_api = FlaskAPIService()
 
+def validate_signup(post):
+    """Return (user_data, None) for a valid signup form, else (None, error)"""
+    full_name = post.get('full_name')
+    email = post.get('email')
+    password1 = post.get('password1')
+    password2 = post.get('password2')
+    dob = post.get('dob')
+    gender = post.get('gender') 
+    
+    if not dob:
+        return None, "Date of birth is required."
+    if not gender:
+        return None, "Gender is required."
+
+    try:
+        dob_obj = datetime.strptime(dob, '%Y-%m-%d').date()
+        today = datetime.today().date()
+        age = (today - dob_obj).days // 365
+        if age < 16:
+            return None, "You must be at least 16 years old to sign up."
+    except ValueError:
+        return None, "Invalid date format for DOB."
+
+    if password1 != password2:
+        return None, "Passwords do not match."
+
+    user_data = {
+        "full_name": full_name,
+        "email": email,
+        "password": password1,
+        "dob": dob,
+        "gender": gender  
+    }
+    return user_data, None
+
+
+def finish_signup(request, response, status_code):
+    """Turn the Flask register response into the signup page response"""
+    if status_code == 201:
+        messages.success(request, "Signup successful! Please log in.")
+        return redirect('login')
+    messages.error(request, f"Signup failed: {response.get('message', 'Unknown error')}")
+    return render(request, 'signup.html')
+
+
 def signup(request):
     if request.method == 'POST':
-        full_name = request.POST.get('full_name')
-        email = request.POST.get('email')
-        password1 = request.POST.get('password1')
-        password2 = request.POST.get('password2')
-        dob = request.POST.get('dob')
-        gender = request.POST.get('gender') 
-        
-        if not dob:
-            messages.error(request, "Date of birth is required.")
-            return render(request, 'signup.html')
-        if not gender:
-            messages.error(request, "Gender is required.")
+        user_data, error = validate_signup(request.POST)
+        if error:
+            messages.error(request, error)
             return render(request, 'signup.html')
+        
+        response, status_code = flask_api.register_user(user_data)
+        return finish_signup(request, response, status_code)
+            
+    return render(request, 'signup.html')
+
+
+def throttle_login(request, email):
+    """Return a 429 login page if this attempt is over the limit, else None"""
+    wait = get_login_throttle().check(request, email)
+    if not wait:
+        return None
+    messages.error(request, "Too many login attempts. Please wait a few minutes and try again.")
+    response = render(request, 'login.html', status=429)
+    response['Retry-After'] = str(math.ceil(wait))
+    return response
+
+
+def finish_login(request, email, response, status_code):
+    """Start the Django session for a Flask login response"""
+    if status_code == 200:
+        get_login_throttle().succeeded(email)
+
+        request.session['auth_token'] = response.get('access_token')
+        request.session['user_data'] = response.get('user')
+        
+
+        user_data = response.get('user', {})
+        full_name = user_data.get('full_name', 'Unknown User')
 
         try:
-            dob_obj = datetime.strptime(dob, '%Y-%m-%d').date()
-            today = datetime.today().date()
-            age = (today - dob_obj).days // 365
-            if age < 16:
-                messages.error(request, "You must be at least 16 years old to sign up.")
-                return render(request, 'signup.html')
-        except ValueError:
-            messages.error(request, "Invalid date format for DOB.")
-            return render(request, 'signup.html')
 
-        if password1 != password2:
-            messages.error(request, "Passwords do not match.")
-            return render(request, 'signup.html')
+            user = User.objects.get(email=email)
+        except User.DoesNotExist:
 
-        user_data = {
-            "full_name": full_name,
-            "email": email,
-            "password": password1,
-            "dob": dob,
-            "gender": gender  
-        }
+            try:
+                # Flask checks the password, so the local account gets an
+                # unusable one instead of a second PBKDF2 hash of it
+                user = User.objects.create_user(
+                    email=email,
+                    full_name=full_name
+                )
+            except Exception as e:
+                messages.error(request, f"Error creating user session: {str(e)}")
+                return render(request, 'login.html')
         
-        response, status_code = flask_api.register_user(user_data)
+        login(request, user)
         
-        if status_code == 201:
-            messages.success(request, "Signup successful! Please log in.")
-            return redirect('login')
-        else:
-            messages.error(request, f"Signup failed: {response.get('message', 'Unknown error')}")
-            
-    return render(request, 'signup.html')
+        messages.success(request, f"Welcome back, {full_name}!")
+        return redirect('patient_dashboard') 
+    
+    messages.error(request, f"Login failed: {response.get('message', 'Invalid email or password.')}")
+    return render(request, 'login.html')
 
 
 def user_login(request):
@@ -73,43 +131,17 @@ def user_login(request):
         email = request.POST.get('email')
         password = request.POST.get('password')
 
+        throttled = throttle_login(request, email)
+        if throttled:
+            return throttled
+
         credentials = {
             "email": email,
             "password": password
         }
         
-        response, status_code = flask_api.login_user(credentials)
-        
-        if status_code == 200:
-
-            request.session['auth_token'] = response.get('access_token')
-            request.session['user_data'] = response.get('user')
-            
-
-            user_data = response.get('user', {})
-            full_name = user_data.get('full_name', 'Unknown User')
-
-            try:
-
-                user = User.objects.get(email=email)
-            except User.DoesNotExist:
-
-                try:
-                    user = User.objects.create_user(
-                        email=email,
-                        password=password,
-                        full_name=full_name
-                    )
-                except Exception as e:
-                    messages.error(request, f"Error creating user session: {str(e)}")
-                    return render(request, 'login.html')
-            
-            login(request, user)
-            
-            messages.success(request, f"Welcome back, {full_name}!")
-            return redirect('patient_dashboard') 
-        else:
-            messages.error(request, f"Login failed: {response.get('message', 'Invalid email or password.')}")
+        response, status_code = flask_api.login_user(credentials, client_ip=request.META.get('REMOTE_ADDR'))
+        return finish_login(request, email, response, status_code)
     
     return render(request, 'login.html')
 
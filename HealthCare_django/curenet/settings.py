@@ -19,6 +19,44 @@ ALLOWED_HOSTS = ['*']
 # Flask API configuration
 FLASK_API_URL = 'http://127.0.0.1:5000'  # Change this to your Flask app URL if different
 
+# Pooled HTTP client used for every call to the Flask API (accounts/http_client.py)
+FLASK_API_POOL_SIZE = int(os.environ.get("FLASK_API_POOL_SIZE", 10))
+FLASK_API_CONNECT_TIMEOUT = float(os.environ.get("FLASK_API_CONNECT_TIMEOUT", 3.05))
+FLASK_API_READ_TIMEOUT = float(os.environ.get("FLASK_API_READ_TIMEOUT", 10))
+FLASK_API_RETRIES = int(os.environ.get("FLASK_API_RETRIES", 3))  # idempotent calls only
+FLASK_API_BACKOFF = float(os.environ.get("FLASK_API_BACKOFF", 0.3))
+
+# Serve login/signup from the async views (accounts/async_views.py) when running under ASGI
+FLASK_API_ASYNC = os.environ.get("FLASK_API_ASYNC", "0") == "1"
+FLASK_API_ASYNC_POOL_SIZE = int(os.environ.get("FLASK_API_ASYNC_POOL_SIZE", 100))
+
+# Local verification of Flask-issued JWTs (accounts/jwt_auth.py). HS256 uses the
+# secret shared with Flask; for RS256 set FLASK_JWKS_URL (or a PEM public key).
+FLASK_JWT_ALGORITHMS = os.environ.get("FLASK_JWT_ALGORITHMS", "HS256").split(",")
+FLASK_JWT_SECRET = os.environ.get("JWT_SECRET_KEY", "default_jwt_key")
+FLASK_JWT_PUBLIC_KEY = os.environ.get("FLASK_JWT_PUBLIC_KEY")
+FLASK_JWKS_URL = os.environ.get("FLASK_JWKS_URL")  # e.g. FLASK_API_URL + '/api/jwks'
+FLASK_JWKS_CACHE_SECONDS = 300
+FLASK_TOKEN_CACHE_SIZE = 1024
+
+# Requests FlaskAuthMiddleware lets through without a token check are listed in
+# accounts/middleware.py; set FLASK_AUTH_EXEMPT_URL_NAMES or
+# FLASK_AUTH_EXEMPT_PREFIXES here only to replace those lists.
+
+# Raise instead of logging when a view exceeds its @query_budget (healthcare/query_budget.py).
+# Off here so an overrun never costs a user a 500; the test suite turns it on.
+QUERY_BUDGET_STRICT = False
+
+# Medicine search (healthcare/search.py): 'fts5', 'memory' or 'auto' (FTS5 when available)
+MEDICINE_SEARCH_BACKEND = os.environ.get("MEDICINE_SEARCH_BACKEND", "auto")
+# Most seconds the 'memory' backend of one process may lag edits made in another;
+# needs a cache shared between processes (CACHE_BACKEND), as for autocomplete
+MEDICINE_SEARCH_CHECK_INTERVAL = 2
+
+# Rows per page in the paginated list views (healthcare/pagination.py); ?page_size= overrides up to the max
+LIST_PAGE_SIZE = 25
+LIST_MAX_PAGE_SIZE = 100
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -65,6 +103,31 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'curenet.wsgi.application'
 
+# Cache (per-process local memory by default; point this at Redis or Memcached to share it)
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'curenet'),
+    }
+}
+
+# Seconds the hospital/doctor catalogue stays cached (healthcare/catalog.py). Edits expire it by
+# bumping a version key in the cache, which other processes only see through a shared cache
+# (CACHE_BACKEND), so with the per-process default the catalogue is not cached at all (0)
+CATALOG_CACHE_TIMEOUT = 0 if CACHES['default']['BACKEND'].endswith('.LocMemCache') else 600
+
+# Most seconds a process's autocomplete index (healthcare/autocomplete.py) may lag an
+# edit made in another process; needs a cache shared between processes to work
+AUTOCOMPLETE_CHECK_INTERVAL = 2
+
+# Login attempts allowed as (attempts, seconds), kept in the cache above
+# (accounts/throttling.py); only failed logins count against an email
+LOGIN_THROTTLE_PER_IP = (30, 60)
+LOGIN_THROTTLE_PER_EMAIL = (10, 900)
+# Shared with Flask (LOGIN_PROXY_SECRET there too): logins we forward with it are
+# not counted again by Flask's throttle. Unset, Flask counts them as well.
+FLASK_LOGIN_PROXY_SECRET = os.environ.get("LOGIN_PROXY_SECRET")
+
 # Database
 DATABASES = {
     'default': {
@@ -118,3 +181,9 @@ CRISPY_TEMPLATE_PACK = "bootstrap5"
 AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',
 ]
+
+# Appointment slots: doctors without WorkingHours rows use these
+# (weekday, start, end) blocks, Monday = 0
+DEFAULT_WORKING_HOURS = [(weekday, '09:00', '17:00') for weekday in range(6)]
+DEFAULT_SLOT_MINUTES = 30
+SLOT_SEARCH_DAYS = 30
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     Hospital, Doctor, Appointment, MedicalRecord, AdminUser,
-    Medicine, MedicineOrder
+    Medicine, MedicineOrder, WorkingHours
 )
 
 
@@ -11,11 +11,17 @@ class HospitalAdmin(admin.ModelAdmin):
     search_fields = ('name', 'city', 'state')
 
 
+class WorkingHoursInline(admin.TabularInline):
+    model = WorkingHours
+    extra = 0
+
+
 @admin.register(Doctor)
 class DoctorAdmin(admin.ModelAdmin):
     list_display = ('name', 'specialty', 'experience', 'fees', 'hospital')
     list_filter = ('specialty', 'hospital')
     search_fields = ('name', 'specialty')
+    inlines = [WorkingHoursInline]
 
 
 @admin.register(Appointment)
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class HealthcareConfig(AppConfig):
+    name = 'healthcare'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,175 @@
+import threading
+from bisect import bisect_left, insort
+from urllib.parse import quote
+
+from django.conf import settings
+from django.db import transaction
+from django.urls import reverse
+
+from .models import Doctor, Hospital, Medicine
+from .search import tokenize
+from .versioning import SharedVersion
+
+KINDS = ('medicine', 'doctor', 'hospital')
+
+
+def index_keys(*texts):
+    """Every word-start suffix of each text: 'Apollo Hospitals' -> 'apollo hospitals', 'hospitals'"""
+    keys = set()
+    for text in texts:
+        words = tokenize(text)
+        for start in range(len(words)):
+            keys.add(' '.join(words[start:]))
+    return keys
+
+
+def describe(instance):
+    """(kind, label, detail, searchable texts) for an indexed model instance"""
+    if isinstance(instance, Medicine):
+        return 'medicine', instance.name, '', (instance.name,)
+    if isinstance(instance, Doctor):
+        return 'doctor', instance.name, instance.specialty, (instance.name, instance.specialty)
+    return 'hospital', instance.name, instance.city, (instance.name, instance.city)
+
+
+class PrefixIndex:
+    """Sorted array of (key, kind, id) searched with bisect.
+
+    A query matches any key it is a prefix of, so typing "apo hos" or just
+    "hosp" both find "Apollo Hospitals". Lookups cost one binary search
+    plus a scan that stops after limit results (or max_scan keys when
+    filtering by kind), independent of the catalogue size.
+
+    Each process holds its own copy. A committed write is applied to the
+    writing process's copy, and other processes rebuild theirs within
+    check_interval seconds through a SharedVersion; a per-process cache
+    such as LocMemCache shares nothing, and they only see it after a
+    restart.
+    """
+
+    def __init__(self, max_scan=2000, check_interval=2):
+        self.max_scan = max_scan
+        self.versions = SharedVersion('autocomplete:version', check_interval)
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._entries = []
+        self._items = {}
+
+    def _add(self, kind, pk, label, detail, texts):
+        self._remove(kind, pk)
+        keys = index_keys(*texts)
+        for key in keys:
+            insort(self._entries, (key, kind, pk))
+        self._items[kind, pk] = (label, detail, keys)
+
+    def _remove(self, kind, pk):
+        item = self._items.pop((kind, pk), None)
+        if item is None:
+            return
+        for key in item[2]:
+            position = bisect_left(self._entries, (key, kind, pk))
+            del self._entries[position]
+
+    def _ensure_current(self):
+        if not self._loaded or self.versions.stale():
+            self.rebuild()
+
+    def rebuild(self):
+        with self._lock:
+            self.versions.built()
+            self._entries, self._items = [], {}
+            rows = []
+            for model, fields in [
+                (Medicine, ('id', 'name')),
+                (Doctor, ('id', 'name', 'specialty')),
+                (Hospital, ('id', 'name', 'city')),
+            ]:
+                kind = model.__name__.lower()
+                for pk, label, *detail in model.objects.values_list(*fields).iterator():
+                    texts = (label, *detail)
+                    keys = index_keys(*texts)
+                    rows.extend((key, kind, pk) for key in keys)
+                    self._items[kind, pk] = (label, detail[0] if detail else '', keys)
+            # One sort instead of an insort per key
+            rows.sort()
+            self._entries = rows
+            self._loaded = True
+
+    def invalidate(self):
+        """Drop the index in every process; the next search rebuilds it. Cheaper than per-row updates for bulk writes"""
+        with self._lock:
+            self.versions.bumped()
+            self._entries, self._items = [], {}
+            self._loaded = False
+
+    def update(self, instance):
+        kind, label, detail, texts = describe(instance)
+        pk = instance.pk
+
+        def apply():
+            with self._lock:
+                if self._loaded:
+                    self._add(kind, pk, label, detail, texts)
+                self.versions.bumped()
+        transaction.on_commit(apply)
+
+    def remove(self, instance):
+        kind, pk = describe(instance)[0], instance.pk
+
+        def apply():
+            with self._lock:
+                if self._loaded:
+                    self._remove(kind, pk)
+                self.versions.bumped()
+        transaction.on_commit(apply)
+
+    def search(self, query, limit=10, kinds=KINDS):
+        """Return up to limit (kind, id, label, detail) tuples in key order.
+
+        Keys sort alphabetically, so a whole word ("aspirin") comes before
+        its longer completions ("aspirin 500mg") and the scan can stop as
+        soon as limit results are found.
+        """
+        prefix = ' '.join(tokenize(query))
+        if not prefix:
+            return []
+        results = []
+        seen = set()
+        with self._lock:
+            self._ensure_current()
+            start = bisect_left(self._entries, (prefix,))
+            end = min(start + self.max_scan, len(self._entries))
+            for position in range(start, end):
+                key, kind, pk = self._entries[position]
+                if not key.startswith(prefix):
+                    break
+                if kind not in kinds or (kind, pk) in seen:
+                    continue
+                seen.add((kind, pk))
+                label, detail, _ = self._items[kind, pk]
+                results.append((kind, pk, label, detail))
+                if len(results) == limit:
+                    break
+        return results
+
+
+def result_url(kind, pk, label):
+    if kind == 'medicine':
+        return f"{reverse('medicine_list')}?q={quote(label)}"
+    if kind == 'doctor':
+        return reverse('doctor_profile', args=[pk])
+    return reverse('doctor_list', args=[label])
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_autocomplete_index():
+    """Return the process-wide PrefixIndex, creating it on first use"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = PrefixIndex(check_interval=getattr(settings, 'AUTOCOMPLETE_CHECK_INTERVAL', 2))
+    return _index
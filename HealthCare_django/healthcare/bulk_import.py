@@ -0,0 +1,316 @@
+import csv
+import io
+import json
+import time
+from itertools import islice
+
+from django import forms
+from django.db import transaction
+
+from .autocomplete import get_autocomplete_index
+from .catalog import invalidate_catalog
+from .forms import DoctorForm, HospitalForm, MedicineForm
+from .models import Doctor, Hospital, Medicine
+from .search import get_medicine_search
+
+FORMATS = ('csv', 'ndjson')
+MODES = ('upsert', 'create', 'skip')
+
+
+class ImportFileError(Exception):
+    """The file cannot be imported at all, as opposed to a single bad row.
+
+    Raised from Importer.run, result is what the batches before the error
+    did; their rows stay saved.
+    """
+
+    def __init__(self, message, result=None):
+        super().__init__(message)
+        self.result = result
+
+
+def detect_format(filename, declared=None):
+    """'csv' or 'ndjson', from the declared format or else the file extension"""
+    if declared:
+        return declared
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension == 'csv':
+        return 'csv'
+    if extension in ('ndjson', 'jsonl'):
+        return 'ndjson'
+    raise ImportFileError(f"Cannot tell the format of {filename}; name it .csv or .ndjson")
+
+
+def read_records(stream, file_format):
+    """Yield (line number, record or None, error or None) from a binary stream, one row at a time"""
+    try:
+        yield from _read_records(io.TextIOWrapper(stream, encoding='utf-8-sig', newline=''), file_format)
+    except UnicodeDecodeError:
+        raise ImportFileError("The file is not UTF-8 text")
+
+
+def _read_records(text, file_format):
+    if file_format == 'csv':
+        reader = csv.DictReader(text)
+        if not reader.fieldnames:
+            raise ImportFileError("The CSV file has no header row")
+        for row in reader:
+            if None in row:
+                yield reader.line_num, None, "More values than header columns"
+            else:
+                yield reader.line_num, {key.strip(): (value or '').strip() for key, value in row.items()}, None
+        return
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"Invalid JSON: {e}"
+            continue
+        if isinstance(record, dict):
+            yield line_number, record, None
+        else:
+            yield line_number, None, "Each line must be a JSON object"
+
+
+def form_errors(form):
+    return '; '.join(
+        f"{field}: {' '.join(errors)}" if field != '__all__' else ' '.join(errors)
+        for field, errors in form.errors.items()
+    )
+
+
+class ImportKind:
+    """How rows of one model are validated and matched against existing rows.
+
+    Rows are validated by the model's admin form. key_fields identify a row
+    that is already there, so re-importing a file updates it in place.
+    catalog marks models shown in the cached hospital catalogue.
+    """
+
+    def __init__(self, model, form_class, key_fields, catalog=False):
+        self.model = model
+        self.form_class = form_class
+        self.key_fields = key_fields
+        self.catalog = catalog
+        self.fields = list(form_class._meta.fields)
+
+    def key(self, instance):
+        return tuple(getattr(instance, field) for field in self.key_fields)
+
+    def validate(self, rows):
+        """Yield (line number, unsaved instance or None, error or None) for each (line number, record)"""
+        for line_number, record in rows:
+            form = self.form_class(data=record)
+            if form.is_valid():
+                yield line_number, form.save(commit=False), None
+            else:
+                yield line_number, None, form_errors(form)
+
+    def existing(self, keys):
+        """Rows already stored under keys, as {key: instance}; the oldest wins if several share a key"""
+        first_field = self.key_fields[0]
+        candidates = self.model.objects.filter(
+            **{f'{first_field}__in': {key[0] for key in keys}}
+        ).order_by('pk')
+        found = {}
+        for instance in candidates:
+            key = self.key(instance)
+            if key in keys:
+                found.setdefault(key, instance)
+        return found
+
+    def finish(self):
+        """Bring caches fed by post_save up to date; bulk writes skip the signals"""
+        get_autocomplete_index().invalidate()
+        if self.catalog:
+            invalidate_catalog()
+
+
+class DoctorImportKind(ImportKind):
+    """Doctors name their hospital by id or, when it is unambiguous, by name.
+
+    Hospitals are looked up once per batch rather than through the form's
+    ModelChoiceField, which would query once per row.
+    """
+
+    def __init__(self, model, form_class, key_fields, catalog=False):
+        super().__init__(model, form_class, key_fields, catalog)
+        self.form_class = forms.modelform_factory(
+            model, form=form_class, fields=[field for field in self.fields if field != 'hospital'],
+        )
+
+    def validate(self, rows):
+        rows = list(rows)
+        # Digits are an id, so 7 and 007 name the same hospital; anything else is a name
+        references = [self.reference(record) for _, record in rows]
+        ids = {ref for ref in references if isinstance(ref, int)}
+        names = {ref for ref in references if isinstance(ref, str) and ref}
+        hospitals = {pk: pk for pk in Hospital.objects.filter(pk__in=ids).values_list('pk', flat=True)}
+        ambiguous = set()
+        for pk, name in Hospital.objects.filter(name__in=names).values_list('pk', 'name'):
+            if name in hospitals:
+                ambiguous.add(name)
+            hospitals[name] = pk
+
+        for (line_number, instance, error), reference in zip(super().validate(rows), references):
+            if reference == '':
+                problem = "hospital: This field is required."
+            elif reference in ambiguous:
+                problem = f"hospital: More than one hospital is called {reference}; use its id."
+            elif reference not in hospitals:
+                problem = f"hospital: No hospital {reference}."
+            else:
+                problem = None
+            if error or problem:
+                yield line_number, None, '; '.join(filter(None, [error, problem]))
+            else:
+                instance.hospital_id = hospitals[reference]
+                yield line_number, instance, None
+
+    def reference(self, record):
+        reference = str(record.get('hospital') or '').strip()
+        return int(reference) if reference.isdecimal() else reference
+
+
+class MedicineImportKind(ImportKind):
+    def finish(self):
+        super().finish()
+        get_medicine_search().rebuild()
+
+
+KINDS = {
+    'hospitals': ImportKind(Hospital, HospitalForm, ('name', 'city'), catalog=True),
+    'doctors': DoctorImportKind(Doctor, DoctorForm, ('name', 'hospital_id'), catalog=True),
+    'medicines': MedicineImportKind(Medicine, MedicineForm, ('name',)),
+}
+
+
+class ImportResult:
+    def __init__(self):
+        self.read = 0
+        self.created = 0
+        self.updated = 0
+        self.skipped = 0
+        self.repeated = 0
+        self.invalid = 0
+        self.errors = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self):
+        return self.read / max(self.elapsed, 1e-6)
+
+    def summary(self):
+        return (f"{self.read} rows: {self.created} created, {self.updated} updated, "
+                f"{self.skipped} skipped, {self.repeated} repeated, {self.invalid} invalid "
+                f"in {self.elapsed:.1f}s ({self.rows_per_second:,.0f} rows/s)")
+
+
+class Importer:
+    """Stream records into one model, batch_size rows per transaction.
+
+    mode is 'upsert' (update rows with the same key, create the rest),
+    'create' (always insert) or 'skip' (leave existing rows alone).
+    Invalid rows are counted and the first max_errors kept with their line
+    numbers; the valid rows around them are still imported. progress, if
+    given, is called with the running ImportResult after every batch.
+    """
+
+    def __init__(self, kind, mode='upsert', batch_size=1000, dry_run=False, max_errors=100, progress=None):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.kind = KINDS[kind]
+        self.mode = mode
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.max_errors = max_errors
+        self.progress = progress
+        self.attnames = [self.kind.model._meta.get_field(field).attname for field in self.kind.fields]
+
+    def run(self, records):
+        """Import (line number, record, error) triples as read_records() yields them"""
+        result = ImportResult()
+        records = iter(records)
+        try:
+            while True:
+                batch = list(islice(records, self.batch_size))
+                if not batch:
+                    break
+                self.import_batch(batch, result)
+        except ImportFileError as e:
+            if (result.created or result.updated) and not self.dry_run:
+                raise ImportFileError(
+                    f"{e}; the rows before it were already saved "
+                    f"({result.created} created, {result.updated} updated)", result,
+                ) from e
+            e.result = result
+            raise
+        finally:
+            # Earlier batches are committed even when a later one fails
+            if (result.created or result.updated) and not self.dry_run:
+                self.kind.finish()
+            result.elapsed = time.perf_counter() - result.started
+        return result
+
+    def import_batch(self, batch, result):
+        result.read += len(batch)
+        rows = []
+        rejected = []
+        for line_number, record, error in batch:
+            if error:
+                rejected.append((line_number, error))
+            else:
+                rows.append((line_number, record))
+        instances = []
+        for line_number, instance, error in self.kind.validate(rows):
+            if error:
+                rejected.append((line_number, error))
+            else:
+                instances.append(instance)
+        for line_number, error in sorted(rejected):
+            self.reject(result, line_number, error)
+        if instances:
+            self.write(instances, result)
+        result.elapsed = time.perf_counter() - result.started
+        if self.progress:
+            self.progress(result)
+
+    def reject(self, result, line_number, error):
+        result.invalid += 1
+        if len(result.errors) < self.max_errors:
+            result.errors.append((line_number, error))
+
+    def write(self, instances, result):
+        kind = self.kind
+        if self.mode == 'create':
+            to_create, to_update = instances, []
+        else:
+            # Rows sharing a key in the batch are one write: the last one wins
+            # in upsert mode, the first in skip mode. Each key is counted once
+            # as created, updated or skipped; the other rows count as repeated.
+            latest = {}
+            for instance in instances:
+                key = kind.key(instance)
+                if key not in latest or self.mode == 'upsert':
+                    latest[key] = instance
+            result.repeated += len(instances) - len(latest)
+            existing = kind.existing(set(latest))
+            to_create = [instance for key, instance in latest.items() if key not in existing]
+            to_update = []
+            for key, stored in existing.items():
+                if self.mode == 'skip':
+                    result.skipped += 1
+                    continue
+                for attname in self.attnames:
+                    setattr(stored, attname, getattr(latest[key], attname))
+                to_update.append(stored)
+        if not self.dry_run:
+            with transaction.atomic():
+                kind.model.objects.bulk_create(to_create)
+                if to_update:
+                    kind.model.objects.bulk_update(to_update, kind.fields)
+        result.created += len(to_create)
+        result.updated += len(to_update)
@@ -0,0 +1,75 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Doctor, Hospital
+
+VERSION_KEY = 'catalog:version'
+HOSPITAL_FIELDS = ('id', 'name', 'address', 'city', 'state', 'fees_range')
+DOCTOR_FIELDS = ('id', 'name', 'specialty', 'experience', 'fees')
+
+
+def cache_timeout():
+    """Seconds to keep catalogue entries; 0 turns catalogue caching off"""
+    return getattr(settings, 'CATALOG_CACHE_TIMEOUT', 0)
+
+
+def catalog_version():
+    """Current version of the hospital/doctor catalogue.
+
+    Every cached catalogue entry is stored under this version, so bumping
+    it retires all of them at once without having to find and delete keys.
+    The version lives in the default cache, so an edit is only seen by the
+    processes sharing that cache: with a per-process cache (LocMemCache)
+    other workers would serve the old catalogue until entries time out,
+    which is why settings.py leaves CATALOG_CACHE_TIMEOUT at 0 for it.
+    """
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def invalidate_catalog():
+    # A timestamp rather than incr(): if the version key is ever evicted the
+    # next version still cannot collide with one used by older entries
+    cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def catalog_context():
+    """Template context for {% cache catalog_cache_timeout <name> catalog_version %} fragments"""
+    return {'catalog_version': catalog_version(), 'catalog_cache_timeout': cache_timeout()}
+
+
+def _cached(key, load):
+    timeout = cache_timeout()
+    if not timeout:
+        return load()
+    version = catalog_version()
+    data = cache.get(key, version=version)
+    if data is None:
+        data = load()
+        cache.set(key, data, timeout, version=version)
+    return data
+
+
+def get_hospitals():
+    """Every hospital as a dict, in the order they were added"""
+    return _cached('catalog:hospitals', lambda: list(Hospital.objects.order_by('id').values(*HOSPITAL_FIELDS)))
+
+
+def get_hospital_directory(name):
+    """{'hospital': {...}, 'doctors': [...]} for the hospital called name, or None"""
+    def load():
+        hospital = Hospital.objects.filter(name=name).order_by('id').values(*HOSPITAL_FIELDS).first()
+        if hospital is None:
+            return {}
+        doctors = list(Doctor.objects.filter(hospital_id=hospital['id']).order_by('id').values(*DOCTOR_FIELDS))
+        return {'hospital': hospital, 'doctors': doctors}
+
+    # Hospital names can hold spaces and other characters some cache backends reject in keys
+    digest = hashlib.sha1(name.encode()).hexdigest()
+    return _cached(f'catalog:directory:{digest}', load) or None
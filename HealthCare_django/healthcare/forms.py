@@ -4,6 +4,17 @@ from .models import Appointment, Hospital, Doctor, MedicalRecord,Medicine
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from datetime import datetime, timedelta
+from .slots import SlotEngine
+
+
+def check_doctor_slot(form):
+    """Add an error to the time field if the form's doctor cannot take that slot"""
+    date = form.cleaned_data.get('date')
+    time = form.cleaned_data.get('time')
+    if form.doctor and date and time:
+        problem = SlotEngine(form.doctor).check(date, time, exclude=form.instance.pk)
+        if problem:
+            form.add_error('time', problem)
 
 class AppointmentForm(forms.ModelForm):
     name = forms.CharField(widget=forms.TextInput(attrs={
@@ -28,6 +39,10 @@ class AppointmentForm(forms.ModelForm):
         'rows': 3
     }))
     
+    def __init__(self, *args, doctor=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.doctor = doctor or self.instance.doctor
+    
     class Meta:
         model = Appointment
         fields = ['name', 'phone', 'date', 'time', 'reason']
@@ -44,6 +59,11 @@ class AppointmentForm(forms.ModelForm):
         if not re.match(r'^\d{10}$', phone):
             raise ValidationError("Phone number must be exactly 10 digits.")
         return phone
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        check_doctor_slot(self)
+        return cleaned_data
 
 class RescheduleAppointmentForm(forms.ModelForm):
     name = forms.CharField(widget=forms.TextInput(attrs={
@@ -68,6 +88,10 @@ class RescheduleAppointmentForm(forms.ModelForm):
         'rows': 3
     }))
     
+    def __init__(self, *args, doctor=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.doctor = doctor or self.instance.doctor
+    
     class Meta:
         model = Appointment
         fields = ['name', 'phone', 'date', 'time', 'reason']
@@ -84,6 +108,11 @@ class RescheduleAppointmentForm(forms.ModelForm):
         if not re.match(r'^\d{10}$', phone):
             raise ValidationError("Phone number must be exactly 10 digits.")
         return phone
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        check_doctor_slot(self)
+        return cleaned_data
 
 class PaymentForm(forms.Form):
     PAYMENT_CHOICES = (
@@ -146,6 +175,25 @@ class DoctorForm(forms.ModelForm):
             raise forms.ValidationError("Fees must be greater than zero.")
         return fees
 
+class CatalogImportForm(forms.Form):
+    KIND_CHOICES = (
+        ('hospitals', 'Hospitals'),
+        ('doctors', 'Doctors'),
+        ('medicines', 'Medicines'),
+    )
+    MODE_CHOICES = (
+        ('upsert', 'Update rows that already exist, add the rest'),
+        ('skip', 'Leave existing rows alone, add the rest'),
+        ('create', 'Add every row'),
+    )
+    
+    kind = forms.ChoiceField(choices=KIND_CHOICES, widget=forms.Select(attrs={'class': 'form-control'}))
+    file = forms.FileField(help_text='CSV with a header row, or NDJSON (.ndjson/.jsonl) with one object per line',
+                           widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,.ndjson,.jsonl'}))
+    mode = forms.ChoiceField(choices=MODE_CHOICES, widget=forms.Select(attrs={'class': 'form-control'}))
+    dry_run = forms.BooleanField(required=False, label='Only check the file',
+                                 widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}))
+
 class MedicalRecordForm(forms.ModelForm):
     class Meta:
         model = MedicalRecord
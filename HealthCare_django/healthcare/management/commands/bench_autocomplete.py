@@ -0,0 +1,104 @@
+import random
+import statistics
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from healthcare.autocomplete import get_autocomplete_index
+from healthcare.models import Doctor, Hospital, Medicine
+from healthcare.search import tokenize
+from healthcare.views import autocomplete
+
+User = get_user_model()
+
+SYLLABLES = ['ab', 'ac', 'al', 'am', 'an', 'ce', 'ci', 'co', 'da', 'de', 'do', 'fe', 'ga', 'in',
+             'ka', 'la', 'lo', 'ma', 'mi', 'na', 'ne', 'ol', 'pa', 'pro', 're', 'ri', 'sa', 'ta',
+             'te', 'ti', 'to', 'va', 'xi', 'zo']
+SPECIALTIES = ['Cardiology', 'Dermatology', 'Neurology', 'Orthopedics', 'Pediatrics',
+               'Psychiatry', 'Oncology', 'General Medicine', 'Gynecology', 'ENT']
+CITIES = ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Kolkata', 'Hyderabad', 'Pune', 'Jaipur']
+
+
+class Command(BaseCommand):
+    help = 'Measure autocomplete latency over a large synthetic catalogue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--medicines', type=int, default=20_000)
+        parser.add_argument('--hospitals', type=int, default=1_000)
+        parser.add_argument('--doctors', type=int, default=10_000)
+        parser.add_argument('--queries', type=int, default=20_000)
+        parser.add_argument('--target-ms', type=float, default=2.0, help='p99 budget for the view')
+
+    def handle(self, *args, **options):
+        run_id = uuid.uuid4().hex[:8]
+        rng = random.Random(run_id)
+
+        def word():
+            return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+
+        Medicine.objects.bulk_create([
+            Medicine(name=f'{word()} {rng.choice([100, 250, 500])}mg', description=f'bench-{run_id}',
+                     price=10, stock=100)
+            for _ in range(options['medicines'])
+        ], batch_size=5000)
+        hospitals = Hospital.objects.bulk_create([
+            Hospital(name=f'{word()} {rng.choice(["Hospital", "Clinic", "Medical Centre"])}',
+                     address=f'bench-{run_id}', city=rng.choice(CITIES), state='Bench', fees_range='₹500')
+            for _ in range(options['hospitals'])
+        ], batch_size=5000)
+        Doctor.objects.bulk_create([
+            Doctor(name=f'Dr. {word()} {word()}', specialty=rng.choice(SPECIALTIES), experience=5,
+                   fees=500, hospital=rng.choice(hospitals))
+            for _ in range(options['doctors'])
+        ], batch_size=5000)
+
+        index = get_autocomplete_index()
+        try:
+            started = time.perf_counter()
+            index.rebuild()
+            self.stdout.write(f"built index of {len(index._entries)} keys in {time.perf_counter() - started:.2f}s")
+
+            labels = list(Medicine.objects.values_list('name', flat=True)[:5000])
+            labels += list(Doctor.objects.values_list('name', flat=True)[:5000])
+            labels += list(Hospital.objects.values_list('name', flat=True)[:5000])
+            prefixes = []
+            for _ in range(options['queries']):
+                token = rng.choice(tokenize(rng.choice(labels)))
+                prefixes.append(token[:rng.randint(1, len(token))])
+
+            self.report('PrefixIndex.search', [self.timed(index.search, prefix) for prefix in prefixes])
+
+            factory = RequestFactory()
+            user = User(email='bench@example.com')
+            requests = []
+            for prefix in prefixes:
+                request = factory.get('/api/autocomplete/', {'q': prefix})
+                request.user = user
+                requests.append(request)
+            timings = [self.timed(autocomplete, request) for request in requests]
+            p99 = self.report('autocomplete view', timings)
+
+            if p99 > options['target_ms']:
+                self.stdout.write(self.style.ERROR(f"FAIL: p99 {p99:.3f} ms is over {options['target_ms']} ms"))
+                raise SystemExit(1)
+            self.stdout.write(self.style.SUCCESS(f"OK: p99 {p99:.3f} ms is within {options['target_ms']} ms"))
+        finally:
+            index.invalidate()
+            Hospital.objects.filter(address=f'bench-{run_id}').delete()
+            Medicine.objects.filter(description=f'bench-{run_id}').delete()
+
+    def timed(self, func, arg):
+        start = time.perf_counter()
+        func(arg)
+        return (time.perf_counter() - start) * 1000
+
+    def report(self, label, timings):
+        cuts = statistics.quantiles(timings, n=100)
+        self.stdout.write(
+            f"{label:<20} p50 {cuts[49]:.3f} ms  p95 {cuts[94]:.3f} ms  "
+            f"p99 {cuts[98]:.3f} ms  max {max(timings):.3f} ms"
+        )
+        return cuts[98]
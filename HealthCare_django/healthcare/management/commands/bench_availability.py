@@ -0,0 +1,140 @@
+import random
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from healthcare.models import Appointment, Doctor, Hospital
+from healthcare.query_budget import QueryCounter
+from healthcare.slots import SlotEngine, build_hours, find_available, to_time
+
+User = get_user_model()
+
+SPECIALTIES = ['Cardiology', 'Dermatology', 'Neurology', 'Orthopedics', 'Pediatrics',
+               'Psychiatry', 'Oncology', 'General Medicine', 'Gynecology', 'ENT']
+CITIES = ['Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Kolkata', 'Hyderabad', 'Pune', 'Jaipur']
+
+
+class Command(BaseCommand):
+    help = 'Compare the batched free-slot search with checking doctors one at a time'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--doctors', type=int, default=5_000)
+        parser.add_argument('--hospitals', type=int, default=500)
+        parser.add_argument('--days', type=int, default=365, help='days of appointments to seed')
+        parser.add_argument('--fill', type=float, default=0.8, help='share of tomorrow\'s slots already booked')
+        parser.add_argument('--half-life', type=float, default=14,
+                            help='days over which the booked share halves, as calendars fill up front')
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=5, help='timed runs of each search')
+        parser.add_argument('--keep', action='store_true', help='keep the generated rows afterwards')
+
+    def handle(self, *args, **options):
+        self.run_id = uuid.uuid4().hex[:8]
+        started = time.perf_counter()
+        count = self.seed(options)
+        self.stdout.write(f"seeded {count} appointments in {time.perf_counter() - started:.1f}s")
+
+        try:
+            start_date = timezone.localdate() + timedelta(days=1)
+            doctors = Doctor.objects.filter(hospital__address=f'bench-{self.run_id}')
+            searches = {
+                'first available cardiologist in Mumbai this week': (
+                    doctors.filter(specialty='Cardiology', hospital__city='Mumbai'), 7),
+                'first available doctor anywhere this week': (doctors, 7),
+                'first available neurologist this month': (doctors.filter(specialty='Neurology'), 30),
+            }
+            for label, (candidates, days) in searches.items():
+                self.stdout.write(self.style.MIGRATE_HEADING(label))
+                batched, batched_ms, batched_queries = self.measure(
+                    lambda: find_available(candidates, start_date=start_date, days=days),
+                    options['repeat'],
+                )
+                looped, looped_ms, looped_queries = self.measure(
+                    lambda: self.one_by_one(candidates, start_date, days),
+                    options['repeat'],
+                )
+                if [(doctor.pk, slots) for doctor, slots in batched] != looped:
+                    self.stdout.write(self.style.ERROR('  results differ from the per-doctor search'))
+                    raise SystemExit(1)
+                self.stdout.write(f"  one doctor at a time {looped_ms:9.1f} ms  {looped_queries} queries")
+                self.stdout.write(f"  batched              {batched_ms:9.1f} ms  {batched_queries} queries")
+                self.stdout.write(self.style.SUCCESS(f"  speedup x{looped_ms / max(batched_ms, 1e-6):.1f}"))
+        finally:
+            if not options['keep']:
+                self.cleanup()
+
+    def seed(self, options):
+        rng = random.Random(self.run_id)
+        batch_size = options['batch_size']
+        patient = User(email=f'bench-{self.run_id}-patient@example.com', full_name='Bench Patient')
+        patient.set_unusable_password()
+        patient.save()
+
+        hospitals = Hospital.objects.bulk_create([
+            Hospital(name=f'Bench Hospital {n}', address=f'bench-{self.run_id}', city=rng.choice(CITIES),
+                     state='Bench', fees_range='₹500-₹1500')
+            for n in range(options['hospitals'])
+        ], batch_size=batch_size)
+        doctors = Doctor.objects.bulk_create([
+            Doctor(name=f'Dr. Bench {n}', specialty=rng.choice(SPECIALTIES), experience=rng.randint(1, 30),
+                   fees=rng.choice([300, 500, 800, 1200]), hospital=rng.choice(hospitals))
+            for n in range(options['doctors'])
+        ], batch_size=batch_size)
+
+        # Every bench doctor keeps the default hours, so book a share of those slots
+        hours = build_hours(())
+        start_date = timezone.localdate() + timedelta(days=1)
+        batch, count = [], 0
+        for offset in range(options['days']):
+            day = start_date + timedelta(days=offset)
+            day_slots = [
+                to_time(minutes)
+                for block_start, block_end, slot_minutes in hours.get(day.weekday(), [])
+                for minutes in range(block_start, block_end - slot_minutes + 1, slot_minutes)
+            ]
+            share = options['fill'] * 0.5 ** (offset / options['half_life'])
+            for doctor in doctors:
+                booked = min(round(len(day_slots) * share * rng.uniform(0.5, 1.5)), len(day_slots))
+                for start in rng.sample(day_slots, booked):
+                    batch.append(Appointment(
+                        patient=patient, doctor=doctor, hospital_id=doctor.hospital_id,
+                        name='Bench Patient', phone='9876543210', date=day, time=start, reason='Benchmark',
+                    ))
+                if len(batch) >= batch_size:
+                    Appointment.objects.bulk_create(batch)
+                    count += len(batch)
+                    batch = []
+        Appointment.objects.bulk_create(batch)
+        return count + len(batch)
+
+    def one_by_one(self, doctors, start_date, days, limit=10):
+        """What the search costs without batching: a SlotEngine, and its queries, per doctor"""
+        found = []
+        for doctor in doctors.select_related('hospital'):
+            slots = SlotEngine(doctor).free_slots(count=3, start_date=start_date, days=days)
+            if slots:
+                found.append(((slots[0], doctor.fees, -doctor.experience, doctor.pk), slots))
+        found.sort(key=lambda item: item[0])
+        return [(key[3], slots) for key, slots in found[:limit]]
+
+    def measure(self, search, repeat):
+        timings = []
+        for _ in range(repeat):
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                start = time.perf_counter()
+                result = search()
+                timings.append(time.perf_counter() - start)
+        return result, statistics.median(timings) * 1000, counter.count
+
+    def cleanup(self):
+        # Appointments first, as one DELETE, instead of cascading from each doctor
+        Appointment.objects.filter(patient__email=f'bench-{self.run_id}-patient@example.com').delete()
+        Hospital.objects.filter(address=f'bench-{self.run_id}').delete()
+        User.objects.filter(email=f'bench-{self.run_id}-patient@example.com').delete()
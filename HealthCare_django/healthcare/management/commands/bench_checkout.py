@@ -0,0 +1,82 @@
+import threading
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+
+from healthcare.models import CartItem, Medicine, MedicineOrder
+from healthcare.orders import OutOfStock, checkout_cart
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Hammer one low-stock medicine with concurrent checkouts and check nothing is oversold'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=32)
+        parser.add_argument('--stock', type=int, default=10)
+        parser.add_argument('--quantity', type=int, default=1, help='units in each cart')
+        parser.add_argument('--retries', type=int, default=20,
+                            help='retries when the database is busy (SQLite allows one writer)')
+
+    def handle(self, *args, **options):
+        run_id = uuid.uuid4().hex[:8]
+        medicine = Medicine.objects.create(
+            name=f'bench-{run_id}', description='Checkout benchmark', price=10, stock=options['stock'],
+        )
+        patients = [
+            User.objects.create_user(email=f'bench-{run_id}-{n}@example.com', password=None, full_name='Bench')
+            for n in range(options['threads'])
+        ]
+        CartItem.objects.bulk_create([
+            CartItem(patient=patient, medicine=medicine, quantity=options['quantity'])
+            for patient in patients
+        ])
+
+        outcomes = {'ordered': 0, 'out_of_stock': 0, 'database_busy': 0}
+        lock = threading.Lock()
+        start_gate = threading.Barrier(len(patients))
+
+        def buy(patient):
+            start_gate.wait()
+            try:
+                for attempt in range(options['retries'] + 1):
+                    try:
+                        outcome = 'ordered' if checkout_cart(patient) else 'out_of_stock'
+                        break
+                    except OutOfStock:
+                        outcome = 'out_of_stock'
+                        break
+                    except OperationalError:
+                        outcome = 'database_busy'
+                        time.sleep(0.01 * (attempt + 1))
+            finally:
+                connection.close()
+            with lock:
+                outcomes[outcome] += 1
+
+        threads = [threading.Thread(target=buy, args=(patient,)) for patient in patients]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        try:
+            medicine.refresh_from_db()
+            sold = sum(MedicineOrder.objects.filter(medicine=medicine).values_list('quantity', flat=True))
+            self.stdout.write(
+                f"{len(patients)} checkouts in {elapsed:.2f}s ({len(patients) / elapsed:.0f}/s): {outcomes}"
+            )
+            self.stdout.write(f"stock {options['stock']} -> {medicine.stock}, units sold {sold}")
+            if sold + medicine.stock != options['stock'] or sold > options['stock']:
+                self.stdout.write(self.style.ERROR('FAIL: stock and orders do not add up'))
+                raise SystemExit(1)
+            self.stdout.write(self.style.SUCCESS('OK: no overselling'))
+        finally:
+            User.objects.filter(email__startswith=f'bench-{run_id}-').delete()
+            medicine.delete()
@@ -0,0 +1,198 @@
+import random
+import statistics
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import time as clock, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from healthcare.models import Appointment, CartItem, Doctor, Hospital, Medicine
+
+User = get_user_model()
+
+SLOTS = [clock(hour, minute) for hour in range(9, 18) for minute in (0, 30)]
+
+
+class Command(BaseCommand):
+    help = 'Compare query plans and timings of the hot healthcare queries with and without their indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--appointments', type=int, default=1_000_000)
+        parser.add_argument('--patients', type=int, default=10_000)
+        parser.add_argument('--hospitals', type=int, default=200)
+        parser.add_argument('--medicines', type=int, default=5_000)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--repeat', type=int, default=20, help='timed runs of each query')
+        parser.add_argument('--keep', action='store_true', help='keep the generated rows afterwards')
+
+    def handle(self, *args, **options):
+        self.run_id = uuid.uuid4().hex[:8]
+        self.batch_size = options['batch_size']
+        started = time.perf_counter()
+        self.seed(options)
+        self.stdout.write(f"seeded {options['appointments']} appointments in {time.perf_counter() - started:.1f}s")
+
+        try:
+            queries = self.queries()
+            with connection.schema_editor() as editor:
+                self.drop_indexes(editor)
+            try:
+                before = self.measure(queries, options['repeat'])
+            finally:
+                with connection.schema_editor() as editor:
+                    self.restore_indexes(editor)
+            after = self.measure(queries, options['repeat'])
+
+            for label in queries:
+                self.stdout.write(self.style.MIGRATE_HEADING(label))
+                self.stdout.write(f"  without indexes {before[label]['ms']:9.3f} ms  {before[label]['plan']}")
+                self.stdout.write(f"  with indexes    {after[label]['ms']:9.3f} ms  {after[label]['plan']}")
+                self.stdout.write(self.style.SUCCESS(
+                    f"  speedup x{before[label]['ms'] / max(after[label]['ms'], 1e-6):.1f}"
+                ))
+        finally:
+            if not options['keep']:
+                self.cleanup()
+
+    def seed(self, options):
+        rng = random.Random(self.run_id)
+        today = timezone.now().date()
+
+        hospitals = Hospital.objects.bulk_create([
+            Hospital(name=f'bench-{self.run_id} Hospital {n}', address='1 Bench Road', city='Bench',
+                     state='Bench', fees_range='₹500-₹1500')
+            for n in range(options['hospitals'])
+        ], batch_size=self.batch_size)
+        doctors = Doctor.objects.bulk_create([
+            Doctor(name=f'Dr. Bench {n}', specialty='General', experience=10, fees=500,
+                   hospital=hospitals[n % len(hospitals)])
+            for n in range(options['hospitals'] * 10)
+        ], batch_size=self.batch_size)
+        self.medicines = Medicine.objects.bulk_create([
+            Medicine(name=f'bench-{self.run_id} Medicine {n}', description='Benchmark', price=10, stock=100)
+            for n in range(options['medicines'])
+        ], batch_size=self.batch_size)
+
+        users = []
+        for n in range(options['patients']):
+            user = User(email=f'bench-{self.run_id}-{n}@example.com', full_name='Bench Patient')
+            user.set_unusable_password()
+            users.append(user)
+        User.objects.bulk_create(users, batch_size=self.batch_size)
+        self.patients = list(User.objects.filter(email__startswith=f'bench-{self.run_id}-'))
+
+        CartItem.objects.bulk_create([
+            CartItem(patient=patient, medicine=medicine, quantity=1)
+            for patient in self.patients
+            for medicine in rng.sample(self.medicines, 3)
+        ], batch_size=self.batch_size)
+
+        # Doctors cannot be double-booked, so draw each (doctor, day, slot) at most once
+        booked = set()
+        remaining = options['appointments']
+        while remaining:
+            batch = []
+            while len(batch) < min(remaining, self.batch_size):
+                slot = (rng.randrange(len(doctors)), rng.randint(-365, 365), rng.randrange(len(SLOTS)))
+                if slot in booked:
+                    continue
+                booked.add(slot)
+                doctor = doctors[slot[0]]
+                batch.append(Appointment(
+                    patient=rng.choice(self.patients),
+                    doctor=doctor,
+                    hospital_id=doctor.hospital_id,
+                    name='Bench Patient',
+                    phone='9876543210',
+                    date=today + timedelta(days=slot[1]),
+                    time=SLOTS[slot[2]],
+                    reason='Benchmark',
+                ))
+            Appointment.objects.bulk_create(batch)
+            remaining -= len(batch)
+
+        self.hospitals = hospitals
+
+    def queries(self):
+        today = timezone.now().date()
+        patient = self.patients[len(self.patients) // 2]
+        hospital = self.hospitals[len(self.hospitals) // 2]
+        cart_item = CartItem.objects.filter(patient=patient).first()
+        return {
+            'patient upcoming appointments': lambda: Appointment.objects.filter(
+                patient=patient, date__gte=today).order_by('date', 'time'),
+            'patient past appointments': lambda: Appointment.objects.filter(
+                patient=patient, date__lt=today).order_by('-date', '-time'),
+            'staff upcoming appointments (first page)': lambda: Appointment.objects.filter(
+                date__gte=today).order_by('date', 'time')[:50],
+            'hospital by name': lambda: Hospital.objects.filter(name=hospital.name),
+            'doctors of a hospital': lambda: Doctor.objects.filter(hospital=hospital),
+            'medicine search (icontains)': lambda: Medicine.objects.filter(name__icontains='Medicine 42'),
+            'cart item by patient and medicine': lambda: CartItem.objects.filter(
+                patient=patient, medicine_id=cart_item.medicine_id),
+        }
+
+    def measure(self, queries, repeat):
+        results = {}
+        for label, make_queryset in queries.items():
+            plan = make_queryset().explain()
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                list(make_queryset())
+                timings.append(time.perf_counter() - start)
+            results[label] = {
+                'ms': statistics.median(timings) * 1000,
+                'plan': ' | '.join(line.strip() for line in plan.splitlines()),
+            }
+        return results
+
+    def indexed_fields(self):
+        return [Hospital._meta.get_field('name'), Medicine._meta.get_field('name')]
+
+    def drop_indexes(self, editor):
+        for index in Appointment._meta.indexes:
+            editor.remove_index(Appointment, index)
+        with self.constraints_hidden(CartItem) as constraints:
+            for constraint in constraints:
+                editor.remove_constraint(CartItem, constraint)
+        for field in self.indexed_fields():
+            editor.alter_field(field.model, field, self.without_index(field))
+
+    def restore_indexes(self, editor):
+        for index in Appointment._meta.indexes:
+            editor.add_index(Appointment, index)
+        for constraint in CartItem._meta.constraints:
+            editor.add_constraint(CartItem, constraint)
+        for field in self.indexed_fields():
+            editor.alter_field(field.model, self.without_index(field), field)
+
+    @contextmanager
+    def constraints_hidden(self, model):
+        # SQLite drops constraints by rebuilding the table from the model's
+        # Meta, which would otherwise put the constraint straight back
+        constraints = model._meta.constraints
+        model._meta.constraints = []
+        try:
+            yield constraints
+        finally:
+            model._meta.constraints = constraints
+
+    def without_index(self, field):
+        unindexed = field.clone()
+        unindexed.db_index = False
+        unindexed.set_attributes_from_name(field.name)
+        unindexed.model = field.model
+        return unindexed
+
+    def cleanup(self):
+        # Appointments first, as one DELETE, instead of cascading from each user
+        Appointment.objects.filter(patient__email__startswith=f'bench-{self.run_id}-').delete()
+        CartItem.objects.filter(patient__email__startswith=f'bench-{self.run_id}-').delete()
+        User.objects.filter(email__startswith=f'bench-{self.run_id}-').delete()
+        Medicine.objects.filter(name__startswith=f'bench-{self.run_id} ').delete()
+        Hospital.objects.filter(name__startswith=f'bench-{self.run_id} ').delete()
@@ -1,16 +1,67 @@
+import math
 import random
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from django.core.management.base import BaseCommand
+from itertools import islice
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models.signals import post_delete
 from django.utils import timezone
-from healthcare.models import Hospital, Doctor, Appointment, MedicalRecord, AdminUser
+from healthcare import signals
+from healthcare.models import Hospital, Doctor, Appointment, MedicalRecord, AdminUser, Medicine
+from healthcare.autocomplete import get_autocomplete_index
+from healthcare.catalog import invalidate_catalog
+from healthcare.search import get_medicine_search
+from healthcare.slots import build_hours, to_time
 
 User = get_user_model()
 
+FIRST_NAMES = ['Aarav', 'Aditi', 'Amit', 'Ananya', 'Arjun', 'Deepa', 'Farhan', 'Gita', 'Ishaan', 'Kavya',
+               'Manoj', 'Meera', 'Neha', 'Nikhil', 'Pooja', 'Priya', 'Rahul', 'Riya', 'Sanjay', 'Sneha',
+               'Suresh', 'Tanvi', 'Varun', 'Vikram', 'Zoya']
+LAST_NAMES = ['Agarwal', 'Bose', 'Chopra', 'Das', 'Gupta', 'Iyer', 'Joshi', 'Kapoor', 'Khan', 'Kumar',
+              'Mehta', 'Menon', 'Nair', 'Patel', 'Rao', 'Reddy', 'Shah', 'Sharma', 'Singh', 'Verma']
+CITIES = [('Mumbai', 'Maharashtra'), ('Delhi', 'Delhi'), ('Bangalore', 'Karnataka'),
+          ('Chennai', 'Tamil Nadu'), ('Kolkata', 'West Bengal'), ('Hyderabad', 'Telangana'),
+          ('Pune', 'Maharashtra'), ('Jaipur', 'Rajasthan'), ('Ahmedabad', 'Gujarat'), ('Lucknow', 'Uttar Pradesh')]
+HOSPITAL_NAMES = ['City General Hospital', 'Lifeline Hospital', 'Sunrise Medical Centre', 'Care Clinic',
+                  'Wellness Hospital', 'Metro Multispeciality', 'Green Valley Hospital', 'Hope Healthcare']
+SPECIALTIES = ['Cardiology', 'Neurology', 'Orthopedics', 'Gynecology', 'Dermatology', 'Pediatrics',
+               'Internal Medicine', 'Ophthalmology', 'Psychiatry', 'ENT', 'Oncology', 'General Medicine']
+MEDICINE_SYLLABLES = ['am', 'ce', 'cil', 'dol', 'fen', 'lin', 'lo', 'mox', 'na', 'pra', 'pro', 'ri',
+                      'sar', 'ta', 'ti', 'vir', 'xa', 'zol', 'zine']
+REASONS = ['Regular checkup', 'Fever and cold symptoms', 'Headache and dizziness', 'Follow-up consultation',
+           'Skin rash and itching', 'Chronic pain consultation', 'Allergic reactions', 'Respiratory issues']
+PAYMENT_METHODS = ['credit-card', 'paypal', 'bank-transfer', 'cash']
+
+
 class Command(BaseCommand):
-    help = 'Creates demo data for the CureNet application'
+    help = 'Creates demo data for the CureNet application, or a large seeded dataset for load testing'
+
+    def add_arguments(self, parser):
+        scale = parser.add_argument_group(
+            'load-test data',
+            'Giving any count generates that many rows with bulk inserts instead of the small demo set',
+        )
+        scale.add_argument('--patients', type=int, default=0)
+        scale.add_argument('--doctors', type=int, default=0)
+        scale.add_argument('--hospitals', type=int, default=0, help='defaults to one per ten doctors')
+        scale.add_argument('--appointments', type=int, default=0)
+        scale.add_argument('--medicines', type=int, default=0)
+        scale.add_argument('--seed', type=int, default=0, help='the same seed and counts give the same rows')
+        scale.add_argument('--tag', default='load', help='marks the generated rows so they can be cleared')
+        scale.add_argument('--password', default='Patient@123', help='password of every generated patient')
+        scale.add_argument('--batch-size', type=int, default=5000)
+        scale.add_argument('--clear', action='store_true', help='delete rows generated earlier with the same tag')
 
     def handle(self, *args, **options):
+        if any(options[name] for name in ('patients', 'doctors', 'hospitals', 'appointments', 'medicines')):
+            self.seed_at_scale(options)
+            return
+
         self.stdout.write(self.style.SUCCESS('Creating demo data...'))
         
         # Create admin user if not exists
@@ -243,6 +294,9 @@ class Command(BaseCommand):
             
             # Create appointments
             for data in appointment_data:
+                taken = Appointment.objects.filter(doctor=data['doctor'], date=data['date'], time=data['time'])
+                if taken.exclude(patient=data['patient']).exists():
+                    continue  # the doctor is already booked for that slot
                 appointment, created = Appointment.objects.get_or_create(
                     patient=data['patient'],
                     date=data['date'],
@@ -304,4 +358,198 @@ class Command(BaseCommand):
                     if created:
                         self.stdout.write(self.style.SUCCESS(f"Created medical record for {patient.full_name} on {record_date}"))
         
-        self.stdout.write(self.style.SUCCESS('Demo data creation completed!'))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS('Demo data creation completed!'))
+
+    def seed_at_scale(self, options):
+        """Generate the requested numbers of rows with bulk inserts.
+
+        Every patient gets the same precomputed password hash, so no
+        PBKDF2 runs per user, and every row comes from one seeded RNG.
+        Nothing passes through model signals, so the search indexes and
+        catalogue cache are refreshed once at the end.
+        """
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.tag = options['tag']
+        if options['clear']:
+            self.clear()
+        elif (User.objects.filter(email__endswith=self.email_domain).exists()
+              or Hospital.objects.filter(address__endswith=self.marker).exists()
+              or Medicine.objects.filter(description__endswith=self.marker).exists()):
+            raise CommandError(f"Rows tagged '{self.tag}' already exist; pass --clear or another --tag")
+
+        doctors = options['doctors']
+        hospitals = options['hospitals'] or (math.ceil(doctors / 10) if doctors else 0)
+        if doctors and not hospitals:
+            raise CommandError('Doctors need at least one hospital')
+        if options['appointments'] and not (options['patients'] and doctors):
+            raise CommandError('Appointments need --patients and --doctors')
+
+        started = time.perf_counter()
+        self.seed_patients(options['patients'], options['password'])
+        self.seed_hospitals(hospitals)
+        self.seed_doctors(doctors)
+        self.seed_medicines(options['medicines'])
+        self.seed_appointments(options['appointments'])
+
+        invalidate_catalog()
+        get_autocomplete_index().invalidate()
+        if options['medicines'] or options['clear']:
+            get_medicine_search().rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Load-test data created in {time.perf_counter() - started:.1f}s"))
+
+    @property
+    def email_domain(self):
+        return f'@{self.tag}.seed.curenet'
+
+    @property
+    def marker(self):
+        return f'({self.tag} seed)'
+
+    def insert(self, model, objects, total):
+        """bulk_create objects batch_size rows at a time and report the rate"""
+        if not total:
+            return
+        started = time.perf_counter()
+        # One commit per table rather than per batch
+        with transaction.atomic():
+            while True:
+                batch = list(islice(objects, self.batch_size))
+                if not batch:
+                    break
+                model.objects.bulk_create(batch)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{total} {model._meta.verbose_name_plural} in {elapsed:.1f}s ({total / max(elapsed, 1e-6):,.0f} rows/s)"
+        )
+
+    def person(self):
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+
+    def seed_patients(self, count, password):
+        hashed = make_password(password)
+        self.insert(User, (
+            User(email=f'patient{n}{self.email_domain}', full_name=self.person(), password=hashed)
+            for n in range(count)
+        ), count)
+
+    def seed_hospitals(self, count):
+        def hospitals():
+            for n in range(count):
+                city, state = self.rng.choice(CITIES)
+                low = self.rng.choice([300, 400, 500, 600, 700])
+                yield Hospital(
+                    name=f'{self.rng.choice(HOSPITAL_NAMES)} {city} {n + 1}',
+                    address=f'{self.rng.randint(1, 999)} Health Avenue {self.marker}',
+                    city=city, state=state, fees_range=f'₹{low}-₹{low * 3}',
+                )
+        self.insert(Hospital, hospitals(), count)
+
+    def seed_doctors(self, count):
+        hospital_ids = list(
+            Hospital.objects.filter(address__endswith=self.marker).order_by('pk').values_list('pk', flat=True)
+        )
+        self.insert(Doctor, (
+            Doctor(
+                name=f'Dr. {self.person()}', specialty=self.rng.choice(SPECIALTIES),
+                experience=self.rng.randint(1, 35), fees=self.rng.choice([300, 500, 800, 1000, 1200, 1500]),
+                hospital_id=hospital_ids[n % len(hospital_ids)],
+            )
+            for n in range(count)
+        ), count)
+
+    def seed_medicines(self, count):
+        def name():
+            return ''.join(self.rng.choice(MEDICINE_SYLLABLES) for _ in range(self.rng.randint(2, 4))).capitalize()
+        self.insert(Medicine, (
+            Medicine(
+                name=f'{name()} {self.rng.choice([5, 10, 50, 100, 250, 500])}mg',
+                description=f'{self.rng.choice(["Tablet", "Capsule", "Syrup"])} {self.marker}',
+                price=self.rng.randint(10, 2000), stock=self.rng.randint(0, 500),
+            )
+            for n in range(count)
+        ), count)
+
+    def seed_appointments(self, count):
+        """Spread count appointments over the year either side of today without double-booking.
+
+        Each appointment takes a distinct (doctor, working day, slot): the
+        k-th one gets slot k * stride mod total, which is a permutation of
+        all slots when stride is coprime to total, so no set of taken slots
+        has to be kept in memory.
+        """
+        if not count:
+            return
+        patient_ids = list(
+            User.objects.filter(email__endswith=self.email_domain).order_by('pk').values_list('pk', flat=True)
+        )
+        doctors = list(
+            Doctor.objects.filter(hospital__address__endswith=self.marker).order_by('pk')
+            .values_list('pk', 'hospital_id')
+        )
+        hours = build_hours(())
+        today = timezone.localdate()
+        days = []
+        for offset in range(-365, 366):
+            day = today + timedelta(days=offset)
+            starts = [
+                to_time(minutes)
+                for start, end, slot_minutes in hours.get(day.weekday(), [])
+                for minutes in range(start, end - slot_minutes + 1, slot_minutes)
+            ]
+            if starts:
+                days.append((day, starts))
+        slots_per_day = min(len(starts) for _, starts in days)
+        total = len(doctors) * len(days) * slots_per_day
+        if count > total:
+            raise CommandError(f'{len(doctors)} doctors only have {total} free slots in the two-year window')
+        stride = int(total * 0.6180339887) or 1
+        while math.gcd(stride, total) != 1:
+            stride += 1
+        offset = self.rng.randrange(total)
+
+        def appointments():
+            for k in range(count):
+                slot = (k * stride + offset) % total
+                slot, doctor = divmod(slot, len(doctors))
+                day_index, slot_index = divmod(slot, slots_per_day)
+                doctor_id, hospital_id = doctors[doctor]
+                day, starts = days[day_index]
+                is_paid = day < today or self.rng.random() < 0.5
+                yield Appointment(
+                    patient_id=self.rng.choice(patient_ids), doctor_id=doctor_id, hospital_id=hospital_id,
+                    name=self.person(), phone=f'98{self.rng.randint(10_000_000, 99_999_999)}',
+                    date=day, time=starts[slot_index], reason=self.rng.choice(REASONS),
+                    payment_method=self.rng.choice(PAYMENT_METHODS) if is_paid else 'cash', is_paid=is_paid,
+                )
+        self.insert(Appointment, appointments(), count)
+
+    def clear(self):
+        # Appointments first, as one DELETE each, instead of cascading row by row. The index
+        # and catalogue receivers are off meanwhile, since any post_delete listener makes
+        # Django delete and signal one row at a time; seed_at_scale refreshes them once after.
+        with self.delete_receivers_disconnected():
+            Appointment.objects.filter(patient__email__endswith=self.email_domain).delete()
+            Appointment.objects.filter(doctor__hospital__address__endswith=self.marker).delete()
+            Hospital.objects.filter(address__endswith=self.marker).delete()
+            Medicine.objects.filter(description__endswith=self.marker).delete()
+            User.objects.filter(email__endswith=self.email_domain).delete()
+        self.stdout.write(f"Cleared rows tagged '{self.tag}'")
+
+    @contextmanager
+    def delete_receivers_disconnected(self):
+        receivers = [
+            (signals.unindex_medicine, Medicine),
+            (signals.remove_from_autocomplete, Medicine),
+            (signals.remove_from_autocomplete, Doctor),
+            (signals.remove_from_autocomplete, Hospital),
+            (signals.expire_catalog, Doctor),
+            (signals.expire_catalog, Hospital),
+        ]
+        for receiver, sender in receivers:
+            post_delete.disconnect(receiver, sender=sender)
+        try:
+            yield
+        finally:
+            for receiver, sender in receivers:
+                post_delete.connect(receiver, sender=sender)
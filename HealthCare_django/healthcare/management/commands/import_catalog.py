@@ -0,0 +1,55 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from healthcare.bulk_import import FORMATS, KINDS, MODES, ImportFileError, Importer, detect_format, read_records
+
+
+class Command(BaseCommand):
+    help = 'Import hospitals, doctors or medicines from a CSV or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(KINDS))
+        parser.add_argument('path', help="file to read, or - for standard input")
+        parser.add_argument('--format', choices=FORMATS, help='defaults to the file extension')
+        parser.add_argument('--mode', choices=MODES, default='upsert',
+                            help='what to do with rows that match an existing one (default: upsert)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='rows per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='validate and count without writing')
+        parser.add_argument('--max-errors', type=int, default=100, help='invalid rows to list')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        self.reported = time.perf_counter()
+        importer = Importer(
+            options['kind'], mode=options['mode'], batch_size=options['batch_size'],
+            dry_run=options['dry_run'], max_errors=options['max_errors'], progress=self.progress,
+        )
+        try:
+            file_format = detect_format(options['path'], options['format'])
+            if options['path'] == '-':
+                result = importer.run(read_records(sys.stdin.buffer, file_format))
+            else:
+                with open(options['path'], 'rb') as f:
+                    result = importer.run(read_records(f, file_format))
+        except (ImportFileError, OSError) as e:
+            raise CommandError(e)
+
+        for line_number, error in result.errors:
+            self.stderr.write(f"line {line_number}: {error}")
+        if result.invalid > len(result.errors):
+            self.stderr.write(f"... and {result.invalid - len(result.errors)} more invalid rows")
+        prefix = 'Dry run, nothing written: ' if options['dry_run'] else ''
+        style = self.style.WARNING if result.invalid else self.style.SUCCESS
+        self.stdout.write(style(prefix + result.summary()))
+
+    def progress(self, result):
+        # About once a second, however small the batches
+        if time.perf_counter() - self.reported < 1:
+            return
+        self.reported = time.perf_counter()
+        self.stdout.write(
+            f"{result.read} rows read, {result.invalid} invalid, {result.rows_per_second:,.0f} rows/s"
+        )
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from healthcare.search import get_medicine_search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the medicine search index, e.g. after bulk imports that bypass model signals'
+
+    def handle(self, *args, **options):
+        search = get_medicine_search()
+        search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the {type(search).__name__} index'))
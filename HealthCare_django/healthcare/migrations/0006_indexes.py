@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:41
+
+from django.conf import settings
+from django.db import IntegrityError, migrations, models
+
+
+def check_duplicate_cart_items(apps, schema_editor):
+    """Refuse to add unique_cart_item while a patient has one medicine in their cart twice.
+
+    Whether the quantities should be added up or one row is a mistake is for
+    staff to decide, so nothing is changed here; the error lists every pair.
+    """
+    CartItem = apps.get_model('healthcare', 'CartItem')
+    duplicates = (
+        CartItem.objects.values('patient_id', 'medicine_id')
+        .annotate(rows=models.Count('id'))
+        .filter(rows__gt=1)
+        .order_by('patient_id', 'medicine_id')
+    )
+    conflicts = []
+    for pair in duplicates:
+        ids = CartItem.objects.filter(
+            patient_id=pair['patient_id'], medicine_id=pair['medicine_id'],
+        ).order_by('pk').values_list('pk', flat=True)
+        conflicts.append(
+            f"patient {pair['patient_id']}, medicine {pair['medicine_id']}: "
+            f"cart items {', '.join(map(str, ids))}"
+        )
+    if conflicts:
+        raise IntegrityError(
+            "Medicines in a cart more than once; merge or delete all but one "
+            "cart item for each, then migrate again:\n  " + '\n  '.join(conflicts)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('healthcare', '0005_cartitem'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='hospital',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='medicine',
+            name='name',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['patient', 'date', 'time'], name='appointment_patient_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['date', 'time'], name='appointment_date_time_idx'),
+        ),
+        # The check only reads, so there is nothing to undo on the way back
+        migrations.RunPython(check_duplicate_cart_items, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.UniqueConstraint(fields=('patient', 'medicine'), name='unique_cart_item'),
+        ),
+    ]
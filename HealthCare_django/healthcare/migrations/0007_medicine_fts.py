@@ -0,0 +1,42 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+FTS_TABLE = 'healthcare_medicine_fts'
+
+
+def create_fts_table(apps, schema_editor):
+    """Create and fill the FTS5 index on SQLite builds that ship FTS5.
+
+    Other databases, and SQLite without FTS5, use the in-process index in
+    healthcare/search.py instead, so there is nothing to create for them.
+    """
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                "name, description, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+        except OperationalError:  # no FTS5 module in this SQLite build
+            return
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, description) "
+            "SELECT id, name, description FROM healthcare_medicine"
+        )
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('healthcare', '0006_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import IntegrityError, migrations, models
+
+
+def check_double_bookings(apps, schema_editor):
+    """Refuse to add unique_doctor_slot while a doctor is booked twice for one slot.
+
+    Which booking should keep the slot is for staff to decide, so nothing is
+    changed here; the error lists every conflict to reschedule or cancel.
+    """
+    Appointment = apps.get_model('healthcare', 'Appointment')
+    taken = (
+        Appointment.objects.filter(doctor__isnull=False)
+        .values('doctor_id', 'date', 'time')
+        .annotate(bookings=models.Count('id'))
+        .filter(bookings__gt=1)
+        .order_by('doctor_id', 'date', 'time')
+    )
+    conflicts = []
+    for slot in taken:
+        ids = Appointment.objects.filter(
+            doctor_id=slot['doctor_id'], date=slot['date'], time=slot['time'],
+        ).order_by('pk').values_list('pk', flat=True)
+        conflicts.append(
+            f"doctor {slot['doctor_id']} on {slot['date']} at {slot['time']:%H:%M}: "
+            f"appointments {', '.join(map(str, ids))}"
+        )
+    if conflicts:
+        raise IntegrityError(
+            "Doctor slots booked more than once; reschedule or cancel all but one "
+            "appointment in each, then migrate again:\n  " + '\n  '.join(conflicts)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('healthcare', '0007_medicine_fts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkingHours',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'), (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')])),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('slot_minutes', models.PositiveSmallIntegerField(default=30)),
+            ],
+        ),
+        # The check only reads, so there is nothing to undo on the way back
+        migrations.RunPython(check_double_bookings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(fields=('doctor', 'date', 'time'), name='unique_doctor_slot'),
+        ),
+        migrations.AddField(
+            model_name='workinghours',
+            name='doctor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='working_hours', to='healthcare.doctor'),
+        ),
+    ]
@@ -6,7 +6,7 @@ from django.conf import settings
 User = settings.AUTH_USER_MODEL
 
 class Hospital(models.Model):
-    name = models.CharField(max_length=255)
+    name = models.CharField(max_length=255, db_index=True)
     address = models.CharField(max_length=255)
     city = models.CharField(max_length=100)
     state = models.CharField(max_length=100)
@@ -25,6 +25,31 @@ class Doctor(models.Model):
     def __str__(self):
         return self.name
 
+class WorkingHours(models.Model):
+    WEEKDAY_CHOICES = (
+        (0, 'Monday'),
+        (1, 'Tuesday'),
+        (2, 'Wednesday'),
+        (3, 'Thursday'),
+        (4, 'Friday'),
+        (5, 'Saturday'),
+        (6, 'Sunday'),
+    )
+    
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name='working_hours')
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    slot_minutes = models.PositiveSmallIntegerField(default=30)
+    
+    def __str__(self):
+        return f"{self.doctor} - {self.get_weekday_display()} {self.start_time}-{self.end_time}"
+    
+    def clean(self):
+        if self.start_time >= self.end_time:
+            raise ValidationError("Working hours must end after they start.")
+        return super().clean()
+
 class Appointment(models.Model):
     PAYMENT_CHOICES = (
         ('credit-card', 'Credit/Debit Card'),
@@ -45,6 +70,19 @@ class Appointment(models.Model):
     is_paid = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            # Patient dashboards: filter on patient and a date range, ordered by date, time
+            models.Index(fields=['patient', 'date', 'time'], name='appointment_patient_date_idx'),
+            # Staff views list every patient's appointments in the same order
+            models.Index(fields=['date', 'time'], name='appointment_date_time_idx'),
+        ]
+        constraints = [
+            # A doctor cannot be booked twice for the same slot. Rows without a
+            # doctor hold NULL, which never collides in a unique index.
+            models.UniqueConstraint(fields=['doctor', 'date', 'time'], name='unique_doctor_slot'),
+        ]
+    
     def __str__(self):
         return f"{self.name} - {self.doctor} - {self.date}"
     
@@ -74,7 +112,7 @@ class AdminUser(models.Model):
         return self.user.email
     
 class Medicine(models.Model):
-    name = models.CharField(max_length=255)
+    name = models.CharField(max_length=255, db_index=True)
     description = models.TextField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.PositiveIntegerField()
@@ -113,6 +151,12 @@ class CartItem(models.Model):
     quantity = models.PositiveIntegerField(default=1)
     added_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        constraints = [
+            # One row per medicine in a cart; also serves the lookups by patient
+            models.UniqueConstraint(fields=['patient', 'medicine'], name='unique_cart_item'),
+        ]
+    
     @property
     def total_price(self):
         return self.medicine.price * self.quantity
@@ -0,0 +1,67 @@
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Q, When
+
+from .models import CartItem, Medicine, MedicineOrder
+
+
+class OutOfStock(Exception):
+    """A cart item asks for more units than the medicine has in stock"""
+
+    def __init__(self, medicine, requested):
+        self.medicine = medicine
+        self.requested = requested
+        super().__init__(f"Not enough stock for {medicine.name}. Available: {medicine.stock}")
+
+
+def checkout_cart(patient):
+    """Turn the patient's cart into orders as one all-or-nothing transaction.
+
+    The medicine rows are locked together, stock is decremented by a single
+    conditional UPDATE that only matches rows that still have enough units,
+    and all orders are written with one bulk_create. If any medicine runs
+    short, nothing is written and OutOfStock is raised. Returns the orders,
+    or an empty list when the cart is empty.
+    """
+    with transaction.atomic():
+        cart_items = list(CartItem.objects.filter(patient=patient))
+        if not cart_items:
+            return []
+
+        quantities = {}
+        for item in cart_items:
+            quantities[item.medicine_id] = quantities.get(item.medicine_id, 0) + item.quantity
+
+        medicines = Medicine.objects.select_for_update().in_bulk(list(quantities))
+        for medicine_id, quantity in quantities.items():
+            if medicines[medicine_id].stock < quantity:
+                raise OutOfStock(medicines[medicine_id], quantity)
+
+        # The stock__gte guard keeps the decrement safe even on backends
+        # where select_for_update() is a no-op, such as SQLite.
+        in_stock = reduce(or_, (
+            Q(pk=medicine_id, stock__gte=quantity) for medicine_id, quantity in quantities.items()
+        ))
+        updated = Medicine.objects.filter(in_stock).update(stock=Case(
+            *(When(pk=medicine_id, then=F('stock') - quantity) for medicine_id, quantity in quantities.items()),
+            default=F('stock'),
+            output_field=PositiveIntegerField(),
+        ))
+        if updated != len(quantities):
+            short = Medicine.objects.filter(pk__in=list(quantities)).exclude(in_stock).first()
+            raise OutOfStock(short, quantities[short.pk])
+
+        orders = MedicineOrder.objects.bulk_create([
+            MedicineOrder(
+                patient=patient,
+                medicine=medicines[item.medicine_id],
+                quantity=item.quantity,
+                # bulk_create skips MedicineOrder.save(), which normally sets this
+                total_price=medicines[item.medicine_id].price * item.quantity,
+            )
+            for item in cart_items
+        ])
+        CartItem.objects.filter(pk__in=[item.pk for item in cart_items]).delete()
+        return orders
@@ -0,0 +1,156 @@
+import base64
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    """A pagination cursor that cannot be decoded"""
+
+
+def encode_cursor(data):
+    raw = json.dumps(data, cls=DjangoJSONEncoder, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        data = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(cursor) from e
+    if not isinstance(data, dict):
+        raise InvalidCursor(cursor)
+    return data
+
+
+def get_page_size(request):
+    default = getattr(settings, 'LIST_PAGE_SIZE', 25)
+    try:
+        page_size = int(request.GET.get('page_size', default))
+    except ValueError:
+        return default
+    return min(max(page_size, 1), getattr(settings, 'LIST_MAX_PAGE_SIZE', 100))
+
+
+class Page:
+    """One window of rows plus the links to the windows around it.
+
+    Iterates, counts and tests truthy like the list it wraps, so templates
+    that used to loop over a whole queryset work unchanged.
+    """
+
+    def __init__(self, request, object_list, cursor_param, next_cursor=None, previous_cursor=None,
+                 has_next=False, has_previous=False):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_url = self._url(request, cursor_param, next_cursor) if has_next else None
+        self.previous_url = self._url(request, cursor_param, previous_cursor) if has_previous else None
+
+    @staticmethod
+    def _url(request, cursor_param, cursor):
+        params = request.GET.copy()
+        if cursor:
+            params[cursor_param] = cursor
+        else:
+            params.pop(cursor_param, None)
+        return f'?{params.urlencode()}'
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+def keyset_filter(ordering, values, forward=True):
+    """Q for the rows after (or before) values in ordering, e.g. (a > x) | (a = x & b > y)"""
+    condition = Q()
+    for position, field in enumerate(ordering):
+        descending = field.startswith('-')
+        lookup = 'lt' if descending == forward else 'gt'
+        clause = Q(**{f'{field.lstrip("-")}__{lookup}': values[position]})
+        for previous, value in zip(ordering[:position], values[:position]):
+            clause &= Q(**{previous.lstrip('-'): value})
+        condition |= clause
+    return condition
+
+
+def paginate_keyset(request, queryset, ordering, prefix=''):
+    """Return the Page of queryset selected by the request's cursor.
+
+    ordering must end in a unique field such as 'id' or '-id'. Each page is
+    one query that seeks past the previous page's last row using the
+    ordering's index, instead of counting through an OFFSET, so every page
+    costs the same however deep it is. Cursors come from the
+    '<prefix>cursor' parameter and the page size from 'page_size'.
+    """
+    cursor_param = f'{prefix}cursor'
+    page_size = get_page_size(request)
+    fields = [field.lstrip('-') for field in ordering]
+
+    forward, values = True, None
+    cursor = request.GET.get(cursor_param)
+    if cursor:
+        try:
+            data = decode_cursor(cursor)
+            if isinstance(data.get('v'), list) and len(data['v']) == len(ordering):
+                queryset = queryset.filter(keyset_filter(ordering, data['v'], data.get('d') != 'p'))
+                forward, values = data.get('d') != 'p', data['v']
+        except (InvalidCursor, ValidationError, TypeError, ValueError):
+            pass  # a stale or tampered cursor falls back to the first page
+
+    if forward:
+        order = ordering
+    else:
+        order = [field[1:] if field.startswith('-') else f'-{field}' for field in ordering]
+    rows = list(queryset.order_by(*order)[:page_size + 1])
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+    if not forward:
+        rows.reverse()
+
+    def cursor_for(direction, row):
+        return encode_cursor({'d': direction, 'v': [getattr(row, field) for field in fields]})
+
+    return Page(
+        request, rows, cursor_param,
+        next_cursor=cursor_for('n', rows[-1]) if rows else None,
+        previous_cursor=cursor_for('p', rows[0]) if rows else None,
+        has_next=bool(rows) and (more if forward else True),
+        has_previous=values is not None and (True if forward else more),
+    )
+
+
+def paginate_ranked(request, fetch, prefix=''):
+    """Page through ranked results, e.g. search hits, that have no sortable key.
+
+    fetch(offset, limit) returns rows in rank order. The cursor carries
+    the offset, which is cheap here because ranking happens in the search
+    index rather than by scanning table rows.
+    """
+    cursor_param = f'{prefix}cursor'
+    page_size = get_page_size(request)
+    offset = 0
+    cursor = request.GET.get(cursor_param)
+    if cursor:
+        try:
+            offset = max(int(decode_cursor(cursor)['o']), 0)
+        except (InvalidCursor, KeyError, TypeError, ValueError):
+            offset = 0
+
+    rows = fetch(offset, page_size + 1)
+    return Page(
+        request, rows[:page_size], cursor_param,
+        next_cursor=encode_cursor({'o': offset + page_size}),
+        previous_cursor=encode_cursor({'o': offset - page_size}) if offset > page_size else None,
+        has_next=len(rows) > page_size,
+        has_previous=offset > 0,
+    )
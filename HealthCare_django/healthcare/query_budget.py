@@ -0,0 +1,56 @@
+import logging
+from functools import wraps
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """A view ran more SQL queries than its declared budget"""
+
+
+class QueryCounter:
+    """connection.execute_wrapper hook that counts executed statements"""
+
+    def __init__(self):
+        self.count = 0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        self.statements.append(sql)
+        return execute(sql, params, many, context)
+
+
+def query_budget(max_queries):
+    """Fail loudly when a view, including its template, exceeds max_queries.
+
+    The budget is a constant, so a view that starts issuing one query per
+    row trips it as soon as a page has more rows than the budget. With
+    QUERY_BUDGET_STRICT, which only the tests set, the view raises
+    QueryBudgetExceeded; otherwise the overrun is logged as a warning.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                response = view_func(request, *args, **kwargs)
+                # Render lazy responses inside the wrapper so template queries count
+                if hasattr(response, 'render') and callable(response.render):
+                    response.render()
+
+            if counter.count > max_queries:
+                message = (
+                    f"{view_func.__name__} ran {counter.count} queries, "
+                    f"budget is {max_queries}: {counter.statements}"
+                )
+                if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+            return response
+        wrapper.query_budget = max_queries
+        return wrapper
+    return decorator
@@ -0,0 +1,215 @@
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import Medicine
+from .versioning import SharedVersion
+
+FTS_TABLE = 'healthcare_medicine_fts'
+# Matches in the name count this many times more than matches in the description
+NAME_WEIGHT = 10.0
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Lower-case, accent-free word tokens, the same way FTS5's unicode61 splits them"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return TOKEN_RE.findall(text.lower())
+
+
+class FTS5MedicineSearch:
+    """Medicine search backed by an SQLite FTS5 table ranked with bm25().
+
+    The table is created by migration 0007 and written in the same
+    transaction as the medicine row it mirrors.
+    """
+
+    def add(self, medicine):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [medicine.pk])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, name, description) VALUES (%s, %s, %s)",
+                [medicine.pk, medicine.name, medicine.description],
+            )
+
+    def remove(self, medicine_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [medicine_id])
+
+    def rebuild(self):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, name, description) "
+                f"SELECT id, name, description FROM {Medicine._meta.db_table}"
+            )
+
+    def search(self, query, limit=None, prefix=True, offset=0):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        # Quoted terms are matched literally, so user input cannot inject FTS syntax
+        match = ' '.join(f'"{term}"' for term in terms)
+        if prefix:
+            match += '*'
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                f"ORDER BY bm25({FTS_TABLE}, %s, 1.0) LIMIT %s OFFSET %s",
+                [match, NAME_WEIGHT, -1 if limit is None else limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class InvertedIndexMedicineSearch:
+    """In-process inverted index for databases without FTS5.
+
+    Built from the medicine table on first use and kept current by the
+    model signals. Each process holds its own copy; writes and rebuild()
+    reach the others within check_interval seconds through a
+    SharedVersion, provided the cache is shared between processes.
+    """
+
+    def __init__(self, check_interval=2):
+        self.versions = SharedVersion('medicine-search:version', check_interval)
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._postings = {}
+        self._documents = {}
+        self._vocabulary = []
+
+    def _index(self, medicine_id, name, description):
+        self._unindex(medicine_id)
+        weights = Counter()
+        for token in tokenize(name):
+            weights[token] += NAME_WEIGHT
+        for token in tokenize(description):
+            weights[token] += 1
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                insort(self._vocabulary, token)
+            postings[medicine_id] = weight
+        self._documents[medicine_id] = list(weights)
+
+    def _unindex(self, medicine_id):
+        for token in self._documents.pop(medicine_id, ()):
+            postings = self._postings[token]
+            del postings[medicine_id]
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def _ensure_current(self):
+        if not self._loaded or self.versions.stale():
+            self._load()
+
+    def add(self, medicine):
+        values = (medicine.pk, medicine.name, medicine.description)
+
+        def apply():
+            with self._lock:
+                if self._loaded:
+                    self._index(*values)
+                self.versions.bumped()
+        transaction.on_commit(apply)
+
+    def remove(self, medicine_id):
+        def apply():
+            with self._lock:
+                if self._loaded:
+                    self._unindex(medicine_id)
+                self.versions.bumped()
+        transaction.on_commit(apply)
+
+    def rebuild(self):
+        """Reload from the table, e.g. after bulk writes that skip the signals, here and in other processes"""
+        with self._lock:
+            self._load()
+            self.versions.bumped()
+
+    def _load(self):
+        with self._lock:
+            self.versions.built()
+            self._postings, self._documents, self._vocabulary = {}, {}, []
+            for row in Medicine.objects.values_list('id', 'name', 'description').iterator():
+                self._index(*row)
+            self._loaded = True
+
+    def _expand(self, term):
+        start = bisect_left(self._vocabulary, term)
+        end = bisect_left(self._vocabulary, term + '\uffff')
+        return self._vocabulary[start:end]
+
+    def search(self, query, limit=None, prefix=True, offset=0):
+        terms = tokenize(query)
+        if not terms:
+            return []
+        with self._lock:
+            self._ensure_current()
+            total = len(self._documents)
+            scores = None
+            for position, term in enumerate(terms):
+                is_prefix = prefix and position == len(terms) - 1
+                matches = {}
+                for token in self._expand(term) if is_prefix else [term]:
+                    postings = self._postings.get(token, {})
+                    idf = math.log(1 + total / (1 + len(postings)))
+                    for medicine_id, weight in postings.items():
+                        matches[medicine_id] = max(matches.get(medicine_id, 0), weight * idf)
+                # Every term has to match, as in FTS5
+                if scores is None:
+                    scores = matches
+                else:
+                    scores = {pk: score + matches[pk] for pk, score in scores.items() if pk in matches}
+                if not scores:
+                    return []
+        ranked = sorted(scores, key=lambda pk: (-scores[pk], pk))
+        return ranked[offset:] if limit is None else ranked[offset:offset + limit]
+
+
+def fts5_table_exists():
+    return connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names()
+
+
+_search = None
+_search_lock = threading.Lock()
+
+
+def get_medicine_search():
+    """Return the process-wide medicine search backend.
+
+    MEDICINE_SEARCH_BACKEND is 'fts5', 'memory' or 'auto' (the default),
+    which uses FTS5 whenever its table exists.
+    """
+    global _search
+    if _search is None:
+        with _search_lock:
+            if _search is None:
+                backend = getattr(settings, 'MEDICINE_SEARCH_BACKEND', 'auto')
+                if backend == 'fts5' or (backend == 'auto' and fts5_table_exists()):
+                    _search = FTS5MedicineSearch()
+                else:
+                    _search = InvertedIndexMedicineSearch(
+                        check_interval=getattr(settings, 'MEDICINE_SEARCH_CHECK_INTERVAL', 2))
+    return _search
+
+
+def search_medicines(query, limit=None, prefix=True, offset=0):
+    """Return the medicines matching every word of query, best match first.
+
+    With prefix on, the last word also matches longer words, so partial
+    input typed into a search box already finds results.
+    """
+    ids = get_medicine_search().search(query, limit=limit, prefix=prefix, offset=offset)
+    medicines = Medicine.objects.in_bulk(ids)
+    return [medicines[pk] for pk in ids if pk in medicines]
@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .autocomplete import get_autocomplete_index
+from .catalog import invalidate_catalog
+from .models import Doctor, Hospital, Medicine
+from .search import get_medicine_search
+
+
+@receiver(post_save, sender=Medicine)
+def index_medicine(sender, instance, **kwargs):
+    get_medicine_search().add(instance)
+
+
+@receiver(post_delete, sender=Medicine)
+def unindex_medicine(sender, instance, **kwargs):
+    get_medicine_search().remove(instance.pk)
+
+
+@receiver(post_save, sender=Medicine)
+@receiver(post_save, sender=Doctor)
+@receiver(post_save, sender=Hospital)
+def update_autocomplete(sender, instance, **kwargs):
+    get_autocomplete_index().update(instance)
+
+
+@receiver(post_delete, sender=Medicine)
+@receiver(post_delete, sender=Doctor)
+@receiver(post_delete, sender=Hospital)
+def remove_from_autocomplete(sender, instance, **kwargs):
+    get_autocomplete_index().remove(instance)
+
+
+@receiver(post_save, sender=Doctor)
+@receiver(post_save, sender=Hospital)
+@receiver(post_delete, sender=Doctor)
+@receiver(post_delete, sender=Hospital)
+def expire_catalog(sender, instance, **kwargs):
+    # After commit, so a request cannot re-cache the old rows under the new version
+    transaction.on_commit(invalidate_catalog)
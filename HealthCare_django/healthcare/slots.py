@@ -0,0 +1,290 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Appointment, WorkingHours
+
+HOURS_FIELDS = ('weekday', 'start_time', 'end_time', 'slot_minutes')
+
+
+def to_minutes(value):
+    if isinstance(value, str):
+        value = datetime.strptime(value, '%H:%M').time()
+    return value.hour * 60 + value.minute
+
+
+def to_time(minutes):
+    return time(minutes // 60, minutes % 60)
+
+
+def default_slot_minutes():
+    return getattr(settings, 'DEFAULT_SLOT_MINUTES', 30)
+
+
+def build_hours(rows):
+    """{weekday: [(start, end, slot_minutes)]} in minutes from (weekday, start, end, slot_minutes) rows.
+
+    Doctors without rows get DEFAULT_WORKING_HOURS.
+    """
+    hours = {}
+    for weekday, start, end, slot_minutes in rows:
+        hours.setdefault(weekday, []).append((to_minutes(start), to_minutes(end), slot_minutes))
+    if not hours:
+        for weekday, start, end in getattr(settings, 'DEFAULT_WORKING_HOURS', []):
+            hours.setdefault(weekday, []).append((to_minutes(start), to_minutes(end), default_slot_minutes()))
+    for blocks in hours.values():
+        blocks.sort()
+    return hours
+
+
+def slot_length(hours, day, minutes):
+    """Slot length of the working block holding minutes on day"""
+    for start, end, slot_minutes in hours.get(day.weekday(), []):
+        if start <= minutes < end:
+            return slot_minutes
+    return default_slot_minutes()
+
+
+class IntervalSet:
+    """Disjoint [start, end) intervals kept sorted, with O(log n) overlap checks.
+
+    Overlapping or touching intervals are merged as they are added, so the
+    starts and ends stay sorted and one bisect finds the only interval that
+    could collide with a query.
+    """
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+
+    def add(self, start, end):
+        first = bisect_left(self.ends, start)
+        last = bisect_right(self.starts, end)
+        if first < last:
+            start = min(start, self.starts[first])
+            end = max(end, self.ends[last - 1])
+        self.starts[first:last] = [start]
+        self.ends[first:last] = [end]
+
+    def overlaps(self, start, end):
+        position = bisect_right(self.ends, start)
+        return position < len(self.starts) and self.starts[position] < end
+
+    def __len__(self):
+        return len(self.starts)
+
+
+class SlotEngine:
+    """Working hours, free slots and conflict checks for one doctor.
+
+    A doctor's WorkingHours rows define bookable blocks per weekday, each
+    cut into slot_minutes slots; doctors without rows use
+    DEFAULT_WORKING_HOURS. Bookings are loaded with one query per date
+    range into an IntervalSet per day.
+    """
+
+    def __init__(self, doctor):
+        self.doctor = doctor
+        self.hours = self._load_hours()
+
+    def _load_hours(self):
+        return build_hours(self.doctor.working_hours.values_list(*HOURS_FIELDS))
+
+    def block_for(self, day, minutes):
+        """(start, end, slot_minutes) of the working block holding minutes, or None"""
+        for block in self.hours.get(day.weekday(), []):
+            if block[0] <= minutes < block[1]:
+                return block
+        return None
+
+    def slot_length(self, day, minutes):
+        return slot_length(self.hours, day, minutes)
+
+    def bookings(self, date_from, date_to, exclude=None):
+        """{date: IntervalSet} of the doctor's appointments between the two dates, inclusive"""
+        appointments = Appointment.objects.filter(doctor=self.doctor, date__range=(date_from, date_to))
+        if exclude is not None:
+            appointments = appointments.exclude(pk=exclude)
+        booked = {}
+        for day, start in appointments.values_list('date', 'time'):
+            minutes = to_minutes(start)
+            booked.setdefault(day, IntervalSet()).add(minutes, minutes + self.slot_length(day, minutes))
+        return booked
+
+    def check(self, day, start, exclude=None):
+        """Return None if start on day is bookable, otherwise the reason it is not"""
+        minutes = to_minutes(start)
+        block = self.block_for(day, minutes)
+        if block is None:
+            return f"Dr. {self.doctor.name} does not see patients at that time."
+        block_start, block_end, slot_minutes = block
+        if (minutes - block_start) % slot_minutes or minutes + slot_minutes > block_end:
+            return f"Appointments with Dr. {self.doctor.name} start on the {slot_minutes}-minute slots shown."
+        booked = self.bookings(day, day, exclude=exclude).get(day)
+        if booked and booked.overlaps(minutes, minutes + slot_minutes):
+            return f"Dr. {self.doctor.name} is already booked at that time."
+        return None
+
+    def free_slots(self, count=10, start_date=None, days=None):
+        """The next count free (date, time) slots, searching up to days ahead"""
+        now = timezone.localtime()
+        start_date = start_date or now.date()
+        days = days or getattr(settings, 'SLOT_SEARCH_DAYS', 30)
+        end_date = start_date + timedelta(days=days - 1)
+        booked = self.bookings(start_date, end_date)
+
+        slots = []
+        for offset in range(days):
+            day = start_date + timedelta(days=offset)
+            taken = booked.get(day)
+            for block_start, block_end, slot_minutes in self.hours.get(day.weekday(), []):
+                for minutes in range(block_start, block_end - slot_minutes + 1, slot_minutes):
+                    if day == now.date() and minutes <= now.hour * 60 + now.minute:
+                        continue
+                    if taken and taken.overlaps(minutes, minutes + slot_minutes):
+                        continue
+                    slots.append((day, to_time(minutes)))
+                    if len(slots) == count:
+                        return slots
+        return slots
+
+
+def minute_mask(start, end):
+    """Int with bits start..end-1 set: one bit per minute of the day"""
+    return ((1 << (end - start)) - 1) << start
+
+
+def spread(mask, length):
+    """Set bit m wherever any of bits m..m+length-1 is set in mask.
+
+    For a mask of booked minutes this marks every slot start whose slot
+    would overlap a booking, in log2(length) shifts.
+    """
+    covered = 1
+    while covered < length:
+        step = min(covered, length - covered)
+        mask |= mask >> step
+        covered += step
+    return mask
+
+
+def set_bits(mask):
+    """Positions of the set bits in mask, lowest first"""
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+class DaySchedule:
+    """One doctor's working blocks for a weekday as minute bitmasks.
+
+    starts has a bit at each slot start, so the free slots of a day are
+    starts & ~spread(booked, slot_minutes) per block: whole-day arithmetic
+    instead of testing each slot against each booking.
+    """
+
+    def __init__(self, blocks):
+        self.blocks = []
+        for start, end, slot_minutes in blocks:
+            starts = 0
+            for minutes in range(start, end - slot_minutes + 1, slot_minutes):
+                starts |= 1 << minutes
+            self.blocks.append((minute_mask(start, end), starts, slot_minutes))
+
+    def free(self, booked, after=-1):
+        """Bitmask of free slot starts given the booked-minutes mask, only starts later than after"""
+        free = 0
+        for block, starts, slot_minutes in self.blocks:
+            free |= starts & ~spread(booked & block, slot_minutes)
+        return free & ~minute_mask(0, after + 1) if after >= 0 else free
+
+
+def find_available(doctors, start_date=None, days=7, limit=10, slots_per_doctor=3):
+    """Rank doctors by their first free slot, e.g. "first available cardiologist in Mumbai".
+
+    doctors is a Doctor queryset holding the candidates. Their working
+    hours are loaded in one query and days are then scanned in order for
+    all doctors together, so the query count does not grow with the
+    number of doctors. Bookings are read in windows that double as the
+    scan moves on (1, 2, 4, ... days): once limit doctors have a free slot
+    no later day can outrank them, so the scan narrows to filling in their
+    slots and a search that succeeds early never reads later bookings.
+
+    Returns up to limit (doctor, [(date, time), ...]) pairs, earliest first
+    slot first, ties going to the lower fee and then the more experienced
+    doctor.
+    """
+    now = timezone.localtime()
+    start_date = start_date or now.date()
+    end_date = start_date + timedelta(days=days - 1)
+    candidates = {doctor.pk: doctor for doctor in doctors.select_related('hospital')}
+
+    rows = {}
+    hours_rows = WorkingHours.objects.filter(doctor__in=doctors.values('pk')).values_list('doctor_id', *HOURS_FIELDS)
+    for doctor_id, *row in hours_rows:
+        rows.setdefault(doctor_id, []).append(row)
+    default_hours = build_hours(())
+    day_schedules = {}
+    schedules = {}
+    for doctor_id in candidates:
+        hours = build_hours(rows[doctor_id]) if doctor_id in rows else default_hours
+        weekdays = {}
+        for weekday, blocks in hours.items():
+            # Doctors on the same hours share one DaySchedule
+            key = tuple(blocks)
+            if key not in day_schedules:
+                day_schedules[key] = DaySchedule(blocks)
+            weekdays[weekday] = day_schedules[key]
+        schedules[doctor_id] = (hours, weekdays)
+
+    def load_bookings(date_from, date_to, doctor_ids):
+        booked = {}
+        appointments = Appointment.objects.filter(doctor__in=doctor_ids, date__range=(date_from, date_to))
+        for doctor_id, day, start in appointments.values_list('doctor_id', 'date', 'time').iterator():
+            minutes = to_minutes(start)
+            length = slot_length(schedules[doctor_id][0], day, minutes)
+            key = (doctor_id, day)
+            booked[key] = booked.get(key, 0) | minute_mask(minutes, min(minutes + length, 24 * 60))
+        return booked
+
+    def rank(found):
+        return sorted(
+            found.items(),
+            key=lambda item: (item[1][0], candidates[item[0]].fees, -candidates[item[0]].experience, item[0]),
+        )
+
+    found = {}
+    pending = schedules
+    booked, loaded_until, window = {}, start_date - timedelta(days=1), 1
+    for offset in range(days):
+        day = start_date + timedelta(days=offset)
+        if day > loaded_until:
+            loaded_until = min(day + timedelta(days=window - 1), end_date)
+            doctor_ids = doctors.values('pk') if pending is schedules else list(pending)
+            booked = load_bookings(day, loaded_until, doctor_ids)
+            window *= 2
+        after = now.hour * 60 + now.minute if day == now.date() else -1
+        for doctor_id, (_, weekdays) in pending.items():
+            schedule = weekdays.get(day.weekday())
+            slots = found.get(doctor_id, [])
+            if schedule is None or len(slots) >= slots_per_doctor:
+                continue
+            for minutes in set_bits(schedule.free(booked.get((doctor_id, day), 0), after)):
+                slots.append((day, to_time(minutes)))
+                if len(slots) == slots_per_doctor:
+                    break
+            if slots:
+                found[doctor_id] = slots
+        if len(found) >= limit:
+            # No later day can outrank the leaders, so only their remaining slots are still needed
+            pending = {
+                doctor_id: schedules[doctor_id]
+                for doctor_id, slots in rank(found)[:limit] if len(slots) < slots_per_doctor
+            }
+            if not pending:
+                break
+
+    return [(candidates[doctor_id], slots) for doctor_id, slots in rank(found)[:limit]]
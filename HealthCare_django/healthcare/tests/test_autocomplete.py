@@ -0,0 +1,55 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from healthcare.autocomplete import PrefixIndex
+from healthcare.models import Medicine
+
+
+class SharedVersionTests(TestCase):
+    """Indexes in two processes, played here by two PrefixIndex objects sharing the cache"""
+
+    def setUp(self):
+        cache.clear()
+        Medicine.objects.create(name='Aspirin', description='Tablets', price=20, stock=100)
+        self.writer = PrefixIndex(check_interval=0)
+        self.reader = PrefixIndex(check_interval=0)
+        # The post_save signal feeds the writer, as it feeds the index of the process saving
+        patcher = mock.patch('healthcare.signals.get_autocomplete_index', return_value=self.writer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def labels(self, index, query):
+        return [label for _, _, label, _ in index.search(query)]
+
+    def add(self, name):
+        with self.captureOnCommitCallbacks(execute=True):
+            Medicine.objects.create(name=name, description='Tablets', price=20, stock=100)
+
+    def test_other_process_sees_edit(self):
+        self.assertEqual(self.labels(self.reader, 'asp'), ['Aspirin'])
+        self.labels(self.writer, 'asp')
+        self.add('Aspirin Forte')
+        self.assertEqual(self.labels(self.reader, 'asp'), ['Aspirin', 'Aspirin Forte'])
+
+    def test_other_process_sees_invalidate(self):
+        self.labels(self.reader, 'asp')
+        Medicine.objects.filter(name='Aspirin').update(name='Paracetamol')
+        self.writer.invalidate()
+        self.assertEqual(self.labels(self.reader, 'asp'), [])
+        self.assertEqual(self.labels(self.reader, 'para'), ['Paracetamol'])
+
+    def test_staleness_bounded_by_check_interval(self):
+        self.reader.versions.interval = 60
+        self.labels(self.reader, 'asp')
+        self.add('Aspirin Forte')
+        self.assertEqual(self.labels(self.reader, 'asp'), ['Aspirin'])
+        self.reader.versions.checked -= 60
+        self.assertEqual(self.labels(self.reader, 'asp'), ['Aspirin', 'Aspirin Forte'])
+
+    def test_own_edit_needs_no_rebuild(self):
+        self.labels(self.writer, 'asp')
+        self.add('Aspirin Forte')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.labels(self.writer, 'asp'), ['Aspirin', 'Aspirin Forte'])
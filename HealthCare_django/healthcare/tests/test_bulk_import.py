@@ -0,0 +1,102 @@
+import io
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from healthcare.bulk_import import ImportFileError, Importer, read_records
+from healthcare.models import Doctor, Hospital
+
+
+def records(*rows):
+    return [(line_number, record, None) for line_number, record in enumerate(rows, start=2)]
+
+
+def hospital(name, city='Pune', fees_range='₹500'):
+    return {'name': name, 'address': '1 Main Road', 'city': city, 'state': 'Maharashtra', 'fees_range': fees_range}
+
+
+class ImporterCountTests(TestCase):
+    """Rows repeating a key within a batch are written and counted once"""
+
+    def counts(self, result):
+        return result.created, result.updated, result.skipped, result.repeated, result.invalid
+
+    def test_repeated_new_key_upsert(self):
+        result = Importer('hospitals').run(records(hospital('City General'), hospital('City General', fees_range='₹900')))
+        self.assertEqual(self.counts(result), (1, 0, 0, 1, 0))
+        self.assertEqual(Hospital.objects.get().fees_range, '₹900')
+
+    def test_repeated_existing_key_upsert(self):
+        Hospital.objects.create(**hospital('City General'))
+        result = Importer('hospitals').run(records(hospital('City General', fees_range='₹700'),
+                                                   hospital('City General', fees_range='₹900')))
+        self.assertEqual(self.counts(result), (0, 1, 0, 1, 0))
+        self.assertEqual(Hospital.objects.get().fees_range, '₹900')
+
+    def test_repeated_key_skip(self):
+        result = Importer('hospitals', mode='skip').run(records(hospital('City General', fees_range='₹700'),
+                                                                hospital('City General', fees_range='₹900')))
+        self.assertEqual(self.counts(result), (1, 0, 0, 1, 0))
+        self.assertEqual(Hospital.objects.get().fees_range, '₹700')
+
+        result = Importer('hospitals', mode='skip').run(records(hospital('City General'), hospital('City General')))
+        self.assertEqual(self.counts(result), (0, 0, 1, 1, 0))
+
+    def test_counts_add_up_across_batches(self):
+        rows = records(*(hospital(f'Hospital {n % 3}') for n in range(7)))
+        result = Importer('hospitals', batch_size=4).run(rows)
+        # The second batch updates what the first created
+        self.assertEqual(self.counts(result), (3, 3, 0, 1, 0))
+        self.assertEqual(result.read, sum(self.counts(result)))
+
+
+class DoctorImportTests(TestCase):
+
+    def setUp(self):
+        self.hospital = Hospital.objects.create(**hospital('City General'))
+
+    def doctor(self, reference, name='Dr. Rao'):
+        return {'name': name, 'specialty': 'Cardiology', 'experience': '12', 'fees': '800', 'hospital': reference}
+
+    def test_hospital_reference(self):
+        padded = f'00{self.hospital.pk}'
+        result = Importer('doctors').run(records(
+            self.doctor(str(self.hospital.pk)), self.doctor(padded, 'Dr. Iyer'), self.doctor(' City General ', 'Dr. Shah'),
+            self.doctor('9999', 'Dr. Nobody'), self.doctor('', 'Dr. Nowhere'),
+        ))
+        self.assertEqual((result.created, result.invalid), (3, 2))
+        self.assertEqual(set(Doctor.objects.values_list('hospital_id', flat=True)), {self.hospital.pk})
+        self.assertEqual(result.errors, [(5, 'hospital: No hospital 9999.'), (6, 'hospital: This field is required.')])
+
+
+class PartialImportTests(TestCase):
+    """A file that turns bad part way keeps the batches before it, and their caches are refreshed"""
+
+    def upload(self):
+        header = b'name,address,city,state,fees_range\n'
+        good = b''.join(f'Hospital {n},Main Road,Pune,Maharashtra,500\n'.encode() for n in range(1000))
+        return io.BytesIO(header + good + b'Broken \xff,Main Road,Pune,Maharashtra,500\n' * 10)
+
+    def test_error_after_saved_batches(self):
+        with mock.patch('healthcare.bulk_import.ImportKind.finish') as finish:
+            with self.assertRaises(ImportFileError) as raised:
+                Importer('hospitals', batch_size=100).run(read_records(self.upload(), 'csv'))
+        finish.assert_called_once()
+        self.assertEqual(raised.exception.result.created, Hospital.objects.count())
+        self.assertGreater(Hospital.objects.count(), 0)
+        self.assertIn('already saved', str(raised.exception))
+
+    def test_dry_run_error_saves_nothing(self):
+        with mock.patch('healthcare.bulk_import.ImportKind.finish') as finish:
+            with self.assertRaises(ImportFileError) as raised:
+                Importer('hospitals', batch_size=100, dry_run=True).run(read_records(self.upload(), 'csv'))
+        finish.assert_not_called()
+        self.assertNotIn('already saved', str(raised.exception))
+        self.assertFalse(Hospital.objects.exists())
+
+    def test_batch_size_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            Importer('hospitals', batch_size=0)
+        with self.assertRaises(CommandError):
+            call_command('import_catalog', 'hospitals', '-', '--format', 'csv', '--batch-size', '0')
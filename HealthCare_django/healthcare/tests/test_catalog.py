@@ -0,0 +1,112 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from healthcare.catalog import catalog_version, get_hospital_directory, get_hospitals
+from healthcare.models import Doctor, Hospital
+
+from .utils import log_in
+
+
+# The tests run in one process, so the local-memory cache is as good as a shared one here
+@override_settings(CATALOG_CACHE_TIMEOUT=600)
+class CatalogFreshnessTests(TestCase):
+    """The cached catalogue must never outlive the rows it was built from"""
+
+    def setUp(self):
+        cache.clear()
+        self.hospital = Hospital.objects.create(
+            name='City General', address='1 Main Road', city='Pune', state='Maharashtra', fees_range='₹400-₹900',
+        )
+        self.doctor = Doctor.objects.create(
+            name='Dr. Rao', specialty='Cardiology', experience=12, fees=800, hospital=self.hospital,
+        )
+
+    def save(self, instance):
+        # Invalidation runs on commit, which TestCase would otherwise never reach
+        with self.captureOnCommitCallbacks(execute=True):
+            instance.save()
+
+    def delete(self, instance):
+        with self.captureOnCommitCallbacks(execute=True):
+            instance.delete()
+
+    def hospital_names(self):
+        return [hospital['name'] for hospital in get_hospitals()]
+
+    def test_new_hospital_appears(self):
+        self.assertEqual(self.hospital_names(), ['City General'])
+        self.save(Hospital(name='Lifeline', address='2 Main Road', city='Delhi', state='Delhi', fees_range='₹500'))
+        self.assertEqual(self.hospital_names(), ['City General', 'Lifeline'])
+
+    def test_hospital_rename(self):
+        self.assertIsNotNone(get_hospital_directory('City General'))
+        self.hospital.name = 'City General Hospital'
+        self.save(self.hospital)
+
+        self.assertEqual(self.hospital_names(), ['City General Hospital'])
+        self.assertIsNone(get_hospital_directory('City General'))
+        directory = get_hospital_directory('City General Hospital')
+        self.assertEqual(directory['hospital']['name'], 'City General Hospital')
+        self.assertEqual([doctor['name'] for doctor in directory['doctors']], ['Dr. Rao'])
+
+    def test_hospital_delete(self):
+        get_hospitals()
+        get_hospital_directory('City General')
+        self.delete(self.hospital)
+        self.assertEqual(get_hospitals(), [])
+        self.assertIsNone(get_hospital_directory('City General'))
+
+    def test_doctor_save_and_delete(self):
+        self.assertEqual(len(get_hospital_directory('City General')['doctors']), 1)
+
+        self.doctor.fees = 950
+        self.save(self.doctor)
+        self.assertEqual(get_hospital_directory('City General')['doctors'][0]['fees'], 950)
+
+        self.save(Doctor(name='Dr. Iyer', specialty='Neurology', experience=4, fees=600, hospital=self.hospital))
+        self.assertEqual([doctor['name'] for doctor in get_hospital_directory('City General')['doctors']],
+                         ['Dr. Rao', 'Dr. Iyer'])
+
+        self.delete(self.doctor)
+        self.assertEqual([doctor['name'] for doctor in get_hospital_directory('City General')['doctors']],
+                         ['Dr. Iyer'])
+
+    def test_cached_dashboard_fragment(self):
+        log_in(self.client)
+        response = self.client.get(reverse('patient_dashboard'))
+        self.assertContains(response, 'City General')
+
+        self.hospital.name = 'Renamed Hospital'
+        self.save(self.hospital)
+        response = self.client.get(reverse('patient_dashboard'))
+        self.assertContains(response, 'Renamed Hospital')
+        self.assertNotContains(response, 'City General')
+
+    def test_rolled_back_save_keeps_version(self):
+        version = catalog_version()
+        get_hospitals()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    self.hospital.name = 'Never Committed'
+                    self.hospital.save()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertEqual(catalog_version(), version)
+        self.assertEqual(self.hospital_names(), ['City General'])
+
+    def test_committed_save_bumps_version(self):
+        version = catalog_version()
+        self.save(self.hospital)
+        self.assertNotEqual(catalog_version(), version)
+
+    @override_settings(CATALOG_CACHE_TIMEOUT=0)
+    def test_zero_timeout_skips_the_cache(self):
+        get_hospitals()
+        # update() sends no signals, so only an uncached read can see it
+        Hospital.objects.filter(pk=self.hospital.pk).update(name='Seen Directly')
+        self.assertEqual(self.hospital_names(), ['Seen Directly'])
@@ -0,0 +1,56 @@
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.contrib.sessions.backends.cache import SessionStore
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from accounts.jwt_auth import FlaskTokenVerifier, InvalidFlaskToken
+from accounts.middleware import FlaskAuthMiddleware, flask_token_required
+
+from .utils import flask_token, log_in
+
+
+def expire(client):
+    session = client.session
+    session['auth_token'] = flask_token(lifetime=-60)
+    session.save()
+
+
+class FlaskTokenTests(TestCase):
+    """An expired Flask token only matters to views that send it to Flask"""
+
+    def setUp(self):
+        log_in(self.client)
+
+    def test_expired_token_keeps_django_session(self):
+        expire(self.client)
+        for name in ('about', 'patient_dashboard', 'medical_records'):
+            response = self.client.get(reverse(name))
+            self.assertEqual(response.status_code, 200, name)
+        self.assertIn('auth_token', self.client.session)
+
+    def test_expired_token_sends_flask_views_to_login(self):
+        @flask_token_required
+        def view(request):
+            return HttpResponse()
+
+        middleware = FlaskAuthMiddleware(lambda request: HttpResponse())
+        request = RequestFactory().get('/appointments/flask/')
+        request.session = SessionStore()
+        request._messages = FallbackStorage(request)
+
+        request.session['auth_token'] = flask_token()
+        self.assertIsNone(middleware.process_view(request, view, (), {}))
+        self.assertEqual(request.flask_claims['sub'], '1')
+
+        request.session['auth_token'] = flask_token(lifetime=-60)
+        response = middleware.process_view(request, view, (), {})
+        self.assertRedirects(response, reverse('login'), fetch_redirect_response=False)
+        self.assertNotIn('auth_token', request.session)
+
+    def test_refresh_token_rejected(self):
+        verifier = FlaskTokenVerifier(secret='test-secret')
+        with self.settings(FLASK_JWT_SECRET='test-secret'):
+            self.assertEqual(verifier.verify(flask_token(7))['sub'], '7')
+            with self.assertRaises(InvalidFlaskToken):
+                verifier.verify(flask_token(7, type='refresh'))
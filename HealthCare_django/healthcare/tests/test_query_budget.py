@@ -0,0 +1,101 @@
+from datetime import time, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from healthcare import views
+from healthcare.models import Appointment, CartItem, Doctor, Hospital, Medicine, MedicineOrder
+
+from .utils import log_in
+
+ROWS = 40
+
+
+@override_settings(QUERY_BUDGET_STRICT=True)
+class QueryBudgetTests(TestCase):
+    """Budgeted views stay within budget, and run as many queries for many rows as for one"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = log_in(self.client, staff=True)
+        self.hospital = Hospital.objects.create(
+            name='City General', address='1 Main Road', city='Pune', state='Maharashtra', fees_range='₹400-₹900',
+        )
+
+    def add_rows(self, count):
+        start = Hospital.objects.count()
+        for n in range(start, start + count):
+            hospital = Hospital.objects.create(
+                name=f'Hospital {n}', address='Main Road', city='Pune', state='Maharashtra', fees_range='₹500',
+            )
+            doctor = Doctor.objects.create(
+                name=f'Dr. {n}', specialty='Cardiology', experience=5, fees=500, hospital=hospital,
+            )
+            medicine = Medicine.objects.create(name=f'Medicine {n}', description='Tablets', price=20, stock=100)
+            for days in (n + 1, -n - 1):
+                Appointment.objects.create(
+                    patient=self.user, doctor=doctor, hospital=hospital, name='Test Patient', phone='9876543210',
+                    date=timezone.localdate() + timedelta(days=days), time=time(10), reason='Checkup',
+                )
+            MedicineOrder.objects.create(patient=self.user, medicine=medicine, quantity=2)
+            CartItem.objects.create(patient=self.user, medicine=medicine, quantity=1)
+
+    def queries(self, fetch):
+        cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            response = fetch()
+        self.assertEqual(response.status_code, 200)
+        return len(captured)
+
+    def assertFlat(self, fetch):
+        self.add_rows(1)
+        one = self.queries(fetch)
+        self.add_rows(ROWS)
+        self.assertEqual(self.queries(fetch), one)
+
+    def get(self, name):
+        return lambda: self.client.get(reverse(name))
+
+    def call(self, view, template):
+        # The admin/ routes are shadowed by django.contrib.admin and their
+        # templates are not in the tree, so the view renders a stand-in that
+        # touches the same relations
+        def render(request, template_name, context):
+            return HttpResponse(Template(template).render(Context(context)))
+
+        def fetch():
+            request = RequestFactory().get('/')
+            request.user = self.user
+            with mock.patch('healthcare.views.render', render):
+                return view(request)
+        return fetch
+
+    def test_patient_dashboard(self):
+        self.assertFlat(self.get('patient_dashboard'))
+
+    def test_my_appointments(self):
+        self.assertFlat(self.get('my_appointments'))
+
+    def test_my_medicine_orders(self):
+        self.assertFlat(self.get('my_medicine_orders'))
+
+    def test_view_cart(self):
+        self.assertFlat(self.get('view_cart'))
+
+    def test_admin_doctor_list(self):
+        self.assertFlat(self.call(
+            views.admin_doctor_list, '{% for doctor in doctors %}{{ doctor.name }} {{ doctor.hospital.name }}{% endfor %}',
+        ))
+
+    def test_admin_appointment_list(self):
+        self.assertFlat(self.call(views.admin_appointment_list, (
+            '{% for appointment in appointments %}{{ appointment.patient.email }} '
+            '{{ appointment.doctor.name }} {{ appointment.hospital.name }}{% endfor %}'
+        )))
@@ -0,0 +1,57 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from healthcare.models import Medicine
+from healthcare.search import InvertedIndexMedicineSearch
+
+
+class InvertedIndexSharedVersionTests(TestCase):
+    """The in-memory medicine index of two processes, played by two objects sharing the cache"""
+
+    def setUp(self):
+        cache.clear()
+        self.aspirin = Medicine.objects.create(name='Aspirin', description='Pain relief', price=20, stock=100)
+        self.writer = InvertedIndexMedicineSearch(check_interval=0)
+        self.reader = InvertedIndexMedicineSearch(check_interval=0)
+        # The model signals feed the writer, as they feed the index of the process saving
+        patcher = mock.patch('healthcare.signals.get_medicine_search', return_value=self.writer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def save(self, medicine):
+        with self.captureOnCommitCallbacks(execute=True):
+            medicine.save()
+
+    def test_other_process_sees_add_and_delete(self):
+        self.assertEqual(self.reader.search('asp'), [self.aspirin.pk])
+        self.writer.search('asp')
+        forte = Medicine(name='Aspirin Forte', description='Pain relief', price=30, stock=10)
+        self.save(forte)
+        self.assertEqual(sorted(self.reader.search('asp')), [self.aspirin.pk, forte.pk])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.aspirin.delete()
+        self.assertEqual(self.reader.search('asp'), [forte.pk])
+
+    def test_other_process_sees_rebuild(self):
+        self.reader.search('asp')
+        Medicine.objects.filter(pk=self.aspirin.pk).update(name='Paracetamol')
+        self.writer.rebuild()
+        self.assertEqual(self.reader.search('asp'), [])
+        self.assertEqual(self.reader.search('para'), [self.aspirin.pk])
+
+    def test_staleness_bounded_by_check_interval(self):
+        self.reader.versions.interval = 60
+        self.reader.search('asp')
+        self.save(Medicine(name='Aspirin Forte', description='Pain relief', price=30, stock=10))
+        self.assertEqual(len(self.reader.search('asp')), 1)
+        self.reader.versions.checked -= 60
+        self.assertEqual(len(self.reader.search('asp')), 2)
+
+    def test_own_edit_needs_no_rebuild(self):
+        self.writer.search('asp')
+        self.save(Medicine(name='Aspirin Forte', description='Pain relief', price=30, stock=10))
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self.writer.search('asp')), 2)
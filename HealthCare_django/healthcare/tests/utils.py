@@ -0,0 +1,26 @@
+import time
+
+import jwt
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+User = get_user_model()
+
+
+def flask_token(user_id=1, lifetime=900, **claims):
+    """An access token as the Flask API issues them, signed with the shared secret"""
+    payload = {'sub': str(user_id), 'type': 'access', 'exp': int(time.time()) + lifetime, **claims}
+    return jwt.encode(payload, settings.FLASK_JWT_SECRET, algorithm='HS256')
+
+
+def log_in(client, email='patient@example.com', staff=False):
+    """Log client in the way accounts.views.finish_login does; returns the user"""
+    user = User.objects.filter(email=email).first() or User.objects.create_user(
+        email=email, full_name='Test Patient', is_staff=staff,
+    )
+    client.force_login(user)
+    session = client.session
+    session['auth_token'] = flask_token(user.pk, email=email)
+    session['user_data'] = {'email': email, 'full_name': user.full_name}
+    session.save()
+    return user
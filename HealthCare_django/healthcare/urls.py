@@ -11,6 +11,8 @@ urlpatterns = [
     path('dashboard/', views.patient_dashboard, name='patient_dashboard'),
     path('doctors/<str:hospital_name>/', views.doctor_list, name='doctor_list'),
     path('doctor/<int:doctor_id>/', views.doctor_profile, name='doctor_profile'),
+    path('api/autocomplete/', views.autocomplete, name='autocomplete'),
+    path('api/availability/', views.available_doctors, name='available_doctors'),
     path('appointments/', views.my_appointments, name='my_appointments'),
     path('medical-records/', views.medical_records, name='medical_records'),
     path('appointment/book/<int:doctor_id>/', views.appointment_form, name='appointment_form'),
@@ -21,6 +23,7 @@ urlpatterns = [
     path('appointment/reschedule/<int:appointment_id>/', views.reschedule_appointment, name='reschedule_appointment'),
     path('logout/', views.logout_view, name='logout'),
     path('dashboard/hospital/add/', views.dashboard_add_hospital, name='dashboard_add_hospital'),
+    path('dashboard/import/', views.dashboard_import, name='dashboard_import'),
     path('hospital/<int:hospital_id>/doctor/add/', views.add_doctor_for_hospital, name='add_doctor_for_hospital'),
     path('doctor/<int:doctor_id>/delete/from/<str:hospital_name>/', views.delete_doctor_from_list, name='delete_doctor_from_list'),
     path('cart/', views.view_cart, name='view_cart'),
@@ -0,0 +1,52 @@
+import time
+
+from django.core.cache import cache
+
+
+class SharedVersion:
+    """Tells a per-process copy of shared data that another process changed it.
+
+    Writers call bumped() after each committed write; it increments a
+    version kept in the cache under key. A copy calls built() just before
+    it reads the rows it is built from, then stale() before serving, which
+    compares the versions at most every interval seconds. So a copy lags a
+    write made elsewhere by at most interval seconds, given a cache shared
+    between processes; a per-process cache such as LocMemCache shares
+    nothing. Callers hold their own lock around these calls.
+    """
+
+    def __init__(self, key, interval=2):
+        self.key = key
+        self.interval = interval
+        self.version = None
+        self.checked = 0
+
+    def current(self):
+        version = cache.get(self.key)
+        if version is None:
+            cache.add(self.key, time.time_ns(), None)
+            version = cache.get(self.key)
+        return version
+
+    def built(self):
+        # Read before the rows, so a write landing mid-build shows up as a newer version
+        self.version = self.current()
+        self.checked = time.monotonic()
+
+    def stale(self):
+        now = time.monotonic()
+        if now - self.checked < self.interval:
+            return False
+        self.checked = now
+        return self.current() != self.version
+
+    def bumped(self):
+        """Record a write; the copy stays current only if it applied the write and no one else wrote since"""
+        try:
+            version = cache.incr(self.key)
+        except ValueError:
+            # Evicted; a timestamp cannot collide with a version seen before
+            cache.set(self.key, time.time_ns(), None)
+            return
+        if self.version is not None and version == self.version + 1:
+            self.version = version
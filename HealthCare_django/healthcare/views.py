@@ -3,19 +3,30 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils.decorators import method_decorator
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from .models import Hospital, Doctor, Appointment, MedicalRecord, AdminUser, Medicine, MedicineOrder, CartItem
 from .forms import (
     AppointmentForm, PaymentForm, HospitalForm,
     DoctorForm, MedicalRecordForm, RescheduleAppointmentForm,
-    MedicineOrderForm, MedicineForm
+    MedicineOrderForm, MedicineForm, CatalogImportForm
 )
 from django.contrib.auth import get_user_model
 from django.contrib.admin.views.decorators import staff_member_required
 from django.utils import timezone
-from django.http import HttpResponseRedirect
+from django.conf import settings
+from datetime import timedelta
+from django.http import Http404, HttpResponseRedirect, JsonResponse
 from django.contrib.auth import logout
 from .add_external_medicine import fetch_external_medicines  # Import the function
+from .query_budget import query_budget
+from .orders import checkout_cart, OutOfStock
+from .search import search_medicines
+from .autocomplete import KINDS, get_autocomplete_index, result_url
+from .pagination import paginate_keyset, paginate_ranked
+from .catalog import catalog_context, get_hospital_directory, get_hospitals
+from .slots import SlotEngine, find_available
+from .bulk_import import ImportFileError, Importer, detect_format, read_records
+from django.db import IntegrityError, transaction
 
 User = get_user_model()
 
@@ -29,8 +40,7 @@ def logout_view(request):
 def index(request):
     if request.user.is_authenticated and 'auth_token' in request.session:
         return redirect('patient_dashboard')
-    hospitals = Hospital.objects.all()
-    return render(request, 'index.html', {'hospitals': hospitals})
+    return render(request, 'index.html', {'hospitals': get_hospitals()})
 
 def about(request):
     return render(request, 'about.html')
@@ -43,6 +53,7 @@ def blog(request):
 
 # --- Patient Dashboard ---
 @login_required
+@query_budget(5)
 def patient_dashboard(request):
     if 'auth_token' not in request.session:
         messages.warning(request, "Please log in to access your dashboard.")
@@ -52,78 +63,157 @@ def patient_dashboard(request):
     upcoming_appointments = Appointment.objects.filter(
         patient=request.user,
         date__gte=timezone.now().date()
-    ).order_by('date', 'time')
+    ).select_related('doctor', 'hospital').order_by('date', 'time')
     
     past_appointments = Appointment.objects.filter(
         patient=request.user,
         date__lt=timezone.now().date()
-    ).order_by('-date', '-time')
-    
-    hospitals = Hospital.objects.all()
+    ).select_related('doctor', 'hospital').order_by('-date', '-time')
     
     return render(request, 'patient_dashboard.html', {
         'upcoming_appointments': upcoming_appointments,
         'past_appointments': past_appointments,
-        'hospitals': hospitals
+        'hospitals': get_hospitals(),
+        **catalog_context(),
     })
 
 # --- Doctor Views ---
 def doctor_list(request, hospital_name):
-    hospital = get_object_or_404(Hospital, name=hospital_name)
-    doctors = Doctor.objects.filter(hospital=hospital)
+    directory = get_hospital_directory(hospital_name)
+    if directory is None:
+        raise Http404("No Hospital matches the given query.")
     message = request.session.pop('doctor_message', None)
     if message:
         messages.success(request, message)
     return render(request, 'doctor_list.html', {
-        'hospital': hospital,
-        'doctors': doctors
+        'hospital': directory['hospital'],
+        'doctors': directory['doctors']
     })
 
 def doctor_profile(request, doctor_id):
-    doctor = get_object_or_404(Doctor, id=doctor_id)
+    doctor = get_object_or_404(Doctor.objects.select_related('hospital'), id=doctor_id)
     return render(request, 'doctor_profile.html', {'doctor': doctor})
 
+def autocomplete(request):
+    """Typeahead suggestions for medicines, doctors and hospitals as JSON"""
+    query = request.GET.get('q', '')
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 50)
+    except ValueError:
+        return JsonResponse({'error': 'limit must be an integer'}, status=400)
+    kinds = tuple(kind for kind in request.GET.get('types', '').split(',') if kind in KINDS) or KINDS
+
+    results = get_autocomplete_index().search(query, limit=limit, kinds=kinds)
+    return JsonResponse({
+        'query': query,
+        'results': [
+            {'type': kind, 'id': pk, 'label': label, 'detail': detail, 'url': result_url(kind, pk, label)}
+            for kind, pk, label, detail in results
+        ],
+    })
+
+def available_doctors(request):
+    """Doctors ranked by their first free slot as JSON, filtered by specialty, city and hospital"""
+    try:
+        days = min(max(int(request.GET.get('days', 7)), 1), getattr(settings, 'SLOT_SEARCH_DAYS', 30))
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 50)
+    except ValueError:
+        return JsonResponse({'error': 'days and limit must be integers'}, status=400)
+
+    doctors = Doctor.objects.all()
+    if request.GET.get('specialty'):
+        doctors = doctors.filter(specialty__iexact=request.GET['specialty'])
+    if request.GET.get('city'):
+        doctors = doctors.filter(hospital__city__iexact=request.GET['city'])
+    if request.GET.get('hospital'):
+        doctors = doctors.filter(hospital__name=request.GET['hospital'])
+
+    # Bookings must be for a future date, so the search starts tomorrow
+    start_date = timezone.localdate() + timedelta(days=1)
+    results = find_available(doctors, start_date=start_date, days=days, limit=limit)
+    return JsonResponse({
+        'results': [
+            {
+                'id': doctor.id,
+                'name': doctor.name,
+                'specialty': doctor.specialty,
+                'experience': doctor.experience,
+                'fees': str(doctor.fees),
+                'hospital': doctor.hospital.name,
+                'city': doctor.hospital.city,
+                'url': reverse('appointment_form', args=[doctor.id]),
+                'slots': [{'date': day.isoformat(), 'time': start.strftime('%H:%M')} for day, start in slots],
+            }
+            for doctor, slots in results
+        ],
+    })
+
 # --- Appointment Views ---
 @login_required
+@query_budget(4)
 def my_appointments(request):
+    appointments = Appointment.objects.select_related('doctor', 'hospital')
     if request.user.is_staff:
-        upcoming_appointments = Appointment.objects.filter(date__gte=timezone.now().date()).order_by('date', 'time')
-        past_appointments = Appointment.objects.filter(date__lt=timezone.now().date()).order_by('-date', '-time')
+        appointments = appointments.select_related('patient')
         is_admin = True
     else:
-        upcoming_appointments = Appointment.objects.filter(patient=request.user, date__gte=timezone.now().date()).order_by('date', 'time')
-        past_appointments = Appointment.objects.filter(patient=request.user, date__lt=timezone.now().date()).order_by('-date', '-time')
+        appointments = appointments.filter(patient=request.user)
         is_admin = False
 
+    today = timezone.now().date()
+    upcoming_appointments = paginate_keyset(
+        request, appointments.filter(date__gte=today), ('date', 'time', 'id'), prefix='upcoming_')
+    past_appointments = paginate_keyset(
+        request, appointments.filter(date__lt=today), ('-date', '-time', '-id'), prefix='past_')
+
     return render(request, 'my_appointments.html', {
         'upcoming_appointments': upcoming_appointments,
         'past_appointments': past_appointments,
         'is_admin': is_admin
     })
 
+def slot_context(doctor):
+    """Template context listing the doctor's next free slots, from tomorrow on"""
+    if doctor is None:
+        return {}
+    free_slots = SlotEngine(doctor).free_slots(start_date=timezone.localdate() + timedelta(days=1))
+    context = {'free_slots': free_slots}
+    if not free_slots:
+        context['no_availability_message'] = f"Dr. {doctor.name} has no free slots in the coming weeks."
+    return context
+
+SLOT_TAKEN_MESSAGE = "That slot was just booked by someone else. Please pick another time."
+
 @login_required
 def appointment_form(request, doctor_id=None):
     doctor = get_object_or_404(Doctor, id=doctor_id) if doctor_id else None
     hospital = doctor.hospital if doctor else None
 
     if request.method == 'POST':
-        form = AppointmentForm(request.POST)
+        form = AppointmentForm(request.POST, doctor=doctor)
         if form.is_valid():
             appointment = form.save(commit=False)
             appointment.patient = request.user
             appointment.doctor = doctor
             appointment.hospital = hospital
-            appointment.save()
-            request.session['appointment_id'] = appointment.id
-            return redirect('payment')
+            try:
+                # The unique (doctor, date, time) constraint settles two patients racing for one slot
+                with transaction.atomic():
+                    appointment.save()
+            except IntegrityError:
+                form.add_error('time', SLOT_TAKEN_MESSAGE)
+            else:
+                request.session['appointment_id'] = appointment.id
+                return redirect('payment')
     else:
         initial = {'name': request.user.full_name} if request.user.is_authenticated else {}
-        form = AppointmentForm(initial=initial)
+        form = AppointmentForm(initial=initial, doctor=doctor)
 
     return render(request, 'appointment_form.html', {
         'form': form,
         'doctor': doctor,
-        'hospital': hospital
+        'hospital': hospital,
+        **slot_context(doctor),
     })
 
 @login_required
@@ -167,12 +257,21 @@ def reschedule_appointment(request, appointment_id):
     if request.method == 'POST':
         form = RescheduleAppointmentForm(request.POST, instance=appointment)
         if form.is_valid():
-            form.save()
-            messages.success(request, 'Your appointment has been rescheduled successfully.')
-            return redirect('my_appointments')
+            try:
+                with transaction.atomic():
+                    form.save()
+            except IntegrityError:
+                form.add_error('time', SLOT_TAKEN_MESSAGE)
+            else:
+                messages.success(request, 'Your appointment has been rescheduled successfully.')
+                return redirect('my_appointments')
     else:
         form = RescheduleAppointmentForm(instance=appointment)
-    return render(request, 'reschedule_appointment.html', {'form': form, 'appointment': appointment})
+    return render(request, 'reschedule_appointment.html', {
+        'form': form,
+        'appointment': appointment,
+        **slot_context(appointment.doctor),
+    })
 
 # --- Medical Records ---
 @login_required
@@ -212,8 +311,9 @@ def admin_hospital_delete(request, pk):
 
 # --- Admin: Doctors ---
 @staff_member_required
+@query_budget(3)
 def admin_doctor_list(request):
-    return render(request, 'admin/doctor_list.html', {'doctors': Doctor.objects.all()})
+    return render(request, 'admin/doctor_list.html', {'doctors': Doctor.objects.select_related('hospital')})
 
 @staff_member_required
 def admin_doctor_create(request):
@@ -242,8 +342,10 @@ def admin_doctor_delete(request, pk):
 
 # --- Admin: Appointments ---
 @staff_member_required
+@query_budget(3)
 def admin_appointment_list(request):
-    return render(request, 'admin/appointment_list.html', {'appointments': Appointment.objects.all()})
+    appointments = Appointment.objects.select_related('patient', 'doctor', 'hospital')
+    return render(request, 'admin/appointment_list.html', {'appointments': appointments})
 
 @staff_member_required
 def admin_appointment_update(request, pk):
@@ -290,9 +392,9 @@ def medicine_list(request):
             form = MedicineForm()
     
     if query:
-        medicines = Medicine.objects.filter(name__icontains=query)
+        medicines = paginate_ranked(request, lambda offset, limit: search_medicines(query, limit=limit, offset=offset))
     else:
-        medicines = Medicine.objects.all()
+        medicines = paginate_keyset(request, Medicine.objects.all(), ('name', 'id'))
     
     return render(request, 'medicine/medicine_list.html', {
         'medicines': medicines,
@@ -328,8 +430,9 @@ def medicine_order_success(request):
     return render(request, 'medicine/order_success.html')
 
 @login_required
+@query_budget(3)
 def my_medicine_orders(request):
-    orders = MedicineOrder.objects.filter(patient=request.user)
+    orders = MedicineOrder.objects.filter(patient=request.user).select_related('medicine')
     return render(request, 'medicine/my_orders.html', {'orders': orders})
 
 # --- Additional Admin Utilities ---
@@ -361,6 +464,23 @@ def add_doctor_for_hospital(request, hospital_id):
         'hospital': hospital
     })
 
+@staff_member_required
+def dashboard_import(request):
+    """Import hospitals, doctors or medicines from an uploaded CSV or NDJSON file"""
+    form = CatalogImportForm(request.POST or None, request.FILES or None)
+    result = None
+    if form.is_valid():
+        upload = form.cleaned_data['file']
+        importer = Importer(form.cleaned_data['kind'], mode=form.cleaned_data['mode'],
+                            dry_run=form.cleaned_data['dry_run'])
+        try:
+            # Large uploads are already on disk; rows are read from it in batches
+            result = importer.run(read_records(upload, detect_format(upload.name)))
+        except ImportFileError as e:
+            form.add_error('file', str(e))
+            result = e.result
+    return render(request, 'admin/catalog_import.html', {'form': form, 'result': result})
+
 @staff_member_required
 def delete_doctor_from_list(request, doctor_id, hospital_name):
     doctor = get_object_or_404(Doctor, id=doctor_id)
@@ -392,8 +512,9 @@ def add_to_cart(request, medicine_id):
     return redirect('medicine_list')
 
 @login_required
+@query_budget(3)
 def view_cart(request):
-    cart_items = CartItem.objects.filter(patient=request.user)
+    cart_items = CartItem.objects.filter(patient=request.user).select_related('medicine')
     total_amount = sum(item.total_price for item in cart_items)
     
     return render(request, 'medicine/cart.html', {
@@ -403,35 +524,23 @@ def view_cart(request):
 
 @login_required
 def remove_from_cart(request, medicine_id):
-    cart_item = get_object_or_404(CartItem, patient=request.user, medicine_id=medicine_id)
+    cart_item = get_object_or_404(CartItem.objects.select_related('medicine'), patient=request.user, medicine_id=medicine_id)
     cart_item.delete()
     messages.success(request, f"{cart_item.medicine.name} removed from your cart!")
     return redirect('view_cart')
 
 @login_required
+@query_budget(8)
 def checkout(request):
-    cart_items = CartItem.objects.filter(patient=request.user)
+    try:
+        orders = checkout_cart(request.user)
+    except OutOfStock as e:
+        messages.error(request, str(e))
+        return redirect('view_cart')
     
-    if not cart_items:
+    if not orders:
         messages.warning(request, "Your cart is empty!")
         return redirect('view_cart')
     
-    for item in cart_items:
-        if item.medicine.stock < item.quantity:
-            messages.error(request, f"Not enough stock for {item.medicine.name}. Available: {item.medicine.stock}")
-            return redirect('view_cart')
-        
-        order = MedicineOrder(
-            patient=request.user,
-            medicine=item.medicine,
-            quantity=item.quantity
-        )
-        order.save()
-        
-        item.medicine.stock -= item.quantity
-        item.medicine.save()
-    
-    cart_items.delete()
-    
     messages.success(request, "Your order has been placed successfully!")
-    return redirect('medicine_order_success')
\ No newline at end of file
+    return redirect('medicine_order_success')
@@ -1,17 +1,20 @@
 import re
-import json
 import os
+import base64
+import click
 from datetime import datetime, date
 from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify 
 from flask_restful import Api
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import login_user, logout_user, login_required, current_user
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
 from flask_restful import Resource
 from flask_cors import CORS
 
 # Import extensions
-from extensions import db, jwt, login_manager
+from extensions import db, jwt, login_manager, identity, appointments, doctors, passwords, login_throttle
+from password_hashing import HashingBusy
+from streaming import stream_rows, wants_ndjson
+from doctor_directory import DOCTOR_FIELDS, SORT_KEYS
 
 # Ensure resource directory exists
 if not os.path.exists('resource'):
@@ -20,9 +23,40 @@ if not os.path.exists('resource'):
 # Create the Flask app
 app = Flask(__name__)
 app.secret_key = os.getenv("APP_SECRET_KEY", "default_secret_key")
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///users.db"
+app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL", "sqlite:///users.db")
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY", "default_jwt_key")
+# Set JWT_ALGORITHM=RS256 plus key files to let Django verify tokens with
+# the public key published at /api/jwks instead of sharing JWT_SECRET_KEY
+app.config["JWT_ALGORITHM"] = os.getenv("JWT_ALGORITHM", "HS256")
+app.config["JWT_KEY_ID"] = os.getenv("JWT_KEY_ID", "flask-1")
+if os.getenv("JWT_PRIVATE_KEY_FILE"):
+    with open(os.environ["JWT_PRIVATE_KEY_FILE"]) as f:
+        app.config["JWT_PRIVATE_KEY"] = f.read()
+if os.getenv("JWT_PUBLIC_KEY_FILE"):
+    with open(os.environ["JWT_PUBLIC_KEY_FILE"]) as f:
+        app.config["JWT_PUBLIC_KEY"] = f.read()
+app.config["APPOINTMENT_BACKEND"] = os.getenv("APPOINTMENT_BACKEND", "sql")
+app.config["APPOINTMENTS_LOG"] = "appointments.log"
+app.config["APPOINTMENTS_FILE"] = "appointments.json"  # legacy store, see import-appointments
+app.config["APPOINTMENTS_PAGE_SIZE"] = 50
+app.config["APPOINTMENTS_MAX_PAGE_SIZE"] = 500
+app.config["APPOINTMENTS_BULK_MAX"] = 1000  # items per bulk create, fetch or cancel
+app.config["STREAM_BATCH_SIZE"] = 500
+app.config["DOCTOR_DIRECTORY_SOURCE"] = os.getenv("DOCTOR_DIRECTORY_SOURCE", "file")  # or "db"
+app.config["DOCTORS_FILE"] = "doctors.json"
+app.config["DOCTOR_FEE_BANDS"] = [500, 750, 1000, 1500]
+# Cost profile for new hashes; older hashes are upgraded on the next login
+app.config["PASSWORD_HASH_METHOD"] = os.getenv("PASSWORD_HASH_METHOD", "pbkdf2:sha256")
+app.config["PASSWORD_HASH_WORKERS"] = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+app.config["PASSWORD_HASH_MAX_PENDING"] = 64
+# Login attempts allowed as (attempts, seconds); only failures count per email
+app.config["LOGIN_THROTTLE_PER_IP"] = (30, 60)
+app.config["LOGIN_THROTTLE_PER_EMAIL"] = (10, 900)
+# Shared with Django (FLASK_LOGIN_PROXY_SECRET), whose logins it throttles itself
+app.config["LOGIN_THROTTLE_PROXY_SECRET"] = os.getenv("LOGIN_PROXY_SECRET")
+# Seconds a session may reuse its cached identity before rereading the user
+app.config["IDENTITY_CACHE_MAX_AGE"] = 300
 
 # Initialize extensions
 db.init_app(app)
@@ -30,29 +64,146 @@ api = Api(app)
 jwt.init_app(app)
 login_manager.init_app(app)
 login_manager.login_view = "login"
+identity.init_app(app)
+appointments.init_app(app)
+doctors.init_app(app)
+passwords.init_app(app)
+login_throttle.init_app(app)
 
 # Import models and resources after extension initialization to avoid circular imports
-from models import User
-from resource.app_resource import LoginAPI, RegisterAPI,UserDetailAPI,UserListAPI
+from models import User, Appointment, Doctor
+from resource.app_resource import LoginAPI, RegisterAPI,UserDetailAPI,UserListAPI,JWKSAPI,LoginThrottleAPI
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
-
-APPOINTMENTS_FILE = "appointments.json"
-
-if not os.path.exists(APPOINTMENTS_FILE):
-    with open(APPOINTMENTS_FILE, "w") as f:
-        json.dump([], f)
+    return identity.load(user_id, User)
+
+@app.cli.command("import-appointments")
+@click.argument("path", default="appointments.json")
+def import_appointments(path):
+    """Copy appointments from appointments.json (or a .log store) into the database"""
+    db.create_all()
+    store = appointments.backends["sql"]()
+    imported, skipped = store.import_file(path)
+    click.echo(f"Imported {imported} appointments, skipped {skipped} already present.")
+
+@app.cli.command("import-doctors")
+@click.argument("path", default="doctors.json")
+def import_doctors(path):
+    """Copy the doctor directory from a JSON file into the Doctor table"""
+    db.create_all()
+    imported = 0
+    for hospital, hospital_doctors in doctors.read_file(path).items():
+        for data in hospital_doctors:
+            if db.session.get(Doctor, data["id"]) is None:
+                db.session.add(Doctor(hospital=hospital, **{field: data[field] for field in DOCTOR_FIELDS}))
+                imported += 1
+    db.session.commit()
+    click.echo(f"Imported {imported} doctors.")
+
+def encode_cursor(appointment_id):
+    return base64.urlsafe_b64encode(str(appointment_id).encode()).decode()
+
+def decode_cursor(cursor):
+    return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+
+REQUIRED_APPOINTMENT_FIELDS = ["name", "email", "phone", "date", "time", "reason", "payment_method"]
+
+def validate_appointment(data):
+    """Return why a bulk item cannot be booked, or None if it can.
+
+    Stricter than POST /api/appointments, which keeps its original
+    contract of only checking that every field is present.
+    """
+    if not isinstance(data, dict):
+        return "Appointment must be an object"
+    if not all(data.get(field) for field in REQUIRED_APPOINTMENT_FIELDS):
+        return "Missing required fields"
+    try:
+        datetime.strptime(str(data["date"]), "%Y-%m-%d")
+    except ValueError:
+        return "date must be in YYYY-MM-DD format"
+    try:
+        datetime.strptime(str(data["time"]), "%H:%M")
+    except ValueError:
+        return "time must be in HH:MM format"
+    return None
+
+def parse_ids(values):
+    """Appointment ids as distinct ints in the order given.
+
+    Raises ValueError unless values is a list of 1 to APPOINTMENTS_BULK_MAX
+    positive integers; strings and booleans are not ids.
+    """
+    if not isinstance(values, list) or not 0 < len(values) <= app.config["APPOINTMENTS_BULK_MAX"]:
+        raise ValueError
+    if not all(type(value) is int and value > 0 for value in values):
+        raise ValueError
+    return list(dict.fromkeys(values))
+
+def token_email():
+    """The caller's email as their token states it, or None if it is out of date.
+
+    The token carries the email it was issued with; one issued before the
+    user last changed their details is refused. Tokens from before the
+    claim existed fall back to reading the user's row.
+    """
+    claims = get_jwt()
+    if "email" not in claims:
+        user = db.session.get(User, int(get_jwt_identity()))
+        return user.email if user else None
+    if not identity.token_current(get_jwt_identity(), claims):
+        return None
+    return claims["email"]
 
 class AppointmentListAPI(Resource):
     @jwt_required()
     def get(self):
-        """Get all appointments"""
+        """Get one page of appointments.
+
+        Optional filters: email, date_from, date_to (YYYY-MM-DD, inclusive)
+        and payment_method. Pass the returned next_cursor back as cursor to
+        fetch the following page; it is null on the last page.
+
+        With format=ndjson (or an NDJSON Accept header) or format=array every
+        matching appointment is streamed instead, read from storage in
+        STREAM_BATCH_SIZE batches.
+        """
+        args = request.args
+        try:
+            limit = int(args.get("limit", app.config["APPOINTMENTS_PAGE_SIZE"]))
+            if limit < 1:
+                raise ValueError
+            limit = min(limit, app.config["APPOINTMENTS_MAX_PAGE_SIZE"])
+        except ValueError:
+            return {"message": "limit must be a positive integer"}, 400
+        try:
+            after_id = decode_cursor(args["cursor"]) if args.get("cursor") else None
+        except ValueError:
+            return {"message": "Invalid cursor"}, 400
+        for field in ("date_from", "date_to"):
+            if args.get(field):
+                try:
+                    datetime.strptime(args[field], "%Y-%m-%d")
+                except ValueError:
+                    return {"message": f"{field} must be in YYYY-MM-DD format"}, 400
+
+        filters = {
+            "email": args.get("email") or None,
+            "date_from": args.get("date_from") or None,
+            "date_to": args.get("date_to") or None,
+            "payment_method": args.get("payment_method") or None,
+        }
+        if args.get("format") == "array" or wants_ndjson():
+            return stream_rows(appointments.iter_query(
+                batch_size=app.config["STREAM_BATCH_SIZE"], after_id=after_id, **filters
+            ))
+
         try:
-            with open(APPOINTMENTS_FILE, "r") as f:
-                appointments = json.load(f)
-            return appointments, 200
+            # Fetch one extra row to learn whether another page exists
+            page = appointments.query(after_id=after_id, limit=limit + 1, **filters)
+            next_cursor = encode_cursor(page[limit - 1]["id"]) if len(page) > limit else None
+            return {"appointments": page[:limit], "next_cursor": next_cursor}, 200
         except Exception as e:
             return {"message": f"Error: {str(e)}"}, 500
     @jwt_required()
@@ -63,75 +214,30 @@ class AppointmentListAPI(Resource):
             if not data:
                 return {"message": "No input data provided"}, 400
                 
-            required_fields = ["name", "email", "phone", "date", "time", "reason", "payment_method"]
-            if not all(field in data for field in required_fields):
+            if not all(field in data for field in REQUIRED_APPOINTMENT_FIELDS):
                 return {"message": "Missing required fields"}, 400
                 
-            with open(APPOINTMENTS_FILE, "r") as f:
-                appointments = json.load(f)
-                
             # Create new appointment
-            new_appointment = {
-                "id": len(appointments) + 1,
-                "name": data["name"],
-                "email": data["email"],
-                "phone": data["phone"],
-                "date": data["date"],
-                "time": data["time"],
-                "reason": data["reason"],
-                "payment_method": data["payment_method"]
-            }
-            
-            appointments.append(new_appointment)
-            
-            with open(APPOINTMENTS_FILE, "w") as f:
-                json.dump(appointments, f, indent=4)
+            new_appointment = appointments.create(data)
                 
             return new_appointment, 201
         except Exception as e:
             return {"message": f"Error: {str(e)}"}, 500
-        
-    @jwt_required()
-    def delete(self, appointment_id):
-        """Cancel/delete an appointment"""
-        try:
-            current_user_id = get_jwt_identity()
-            user = db.session.get(User, int(current_user_id))
-            
-            with open(APPOINTMENTS_FILE, "r") as f:
-                appointments = json.load(f)
-                
-            # Filter out the appointment to delete (only if it belongs to the user)
-            filtered_appointments = [
-                appt for appt in appointments 
-                if not (appt["id"] == appointment_id and appt["email"] == user.email)
-            ]
-            
-            if len(filtered_appointments) == len(appointments):
-                return {"message": "Appointment not found or you don't have permission"}, 404
-                
-            with open(APPOINTMENTS_FILE, "w") as f:
-                json.dump(filtered_appointments, f, indent=4)
-                
-            return {"message": "Appointment cancelled successfully"}, 200
-        except Exception as e:
-            return {"message": f"Error: {str(e)}"}, 500
 
 api.add_resource(RegisterAPI, '/api/register')
 api.add_resource(LoginAPI, '/api/login')
+api.add_resource(LoginThrottleAPI, '/api/login/throttle')
 api.add_resource(AppointmentListAPI, '/api/appointments')
 api.add_resource(UserListAPI, '/api/users')
 api.add_resource(UserDetailAPI, '/api/users/<int:user_id>')
+api.add_resource(JWKSAPI, '/api/jwks')
 
 class AppointmentDetailAPI(Resource):
     @jwt_required()
     def get(self, appointment_id):
         """Get details of a specific appointment"""
         try:
-            with open(APPOINTMENTS_FILE, "r") as f:
-                appointments = json.load(f)
-            
-            appointment = next((appt for appt in appointments if appt["id"] == appointment_id), None)
+            appointment = appointments.get(appointment_id)
             if not appointment:
                 return {"message": "Appointment not found"}, 404
             
@@ -139,8 +245,130 @@ class AppointmentDetailAPI(Resource):
         except Exception as e:
             return {"message": f"Error: {str(e)}"}, 500
 
+    @jwt_required()
+    def delete(self, appointment_id):
+        """Cancel/delete an appointment"""
+        try:
+            email = token_email()
+            if email is None:
+                return {"message": "Your account details changed, please log in again"}, 401
+
+            # Only delete the appointment if it belongs to the user
+            if not appointments.delete(appointment_id, email=email):
+                return {"message": "Appointment not found or you don't have permission"}, 404
+                
+            return {"message": "Appointment cancelled successfully"}, 200
+        except Exception as e:
+            return {"message": f"Error: {str(e)}"}, 500
+
 api.add_resource(AppointmentDetailAPI, '/api/appointments/<int:appointment_id>')
 
+class AppointmentBulkAPI(Resource):
+    """Create, fetch or cancel up to APPOINTMENTS_BULK_MAX appointments in one call.
+
+    Each operation is written as one unit and reports a status per item.
+    """
+
+    @jwt_required()
+    def get(self):
+        """Fetch appointments by id: ids=1,2,3"""
+        try:
+            ids = parse_ids([int(value) if value.isdigit() else value
+                             for value in request.args.get("ids", "").split(",")])
+        except ValueError:
+            return {"message": f"ids must be 1 to {app.config['APPOINTMENTS_BULK_MAX']} comma-separated integers"}, 400
+        found = appointments.get_many(ids)
+        return {"results": [
+            {"id": appointment_id, "status": "found", "appointment": found[appointment_id]}
+            if appointment_id in found else {"id": appointment_id, "status": "not_found"}
+            for appointment_id in ids
+        ]}, 200
+
+    @jwt_required()
+    def post(self):
+        """Book {"appointments": [...]}; nothing is booked unless every item is valid"""
+        data = request.get_json(silent=True)
+        items = data.get("appointments") if isinstance(data, dict) else None
+        if not isinstance(items, list) or not 0 < len(items) <= app.config["APPOINTMENTS_BULK_MAX"]:
+            return {"message": f"appointments must be a list of 1 to {app.config['APPOINTMENTS_BULK_MAX']} items"}, 400
+
+        errors = [validate_appointment(item) for item in items]
+        if any(errors):
+            return {
+                "message": "No appointments were booked",
+                "results": [
+                    {"index": index, "status": "invalid", "message": error} if error
+                    else {"index": index, "status": "valid"}
+                    for index, error in enumerate(errors)
+                ],
+            }, 400
+        try:
+            created = appointments.create_many(items)
+        except Exception as e:
+            return {"message": f"Error: {str(e)}"}, 500
+        return {"results": [
+            {"index": index, "status": "created", "appointment": appointment}
+            for index, appointment in enumerate(created)
+        ]}, 201
+
+    @jwt_required()
+    def delete(self):
+        """Cancel {"ids": [...]}, each only if it belongs to the caller"""
+        data = request.get_json(silent=True)
+        try:
+            ids = parse_ids(data.get("ids") if isinstance(data, dict) else None)
+        except ValueError:
+            return {"message": f"ids must be a list of 1 to {app.config['APPOINTMENTS_BULK_MAX']} integers"}, 400
+        try:
+            email = token_email()
+            if email is None:
+                return {"message": "Your account details changed, please log in again"}, 401
+            cancelled = appointments.delete_many(ids, email=email)
+        except Exception as e:
+            return {"message": f"Error: {str(e)}"}, 500
+        return {"results": [
+            {"id": appointment_id, "status": "cancelled" if appointment_id in cancelled else "not_found"}
+            for appointment_id in ids
+        ]}, 200
+
+api.add_resource(AppointmentBulkAPI, '/api/appointments/bulk')
+
+class DoctorDirectoryAPI(Resource):
+    def get(self):
+        """Search the doctor directory.
+
+        Optional filters: specialty (e.g. cardiologist), hospital (name or
+        slug), min_fee, max_fee, min_experience. sort is experience (the
+        default), fees or name; limit caps the number of results.
+        """
+        args = request.args
+        numbers = {}
+        for field in ("min_fee", "max_fee", "min_experience", "limit"):
+            if args.get(field):
+                try:
+                    numbers[field] = int(args[field])
+                except ValueError:
+                    return {"message": f"{field} must be an integer"}, 400
+        sort = args.get("sort", "experience")
+        if sort not in SORT_KEYS:
+            return {"message": f"sort must be one of {', '.join(SORT_KEYS)}"}, 400
+
+        results = doctors.query(
+            specialty=args.get("specialty") or None,
+            hospital=args.get("hospital") or None,
+            sort=sort,
+            **numbers
+        )
+        return {"doctors": results, "count": len(results)}, 200
+
+class HospitalDirectoryAPI(Resource):
+    def get(self):
+        """List the hospitals in the doctor directory with their slugs"""
+        return {"hospitals": doctors.hospitals()}, 200
+
+api.add_resource(DoctorDirectoryAPI, '/api/doctors')
+api.add_resource(HospitalDirectoryAPI, '/api/hospitals')
+
 @app.route("/")
 def index():
     return render_template("index.html")
@@ -200,11 +428,7 @@ def payment():
                 flash("Expiry date must be in MM/YY format!", "danger")
                 return redirect(url_for("payment"))
         
-        with open(APPOINTMENTS_FILE, "r") as f:
-            appointments = json.load(f)
-        
-        new_appointment = {
-            "id": len(appointments) + 1,
+        new_appointment = appointments.create({
             "name": session.get("appointment_name"),
             "email": current_user.email,
             "phone": session.get("appointment_phone"),
@@ -212,11 +436,7 @@ def payment():
             "time": session.get("appointment_time"),
             "reason": session.get("appointment_reason"),
             "payment_method": payment_method 
-        }
-        appointments.append(new_appointment)
-       
-        with open(APPOINTMENTS_FILE, "w") as f:
-            json.dump(appointments, f, indent=4)
+        })
        
         session.pop("appointment_booked", None)
         
@@ -228,19 +448,13 @@ def payment():
 @app.route("/myappointments")
 @login_required
 def my_appointments():
-    with open(APPOINTMENTS_FILE, "r") as f:
-        appointments = json.load(f)
-    user_appointments = [appt for appt in appointments if appt["email"] == current_user.email]
+    user_appointments = appointments.list_for_email(current_user.email)
     return render_template("myappointments.html", appointments=user_appointments)
 
 @app.route("/cancel_appointment/<int:appointment_id>", methods=["POST"])
 @login_required
 def cancel_appointment(appointment_id):
-    with open(APPOINTMENTS_FILE, "r") as f:
-        appointments = json.load(f)
-    appointments = [appt for appt in appointments if not (appt["id"] == appointment_id and appt["email"] == current_user.email)]
-    with open(APPOINTMENTS_FILE, "w") as f:
-        json.dump(appointments, f, indent=4)
+    appointments.delete(appointment_id, email=current_user.email)
     flash("Appointment cancelled successfully.", "success")
     return redirect(url_for("my_appointments"))
 
@@ -248,30 +462,11 @@ def cancel_appointment(appointment_id):
 def contact():
     return render_template("contact.html")
 
-doctors_data = {
-    "Neelam Hospital": [
-        {"id": 1, "name": "Dr. Anjali Sharma", "specialty": "Cardiologist", "experience": 12, "fees": 800},
-        {"id": 2, "name": "Dr. Rohit Mehta", "specialty": "Neurologist", "experience": 10, "fees": 1000},
-    ],
-    "Poly Clinic Classical Homeopathy": [
-        {"id": 3, "name": "Dr. Priya Kapoor", "specialty": "Homeopathy", "experience": 8, "fees": 500},
-        {"id": 4, "name": "Dr. Rajiv Singh", "specialty": "General Medicine", "experience": 15, "fees": 600},
-    ],
-    "Max Super Speciality Hospital": [
-        {"id": 5, "name": "Dr. Alok Verma", "specialty": "Orthopedist", "experience": 14, "fees": 900},
-        {"id": 6, "name": "Dr. Sunita Rao", "specialty": "Dermatologist", "experience": 11, "fees": 700},
-    ],
-    "Healing Hospital": [
-        {"id": 7, "name": "Dr. Kiran Gupta", "specialty": "Neurologist", "experience": 9, "fees": 850},
-        {"id": 8, "name": "Dr. Sandeep Malhotra", "specialty": "Cardiologist", "experience": 13, "fees": 950},
-    ]
-}
-
 @app.route("/doctors/<hospital_name>")
 def doctor_list(hospital_name):
-    hospital_name = hospital_name.replace("-", " ")  
-    doctors = doctors_data.get(hospital_name, [])  
-    return render_template("doctor_list.html", hospital_name=hospital_name, doctors=doctors)
+    name, hospital_doctors = doctors.for_hospital(hospital_name)
+    return render_template("doctor_list.html", hospital_name=name or hospital_name.replace("-", " "),
+                           doctors=hospital_doctors)
 
 @app.route("/forgotpassword", methods=["GET", "POST"])
 def forgot_password():
@@ -285,11 +480,13 @@ def settings():
         email = request.form.get("email")
         dob = request.form.get("dob")
         gender = request.form.get("gender")
-        current_user.full_name = full_name
-        current_user.email = email
-        current_user.dob = dob
-        current_user.gender = gender
+        user = db.session.get(User, current_user.id)
+        user.full_name = full_name
+        user.email = email
+        user.dob = dob
+        user.gender = gender
         db.session.commit()  
+        identity.changed(user)
         flash("Settings updated successfully!")  
         return redirect(url_for("settings"))  
     return render_template("settings.html")
@@ -299,9 +496,22 @@ def login():
     if request.method == "POST":
         email = request.form.get("email")
         password = request.form.get("password")
+        if login_throttle.check(request, email):
+            flash("Too many login attempts. Please wait a few minutes and try again.", "danger")
+            return render_template("login.html"), 429
         user = User.query.filter_by(email=email).first()
-        if user and check_password_hash(user.password, password):
+        try:
+            valid, new_hash = passwords.verify(user.password, password) if user else (False, None)
+        except HashingBusy:
+            flash("We're handling a lot of sign-ins right now. Please try again in a moment.", "warning")
+            return render_template("login.html"), 503
+        if valid:
+            if new_hash:
+                user.password = new_hash
+                db.session.commit()
+            login_throttle.succeeded(request, email)
             login_user(user)
+            identity.remember(user)
             return redirect(url_for("patient"))
         flash("Invalid email or password", "danger")
     return render_template("login.html")
@@ -344,7 +554,11 @@ def signup():
             flash("Email already registered. Please log in.", "warning")
             return redirect(url_for("login"))
 
-        hashed_password = generate_password_hash(password, method="pbkdf2:sha256")
+        try:
+            hashed_password = passwords.hash(password)
+        except HashingBusy:
+            flash("We're handling a lot of sign-ups right now. Please try again in a moment.", "warning")
+            return redirect(url_for("signup"))
         new_user = User(full_name=full_name, email=email, password=hashed_password, dob=dob, gender=gender) 
         db.session.add(new_user)
         db.session.commit()
@@ -362,6 +576,7 @@ def patient():
 @login_required
 def logout():
     logout_user() 
+    identity.forget()
     flash("Logged out successfully.", "success")
     return redirect(url_for("login")) 
 
@@ -372,9 +587,7 @@ def update_profile():
 @app.route("/medical_records")
 @login_required
 def medical_records():
-    with open(APPOINTMENTS_FILE, "r") as f:
-        appointments = json.load(f)
-    user_appointments = [appt for appt in appointments if appt["email"] == current_user.email]
+    user_appointments = appointments.list_for_email(current_user.email)
     medical_history = [
         {"date": "2024-01-15", "condition": "Flu", "treatment": "Rest and hydration"},
         {"date": "2024-05-20", "condition": "Allergy", "treatment": "Antihistamines"},
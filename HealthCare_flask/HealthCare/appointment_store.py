@@ -0,0 +1,504 @@
+import json
+import os
+import threading
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+APPOINTMENT_FIELDS = ["name", "email", "phone", "date", "time", "reason", "payment_method"]
+
+
+def filter_page(appointments, date_from=None, date_to=None, payment_method=None,
+                after_id=None, limit=50):
+    """Apply query() filters to appointments that are already in id order"""
+    page = []
+    for appointment in appointments:
+        if after_id is not None and appointment["id"] <= after_id:
+            continue
+        if date_from is not None and appointment["date"] < date_from:
+            continue
+        if date_to is not None and appointment["date"] > date_to:
+            continue
+        if payment_method is not None and appointment["payment_method"] != payment_method:
+            continue
+        page.append(appointment)
+        if len(page) == limit:
+            break
+    return page
+
+
+class AppointmentStore:
+    """Interface shared by every appointment storage backend"""
+
+    def create(self, data):
+        """Store a new appointment and return it with its id"""
+        raise NotImplementedError
+
+    def get(self, appointment_id):
+        """Return a single appointment or None"""
+        raise NotImplementedError
+
+    def list_all(self):
+        """Return every appointment in booking order"""
+        raise NotImplementedError
+
+    def list_for_email(self, email):
+        """Return the appointments booked by one user"""
+        raise NotImplementedError
+
+    def delete(self, appointment_id, email=None):
+        """Delete an appointment, optionally only if it belongs to email"""
+        raise NotImplementedError
+
+    def create_many(self, items):
+        """Store several appointments together and return them with their ids.
+
+        Backends override this to write them in one transaction; the
+        default creates them one at a time.
+        """
+        return [self.create(data) for data in items]
+
+    def get_many(self, appointment_ids):
+        """Return {id: appointment} for the ids that exist"""
+        found = {}
+        for appointment_id in appointment_ids:
+            appointment = self.get(appointment_id)
+            if appointment is not None:
+                found[appointment_id] = appointment
+        return found
+
+    def delete_many(self, appointment_ids, email=None):
+        """Delete several appointments together; return the set of ids deleted"""
+        return {
+            appointment_id for appointment_id in appointment_ids
+            if self.delete(appointment_id, email=email)
+        }
+
+    def query(self, email=None, date_from=None, date_to=None, payment_method=None,
+              after_id=None, limit=50):
+        """Return up to limit appointments with an id above after_id, in id order.
+
+        date_from and date_to are inclusive ISO dates. Backends that can seek
+        by key should override this; the default filters the listing.
+        """
+        candidates = self.list_for_email(email) if email is not None else self.list_all()
+        return filter_page(candidates, date_from, date_to, payment_method, after_id, limit)
+
+    def iter_query(self, batch_size=500, after_id=None, **filters):
+        """Yield every matching appointment, fetching batch_size at a time"""
+        while True:
+            page = self.query(after_id=after_id, limit=batch_size, **filters)
+            yield from page
+            if len(page) < batch_size:
+                return
+            after_id = page[-1]["id"]
+
+
+class FileLock:
+    """Exclusive advisory lock on a file, shared by processes and threads"""
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            else:
+                msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            os.close(self._fd)
+            self._fd = None
+        self._thread_lock.release()
+
+
+class LogAppointmentStore(AppointmentStore):
+    """Append-only JSON-lines log with in-memory indexes by id and email.
+
+    Every write appends one line, so a booking or cancellation costs O(1)
+    regardless of how many appointments exist. The log is rewritten without
+    the cancelled entries once they outnumber the live ones.
+
+    Several worker processes can share one log: every operation holds
+    ``<log>.lock`` and first replays whatever other workers appended since
+    the last call. Ids come from a counter that is persisted in the log and
+    never goes backwards, even when the newest appointment is cancelled.
+    Bulk writes go in as a single "batch" line, so a crash mid-write drops
+    the whole batch rather than part of it.
+    """
+
+    def __init__(self, path, legacy_path=None, compact_min=1000, compact_ratio=1.0):
+        self.path = path
+        self.compact_min = compact_min
+        self.compact_ratio = compact_ratio
+        self._lock = FileLock(f"{path}.lock")
+        self._reset()
+
+        with self._lock:
+            if not os.path.exists(self.path) and legacy_path and os.path.exists(legacy_path):
+                self._import_legacy(legacy_path)
+            self._refresh()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            config["APPOINTMENTS_LOG"],
+            legacy_path=config.get("APPOINTMENTS_FILE"),
+            compact_min=config.get("APPOINTMENTS_COMPACT_MIN", 1000),
+        )
+
+    def _reset(self):
+        self._by_id = {}
+        self._by_email = {}
+        self._next_id = 1
+        self._dead = 0
+        self._offset = 0
+        self._header = None
+
+    def _import_legacy(self, legacy_path):
+        """Convert an old whole-file appointments.json into a log"""
+        with open(legacy_path, "r") as f:
+            appointments = json.load(f)
+        next_id = max((appt["id"] for appt in appointments), default=0) + 1
+        self._write_snapshot(appointments, next_id)
+
+    def _refresh(self):
+        """Replay log lines written by other processes since the last call"""
+        if not os.path.exists(self.path):
+            self._write_snapshot([], self._next_id)
+
+        with open(self.path, "rb") as f:
+            # A compaction in another process swaps in a file with a new header
+            header = f.readline()
+            if header != self._header:
+                self._reset()
+                self._header = header
+                f.seek(0)
+            else:
+                f.seek(self._offset)
+            chunk = f.read()
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            if line.strip():
+                self._apply(json.loads(line))
+        self._offset += end
+
+        # Writers hold the lock, so a trailing partial line can only come
+        # from a worker that crashed mid-append; drop it before appending.
+        if end < len(chunk):
+            os.truncate(self.path, self._offset)
+
+    def _apply(self, entry):
+        if entry["op"] == "put":
+            appointment = entry["appointment"]
+            self._index(appointment)
+            self._next_id = max(self._next_id, appointment["id"] + 1)
+        elif entry["op"] == "del":
+            self._unindex(entry["id"])
+            self._dead += 2
+        elif entry["op"] == "seq":
+            self._next_id = max(self._next_id, entry["next_id"])
+        elif entry["op"] == "batch":
+            for item in entry["entries"]:
+                self._apply(item)
+
+    def _index(self, appointment):
+        self._by_id[appointment["id"]] = appointment
+        self._by_email.setdefault(appointment["email"], {})[appointment["id"]] = appointment
+
+    def _unindex(self, appointment_id):
+        appointment = self._by_id.pop(appointment_id, None)
+        if appointment is None:
+            return None
+        user_appointments = self._by_email.get(appointment["email"], {})
+        user_appointments.pop(appointment_id, None)
+        if not user_appointments:
+            self._by_email.pop(appointment["email"], None)
+        return appointment
+
+    def _append(self, entry):
+        line = (json.dumps(entry) + "\n").encode()
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+        self._offset += len(line)
+
+    def _write_snapshot(self, appointments, next_id):
+        """Atomically replace the log with the given appointments"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            header = {"op": "seq", "next_id": next_id, "generation": uuid.uuid4().hex}
+            f.write(json.dumps(header) + "\n")
+            for appointment in appointments:
+                f.write(json.dumps({"op": "put", "appointment": appointment}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def _maybe_compact(self):
+        if self._dead >= self.compact_min and self._dead >= len(self._by_id) * self.compact_ratio:
+            self.compact()
+
+    def compact(self):
+        """Rewrite the log so it only holds live appointments"""
+        with self._lock:
+            self._refresh()
+            self._write_snapshot(self._by_id.values(), self._next_id)
+            self._dead = 0
+            self._refresh()
+
+    def create(self, data):
+        with self._lock:
+            self._refresh()
+            appointment = {"id": self._next_id}
+            appointment.update({field: data.get(field) for field in APPOINTMENT_FIELDS})
+            self._append({"op": "put", "appointment": appointment})
+            self._index(appointment)
+            self._next_id += 1
+            return appointment
+
+    def get(self, appointment_id):
+        with self._lock:
+            self._refresh()
+            return self._by_id.get(appointment_id)
+
+    def list_all(self):
+        with self._lock:
+            self._refresh()
+            return list(self._by_id.values())
+
+    def list_for_email(self, email):
+        with self._lock:
+            self._refresh()
+            return list(self._by_email.get(email, {}).values())
+
+    def query(self, email=None, date_from=None, date_to=None, payment_method=None,
+              after_id=None, limit=50):
+        with self._lock:
+            self._refresh()
+            # Filter the index in place rather than copying it first
+            candidates = self._by_id if email is None else self._by_email.get(email, {})
+            return filter_page(candidates.values(), date_from, date_to, payment_method,
+                               after_id, limit)
+
+    def delete(self, appointment_id, email=None):
+        with self._lock:
+            self._refresh()
+            appointment = self._by_id.get(appointment_id)
+            if appointment is None or (email is not None and appointment["email"] != email):
+                return False
+            self._append({"op": "del", "id": appointment_id})
+            self._unindex(appointment_id)
+            # The original "put" line and the "del" line are both dead now
+            self._dead += 2
+            self._maybe_compact()
+            return True
+
+    def create_many(self, items):
+        with self._lock:
+            self._refresh()
+            created = []
+            for offset, data in enumerate(items):
+                appointment = {"id": self._next_id + offset}
+                appointment.update({field: data.get(field) for field in APPOINTMENT_FIELDS})
+                created.append(appointment)
+            if created:
+                self._append({"op": "batch", "entries": [
+                    {"op": "put", "appointment": appointment} for appointment in created
+                ]})
+                for appointment in created:
+                    self._index(appointment)
+                self._next_id += len(created)
+            return created
+
+    def get_many(self, appointment_ids):
+        with self._lock:
+            self._refresh()
+            return {
+                appointment_id: self._by_id[appointment_id]
+                for appointment_id in appointment_ids if appointment_id in self._by_id
+            }
+
+    def delete_many(self, appointment_ids, email=None):
+        with self._lock:
+            self._refresh()
+            deleted = {
+                appointment_id for appointment_id in appointment_ids
+                if appointment_id in self._by_id
+                and (email is None or self._by_id[appointment_id]["email"] == email)
+            }
+            if deleted:
+                self._append({"op": "batch", "entries": [
+                    {"op": "del", "id": appointment_id} for appointment_id in sorted(deleted)
+                ]})
+                for appointment_id in deleted:
+                    self._unindex(appointment_id)
+                self._dead += 2 * len(deleted)
+                self._maybe_compact()
+            return deleted
+
+
+class SQLAppointmentStore(AppointmentStore):
+    """Appointments stored in the Appointment table, looked up by key.
+
+    Per-user listings go through the (email, date) index, so they cost
+    O(log n + k) no matter how many appointments other users have.
+    """
+
+    def __init__(self):
+        from models import Appointment
+        from extensions import db
+        self.model = Appointment
+        self.db = db
+
+    @classmethod
+    def from_config(cls, config):
+        return cls()
+
+    def create(self, data):
+        appointment = self.model(**{field: data.get(field) for field in APPOINTMENT_FIELDS})
+        self.db.session.add(appointment)
+        self.db.session.commit()
+        return appointment.to_dict()
+
+    def get(self, appointment_id):
+        appointment = self.db.session.get(self.model, appointment_id)
+        return appointment.to_dict() if appointment else None
+
+    def list_all(self):
+        return [appt.to_dict() for appt in self.model.query.order_by(self.model.id)]
+
+    def list_for_email(self, email):
+        query = self.model.query.filter_by(email=email).order_by(self.model.id)
+        return [appt.to_dict() for appt in query]
+
+    def query(self, email=None, date_from=None, date_to=None, payment_method=None,
+              after_id=None, limit=50):
+        query = self.model.query
+        if email is not None:
+            query = query.filter(self.model.email == email)
+        if date_from is not None:
+            query = query.filter(self.model.date >= date_from)
+        if date_to is not None:
+            query = query.filter(self.model.date <= date_to)
+        if payment_method is not None:
+            query = query.filter(self.model.payment_method == payment_method)
+        if after_id is not None:
+            query = query.filter(self.model.id > after_id)
+        return [appt.to_dict() for appt in query.order_by(self.model.id).limit(limit)]
+
+    def delete(self, appointment_id, email=None):
+        query = self.model.query.filter_by(id=appointment_id)
+        if email is not None:
+            query = query.filter_by(email=email)
+        deleted = query.delete()
+        self.db.session.commit()
+        return deleted > 0
+
+    def create_many(self, items):
+        appointments = [
+            self.model(**{field: data.get(field) for field in APPOINTMENT_FIELDS})
+            for data in items
+        ]
+        self.db.session.add_all(appointments)
+        # Read them back before the commit expires them, which would cost
+        # a SELECT per row
+        self.db.session.flush()
+        created = [appointment.to_dict() for appointment in appointments]
+        self.db.session.commit()
+        return created
+
+    def get_many(self, appointment_ids):
+        query = self.model.query.filter(self.model.id.in_(list(appointment_ids)))
+        return {appointment.id: appointment.to_dict() for appointment in query}
+
+    def delete_many(self, appointment_ids, email=None):
+        query = self.db.session.query(self.model.id).filter(self.model.id.in_(list(appointment_ids)))
+        if email is not None:
+            query = query.filter(self.model.email == email)
+        deleted = {row[0] for row in query}
+        if deleted:
+            self.model.query.filter(self.model.id.in_(deleted)).delete(synchronize_session=False)
+        self.db.session.commit()
+        return deleted
+
+    def import_file(self, path, batch_size=1000):
+        """Copy appointments from appointments.json or appointments.log.
+
+        Ids are kept so existing links keep working; appointments whose id is
+        already in the table are skipped, so the import can be re-run safely.
+        Returns (imported, skipped).
+        """
+        if path.endswith(".log"):
+            appointments = LogAppointmentStore(path).list_all()
+        else:
+            with open(path, "r") as f:
+                appointments = json.load(f)
+
+        imported = skipped = 0
+        for start in range(0, len(appointments), batch_size):
+            batch = appointments[start:start + batch_size]
+            ids = [appt["id"] for appt in batch]
+            existing = {
+                row[0] for row in
+                self.db.session.query(self.model.id).filter(self.model.id.in_(ids))
+            }
+            rows = [
+                {"id": appt["id"], **{field: appt.get(field) for field in APPOINTMENT_FIELDS}}
+                for appt in batch if appt["id"] not in existing
+            ]
+            if rows:
+                self.db.session.execute(self.db.insert(self.model), rows)
+            imported += len(rows)
+            skipped += len(batch) - len(rows)
+        self.db.session.commit()
+        return imported, skipped
+
+
+class AppointmentStorage:
+    """Flask extension exposing the configured appointment backend"""
+
+    backends = {
+        "log": LogAppointmentStore,
+        "sql": SQLAppointmentStore,
+    }
+
+    def __init__(self, app=None):
+        self.store = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("APPOINTMENT_BACKEND", "sql")
+        app.config.setdefault("APPOINTMENTS_LOG", "appointments.log")
+        app.config.setdefault("APPOINTMENTS_FILE", "appointments.json")
+        backend = self.backends[app.config["APPOINTMENT_BACKEND"]]
+        self.store = backend.from_config(app.config)
+        app.extensions["appointments"] = self.store
+
+    def __getattr__(self, name):
+        store = self.__dict__.get("store")
+        if store is None:
+            raise RuntimeError("AppointmentStorage.init_app() has not been called")
+        return getattr(store, name)
@@ -0,0 +1,101 @@
+"""Multi-process stress test for the appointment log store.
+
+Spawns several worker processes that book and cancel appointments against
+one shared log at the same time, then checks that no booking was lost and
+that every id was issued exactly once. Exits non-zero on failure so it can
+run in CI:
+
+    python benchmarks/appointment_store_stress.py --workers 8 --bookings 500
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from appointment_store import LogAppointmentStore  # noqa: E402
+
+
+def worker(path, worker_id, bookings, cancel_every, compact_min, results):
+    store = LogAppointmentStore(path, compact_min=compact_min)
+    email = f"worker{worker_id}@example.com"
+    created = []
+    cancelled = []
+    for i in range(bookings):
+        appointment = store.create({
+            "name": f"Patient {worker_id}-{i}",
+            "email": email,
+            "phone": "9999999999",
+            "date": "2025-01-01",
+            "time": "10:00",
+            "reason": "Stress test",
+            "payment_method": "cash",
+        })
+        created.append(appointment["id"])
+        if cancel_every and i % cancel_every == 0:
+            store.delete(appointment["id"], email=email)
+            cancelled.append(appointment["id"])
+    results.put((worker_id, created, cancelled))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--bookings", type=int, default=500, help="bookings per worker")
+    parser.add_argument("--cancel-every", type=int, default=5, help="cancel every Nth booking (0 disables)")
+    parser.add_argument("--compact-min", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "appointments.log")
+        results = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(
+                target=worker,
+                args=(path, n, args.bookings, args.cancel_every, args.compact_min, results),
+            )
+            for n in range(args.workers)
+        ]
+
+        start = time.perf_counter()
+        for p in processes:
+            p.start()
+        outcomes = [results.get() for _ in processes]
+        for p in processes:
+            p.join()
+        elapsed = time.perf_counter() - start
+
+        created = [appt_id for _, ids, _ in outcomes for appt_id in ids]
+        cancelled = {appt_id for _, _, ids in outcomes for appt_id in ids}
+        store = LogAppointmentStore(path)
+        stored_ids = {appt["id"] for appt in store.list_all()}
+        expected_ids = set(created) - cancelled
+
+        errors = []
+        if len(created) != len(set(created)):
+            errors.append(f"{len(created) - len(set(created))} duplicate ids issued")
+        if stored_ids != expected_ids:
+            errors.append(
+                f"{len(expected_ids - stored_ids)} bookings lost, "
+                f"{len(stored_ids - expected_ids)} cancelled bookings resurrected"
+            )
+        for worker_id, ids, cancelled_ids in outcomes:
+            listed = {appt["id"] for appt in store.list_for_email(f"worker{worker_id}@example.com")}
+            if listed != set(ids) - set(cancelled_ids):
+                errors.append(f"email index out of sync for worker {worker_id}")
+
+        operations = len(created) + len(cancelled)
+        print(f"workers={args.workers} bookings={len(created)} cancellations={len(cancelled)}")
+        print(f"elapsed={elapsed:.2f}s throughput={operations / elapsed:.0f} ops/s")
+        if errors:
+            for error in errors:
+                print(f"FAIL: {error}")
+            sys.exit(1)
+        print("OK: no lost bookings, no duplicate ids")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Bulk appointment API benchmark.
+
+Books, fetches and cancels the same appointments through the real API
+twice: once one HTTP call per appointment, once through
+/api/appointments/bulk in chunks. Runs against each storage backend:
+
+    python benchmarks/bulk_appointments.py --appointments 500 --chunk 250
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def chunks(items, size):
+    return [items[start:start + size] for start in range(0, len(items), size)]
+
+
+def run(backend, count, chunk):
+    """Time both ways of doing each operation; run in a fresh process per backend"""
+    sys.path.insert(0, APP_DIR)
+    from flask_jwt_extended import create_access_token
+
+    import app as app_module
+
+    app = app_module.app
+    with app.app_context():
+        app_module.db.create_all()
+        # Cancelling checks ownership against the email in the token
+        user = app_module.User(full_name="Bulk", email="bulk@example.com", password="-",
+                               dob="2000-01-01", gender="Other")
+        app_module.db.session.add(user)
+        app_module.db.session.commit()
+        token = create_access_token(identity=str(user.id), additional_claims=app_module.identity.claims(user))
+    headers = {"Authorization": f"Bearer {token}"}
+    client = app.test_client()
+    items = [
+        {"name": f"Patient {n}", "email": "bulk@example.com", "phone": "9876543210",
+         "date": f"2030-{n % 12 + 1:02d}-{n % 28 + 1:02d}", "time": f"{9 + n % 8:02d}:00",
+         "reason": "Partner clinic import", "payment_method": "cash"}
+        for n in range(count)
+    ]
+
+    def timed(operation):
+        started = time.perf_counter()
+        result = operation()
+        return time.perf_counter() - started, result
+
+    def one_by_one():
+        ids = [client.post("/api/appointments", json=item, headers=headers).get_json()["id"] for item in items]
+        fetch, fetched = timed(lambda: [client.get(f"/api/appointments/{n}", headers=headers).status_code
+                                        for n in ids])
+        cancel, cancelled = timed(lambda: [client.delete(f"/api/appointments/{n}", headers=headers).status_code
+                                           for n in ids])
+        assert fetched.count(200) == cancelled.count(200) == count
+        return fetch, cancel
+
+    def bulk():
+        ids = []
+        for part in chunks(items, chunk):
+            response = client.post("/api/appointments/bulk", json={"appointments": part}, headers=headers)
+            ids += [result["appointment"]["id"] for result in response.get_json()["results"]]
+
+        def fetch():
+            return [result["status"] for part in chunks(ids, chunk) for result in client.get(
+                "/api/appointments/bulk?ids=" + ",".join(map(str, part)), headers=headers
+            ).get_json()["results"]]
+
+        def cancel():
+            return [result["status"] for part in chunks(ids, chunk) for result in client.delete(
+                "/api/appointments/bulk", json={"ids": part}, headers=headers
+            ).get_json()["results"]]
+
+        fetch_time, fetched = timed(fetch)
+        cancel_time, cancelled = timed(cancel)
+        assert fetched.count("found") == cancelled.count("cancelled") == count
+        return fetch_time, cancel_time
+
+    print(f"backend={backend} appointments={count} chunk={chunk}")
+    results = {}
+    for label, operation in [("one by one", one_by_one), ("bulk", bulk)]:
+        started = time.perf_counter()
+        fetch, cancel = operation()
+        book = time.perf_counter() - started - fetch - cancel
+        results[label] = (book, fetch, cancel)
+        print(f"  {label:<10} book {book * 1000:8.1f} ms  fetch {fetch * 1000:8.1f} ms  "
+              f"cancel {cancel * 1000:8.1f} ms")
+    speedups = [single / max(batched, 1e-9) for single, batched in zip(results["one by one"], results["bulk"])]
+    print("  speedup    book x{:.1f}  fetch x{:.1f}  cancel x{:.1f}".format(*speedups))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--appointments", type=int, default=500)
+    parser.add_argument("--chunk", type=int, default=250, help="appointments per bulk call")
+    parser.add_argument("--backend", choices=["sql", "log"], help="run one backend in this process")
+    args = parser.parse_args()
+
+    if args.backend:
+        run(args.backend, args.appointments, args.chunk)
+        return
+    # app.py reads its configuration at import, so each backend gets its own
+    # process, working directory and database
+    failed = False
+    for backend in ["sql", "log"]:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, APPOINTMENT_BACKEND=backend,
+                       DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bulk.db')}")
+            completed = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--backend", backend,
+                 "--appointments", str(args.appointments), "--chunk", str(args.chunk)],
+                cwd=tmp, env=env,
+            )
+            failed = failed or completed.returncode != 0
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
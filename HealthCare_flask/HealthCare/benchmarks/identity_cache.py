@@ -0,0 +1,97 @@
+"""Identity cache benchmark.
+
+Logs one user in, then requests a @login_required page many times with
+the session-cached identity off and on, counting the user-table reads
+behind each request:
+
+    python benchmarks/identity_cache.py --requests 5000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from flask_login import current_user, login_required, login_user  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from extensions import db, identity, login_manager  # noqa: E402
+from models import User  # noqa: E402
+
+
+def create_app(database, enabled):
+    app = Flask(__name__)
+    app.secret_key = "identity-cache"
+    app.config.update(SQLALCHEMY_DATABASE_URI=f"sqlite:///{database}", IDENTITY_CACHE_ENABLED=enabled)
+    db.init_app(app)
+    login_manager.init_app(app)
+    identity.init_app(app)
+    login_manager.user_loader(lambda user_id: identity.load(user_id, User))
+
+    @app.route("/login", methods=["POST"])
+    def login():
+        user = User.query.filter_by(email="bench@example.com").first()
+        login_user(user)
+        identity.remember(user)
+        return "ok"
+
+    @app.route("/me")
+    @login_required
+    def me():
+        return {"full_name": current_user.full_name, "email": current_user.email}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=100_000, help="rows in the user table")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, "identity.db")
+        app = create_app(database, False)
+        with app.app_context():
+            db.create_all()
+            db.session.add_all(
+                User(full_name=f"User {n}", email=f"user{n}@example.com", password="-",
+                     dob="2000-01-01", gender="Other")
+                for n in range(args.users - 1)
+            )
+            db.session.add(User(full_name="Bench", email="bench@example.com", password="-",
+                                dob="2000-01-01", gender="Other"))
+            db.session.commit()
+
+        print(f"requests={args.requests} users={args.users}")
+        for label, enabled in [("cache off", False), ("cache on", True)]:
+            app = create_app(database, enabled)
+            reads = []
+
+            def count(conn, cursor, statement, *rest):
+                if "FROM user" in statement:
+                    reads.append(statement)
+
+            # Requests run outside this context: an app context held open
+            # would keep Flask-Login's per-request user in g between them
+            with app.app_context():
+                engine = db.engine
+            event.listen(engine, "before_cursor_execute", count)
+            client = app.test_client()
+            client.post("/login")
+            reads.clear()
+            started = time.perf_counter()
+            for _ in range(args.requests):
+                client.get("/me")
+            elapsed = time.perf_counter() - started
+            event.remove(engine, "before_cursor_execute", count)
+            print(f"  {label:<10} {args.requests / elapsed:8.1f} req/s  "
+                  f"{elapsed / args.requests * 1e6:8.1f} us/request  "
+                  f"user reads/request {len(reads) / args.requests:.2f}  {identity.stats()}")
+
+
+if __name__ == "__main__":
+    main()
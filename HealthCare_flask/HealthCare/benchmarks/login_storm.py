@@ -0,0 +1,124 @@
+"""Login storm benchmark for password hashing.
+
+Registers a set of users, then sends many concurrent logins to the real
+LoginAPI. It runs once hashing inline on the request threads and once
+through the PasswordHasher process pool, and reports logins/sec overall
+and per core:
+
+    python benchmarks/login_storm.py --users 50 --logins 400 --concurrency 32
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+from flask_restful import Api  # noqa: E402
+
+from extensions import db, jwt, passwords  # noqa: E402
+from password_hashing import hash_password  # noqa: E402
+from resource.app_resource import LoginAPI  # noqa: E402
+from models import User  # noqa: E402
+
+PASSWORD = "Passw0rd!storm"
+
+
+def create_app(database, method, workers, max_pending):
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{database}",
+        JWT_SECRET_KEY="login-storm",
+        JWT_KEY_ID="storm",
+        PASSWORD_HASH_METHOD=method,
+        PASSWORD_HASH_WORKERS=workers,
+        PASSWORD_HASH_MAX_PENDING=max_pending,
+        PASSWORD_HASH_TIMEOUT=60,
+    )
+    db.init_app(app)
+    jwt.init_app(app)
+    passwords.init_app(app)
+    Api(app).add_resource(LoginAPI, "/api/login")
+    return app
+
+
+def storm(app, users, logins, concurrency):
+    """Send logins spread over concurrency threads; return (elapsed, latencies, status counts)"""
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    per_thread = [logins // concurrency + (n < logins % concurrency) for n in range(concurrency)]
+    start_line = threading.Barrier(concurrency + 1)
+
+    def worker(n, count):
+        client = app.test_client()
+        start_line.wait()
+        for i in range(count):
+            email = f"storm{(n + i * concurrency) % users}@example.com"
+            started = time.perf_counter()
+            response = client.post("/api/login", json={"email": email, "password": PASSWORD})
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    threads = [threading.Thread(target=worker, args=(n, count)) for n, count in enumerate(per_thread)]
+    for thread in threads:
+        thread.start()
+    start_line.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32, help="simultaneous clients")
+    parser.add_argument("--method", default="pbkdf2:sha256", help="werkzeug hash method, i.e. the cost profile")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="hashing processes")
+    parser.add_argument("--max-pending", type=int, default=64)
+    args = parser.parse_args()
+    cores = os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, "storm.db")
+        app = create_app(database, args.method, 0, 0)
+        with app.app_context():
+            db.create_all()
+            # Every user shares one hash: only the logins are being measured
+            hashed = hash_password(PASSWORD, args.method)
+            db.session.add_all(
+                User(full_name=f"Storm {n}", email=f"storm{n}@example.com", password=hashed,
+                     dob="2000-01-01", gender="Other")
+                for n in range(args.users)
+            )
+            db.session.commit()
+
+        print(f"method={args.method} users={args.users} logins={args.logins} "
+              f"concurrency={args.concurrency} cores={cores}")
+        failed = False
+        for label, workers in [("inline", 0), (f"pool x{args.workers}", args.workers)]:
+            app = create_app(database, args.method, workers, args.max_pending)
+            try:
+                elapsed, latencies, statuses = storm(app, args.users, args.logins, args.concurrency)
+            finally:
+                passwords.shutdown()
+            cuts = statistics.quantiles(latencies, n=100)
+            rate = statuses.get(200, 0) / elapsed
+            print(f"{label:<10} {rate:8.1f} logins/s  {rate / cores:8.1f} logins/s/core  "
+                  f"p50 {cuts[49] * 1000:7.1f} ms  p99 {cuts[98] * 1000:7.1f} ms  statuses {statuses}")
+            failed = failed or statuses.get(200, 0) != args.logins
+        if failed:
+            print("FAIL: some logins did not succeed")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Login throttle benchmark.
+
+Measures what the LoginThrottle costs a legitimate login and what it saves
+during credential stuffing: logins/sec with the throttle off and on, then
+a burst of wrong passwords against one account, where the throttled run
+answers 429 instead of hashing each guess. Also times check() on its own:
+
+    python benchmarks/login_throttle.py --users 50 --logins 200 --stuffing 200
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, request  # noqa: E402
+
+from extensions import db, login_throttle, passwords  # noqa: E402
+from login_storm import PASSWORD, create_app  # noqa: E402
+from password_hashing import hash_password  # noqa: E402
+from models import User  # noqa: E402
+
+
+def throttled_app(database, method, enabled):
+    # Inline hashing, so the timings are the request path and not the pool
+    app = create_app(database, method, 0, 0)
+    app.config.update(LOGIN_THROTTLE_ENABLED=enabled, LOGIN_THROTTLE_PER_IP=(10**9, 1))
+    login_throttle.init_app(app)
+    return app
+
+
+def run(app, attempts):
+    """POST each (email, password) in turn; return {status code: [seconds per attempt]}"""
+    client = app.test_client()
+    latencies = {}
+    for email, password in attempts:
+        started = time.perf_counter()
+        response = client.post("/api/login", json={"email": email, "password": password})
+        latencies.setdefault(response.status_code, []).append(time.perf_counter() - started)
+    return latencies
+
+
+def report(label, latencies):
+    total = sum(map(sum, latencies.values()))
+    count = sum(map(len, latencies.values()))
+    medians = "  ".join(f"{status}: {len(times)} x {statistics.median(times) * 1000:.2f} ms"
+                        for status, times in sorted(latencies.items()))
+    print(f"  {label:<12} {count / total:8.1f} req/s  total {total:6.2f} s  {medians}")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--logins", type=int, default=200, help="legitimate logins")
+    parser.add_argument("--stuffing", type=int, default=200, help="wrong-password attempts on one account")
+    parser.add_argument("--method", default="pbkdf2:sha256", help="werkzeug hash method, i.e. the cost profile")
+    parser.add_argument("--checks", type=int, default=100_000, help="check() calls in the micro benchmark")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, "throttle.db")
+        app = throttled_app(database, args.method, False)
+        with app.app_context():
+            db.create_all()
+            hashed = hash_password(PASSWORD, args.method)
+            db.session.add_all(
+                User(full_name=f"Storm {n}", email=f"storm{n}@example.com", password=hashed,
+                     dob="2000-01-01", gender="Other")
+                for n in range(args.users)
+            )
+            db.session.commit()
+
+        legitimate = [(f"storm{n % args.users}@example.com", PASSWORD) for n in range(args.logins)]
+        stuffing = [("storm0@example.com", f"guess-{n}") for n in range(args.stuffing)]
+        print(f"method={args.method} users={args.users} logins={args.logins} stuffing={args.stuffing}")
+        failed = False
+
+        print("legitimate logins")
+        timings = {}
+        for label, enabled in [("throttle off", False), ("throttle on", True)]:
+            latencies = run(throttled_app(database, args.method, enabled), legitimate)
+            timings[label] = report(label, latencies)
+            failed = failed or len(latencies.get(200, [])) != args.logins
+        print(f"  overhead {(timings['throttle on'] / timings['throttle off'] - 1) * 100:+.1f}%")
+
+        print("credential stuffing")
+        for label, enabled in [("throttle off", False), ("throttle on", True)]:
+            timings[label] = report(label, run(throttled_app(database, args.method, enabled), stuffing))
+        print(f"  time saved x{timings['throttle off'] / timings['throttle on']:.1f}")
+        passwords.shutdown()
+
+    app = Flask(__name__)
+    app.config.update(LOGIN_THROTTLE_PER_IP=(10**9, 1), LOGIN_THROTTLE_PER_EMAIL=(10**9, 1))
+    login_throttle.init_app(app)
+    with app.test_request_context("/api/login", method="POST"):
+        emails = [f"user{n}@example.com" for n in range(1000)]
+        started = time.perf_counter()
+        for n in range(args.checks):
+            login_throttle.check(request, emails[n % 1000])
+        elapsed = time.perf_counter() - started
+    print(f"check()  {elapsed / args.checks * 1e6:.2f} us per call")
+
+    if failed:
+        print("FAIL: some legitimate logins did not succeed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import json
+import os
+import re
+import threading
+from bisect import bisect_left, bisect_right
+
+DOCTOR_FIELDS = ["id", "name", "specialty", "experience", "fees"]
+SORT_KEYS = {
+    "experience": lambda doctor: (-doctor["experience"], doctor["id"]),
+    "fees": lambda doctor: (doctor["fees"], doctor["id"]),
+    "name": lambda doctor: (doctor["name"].lower(), doctor["id"]),
+}
+
+
+def slugify(name):
+    """'Max Super Speciality Hospital' -> 'max-super-speciality-hospital'"""
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def specialty_key(specialty):
+    return specialty.strip().lower()
+
+
+class DirectoryIndex:
+    """Immutable lookup tables over one snapshot of the doctors.
+
+    Rebuilt as a whole on reload and swapped in with a single assignment,
+    so readers never see a half-built index.
+    """
+
+    def __init__(self, hospitals, fee_bands):
+        self.fee_bands = sorted(fee_bands)
+        self.doctors = {}
+        self.hospitals = {}
+        self.by_hospital = {}
+        self.by_specialty = {}
+        self.by_band = {}
+
+        for hospital, doctors in hospitals.items():
+            slug = slugify(hospital)
+            self.hospitals[slug] = hospital
+            self.by_hospital.setdefault(slug, [])
+            for data in doctors:
+                doctor = {field: data[field] for field in DOCTOR_FIELDS}
+                doctor["hospital"] = hospital
+                doctor["hospital_slug"] = slug
+                self.doctors[doctor["id"]] = doctor
+                self.by_hospital[slug].append(doctor)
+                self.by_specialty.setdefault(specialty_key(doctor["specialty"]), []).append(doctor)
+                self.by_band.setdefault(self.band(doctor["fees"]), []).append(doctor)
+
+        # Hospital and fee band listings are served most experienced first;
+        # specialty listings are kept by fee so a fee range is two bisects
+        for listing in (*self.by_hospital.values(), *self.by_band.values()):
+            listing.sort(key=SORT_KEYS["experience"])
+        self.specialty_fees = {}
+        for key, listing in self.by_specialty.items():
+            listing.sort(key=SORT_KEYS["fees"])
+            self.specialty_fees[key] = [doctor["fees"] for doctor in listing]
+        self.by_experience = sorted(self.doctors.values(), key=SORT_KEYS["experience"])
+
+    def band(self, fees):
+        """Index of the fee band holding fees: band i covers [fee_bands[i-1], fee_bands[i])"""
+        return bisect_right(self.fee_bands, fees)
+
+    def resolve_specialty(self, specialty):
+        key = specialty_key(specialty)
+        if key not in self.by_specialty and key.endswith("s"):
+            key = key[:-1]  # "cardiologists" -> "cardiologist"
+        return key
+
+
+class DoctorDirectory:
+    """Flask extension serving the doctor directory from in-memory indexes.
+
+    Doctors come from DOCTORS_FILE (a JSON object mapping hospital names
+    to doctor lists) or, with DOCTOR_DIRECTORY_SOURCE = "db", from the
+    Doctor table. Lookups by hospital slug, specialty and fee band never
+    scan the whole directory.
+    """
+
+    def __init__(self, app=None):
+        self.source = "file"
+        self.path = None
+        self.fee_bands = ()
+        self._index = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("DOCTOR_DIRECTORY_SOURCE", "file")
+        app.config.setdefault("DOCTORS_FILE", "doctors.json")
+        app.config.setdefault("DOCTOR_FEE_BANDS", [500, 750, 1000, 1500])
+        self.source = app.config["DOCTOR_DIRECTORY_SOURCE"]
+        self.path = os.path.join(app.root_path, app.config["DOCTORS_FILE"])
+        self.fee_bands = tuple(app.config["DOCTOR_FEE_BANDS"])
+        self._index = None
+        if self.source == "file":
+            # The table may not exist yet at startup, so "db" loads on first use
+            self.reload()
+        app.extensions["doctors"] = self
+
+    def load(self, hospitals):
+        """Replace the directory with {hospital name: [doctor dicts]}"""
+        self._index = DirectoryIndex(hospitals, self.fee_bands)
+
+    def read_file(self, path=None):
+        with open(path or self.path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def read_db(self):
+        from models import Doctor
+        hospitals = {}
+        for doctor in Doctor.query.order_by(Doctor.id):
+            hospitals.setdefault(doctor.hospital, []).append(doctor.to_dict())
+        return hospitals
+
+    def reload(self):
+        self.load(self.read_db() if self.source == "db" else self.read_file())
+
+    @property
+    def index(self):
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self.reload()
+        return self._index
+
+    def hospitals(self):
+        """[{"name", "slug", "doctors"}] for every hospital, by name"""
+        index = self.index
+        return [
+            {"name": name, "slug": slug, "doctors": len(index.by_hospital[slug])}
+            for slug, name in sorted(index.hospitals.items(), key=lambda item: item[1])
+        ]
+
+    def for_hospital(self, hospital):
+        """(hospital name, doctors most experienced first) for a name or slug, or (None, [])"""
+        index = self.index
+        slug = slugify(hospital)
+        if slug not in index.hospitals:
+            return None, []
+        return index.hospitals[slug], list(index.by_hospital[slug])
+
+    def query(self, specialty=None, hospital=None, min_fee=None, max_fee=None,
+              min_experience=None, sort="experience", limit=None):
+        """Return the doctors matching every given filter.
+
+        Starts from the narrowest index that applies (specialty, then
+        hospital, then fee bands) and only filters that candidate list.
+        """
+        index = self.index
+        if specialty:
+            key = index.resolve_specialty(specialty)
+            fees = index.specialty_fees.get(key, [])
+            start = 0 if min_fee is None else bisect_left(fees, min_fee)
+            end = len(fees) if max_fee is None else bisect_right(fees, max_fee)
+            candidates = index.by_specialty.get(key, [])[start:end]
+        elif hospital:
+            candidates = index.by_hospital.get(slugify(hospital), [])
+        elif min_fee is not None or max_fee is not None:
+            low = 0 if min_fee is None else index.band(min_fee)
+            high = len(index.fee_bands) if max_fee is None else index.band(max_fee)
+            candidates = [
+                doctor for band in range(low, high + 1) for doctor in index.by_band.get(band, [])
+            ]
+        else:
+            candidates = index.by_experience
+
+        hospital_slug = slugify(hospital) if hospital else None
+        results = [
+            doctor for doctor in candidates
+            if (hospital_slug is None or doctor["hospital_slug"] == hospital_slug)
+            and (min_fee is None or doctor["fees"] >= min_fee)
+            and (max_fee is None or doctor["fees"] <= max_fee)
+            and (min_experience is None or doctor["experience"] >= min_experience)
+        ]
+        results.sort(key=SORT_KEYS[sort])
+        return results if limit is None else results[:limit]
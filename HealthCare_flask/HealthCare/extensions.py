@@ -2,6 +2,17 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_login import LoginManager
 
+from appointment_store import AppointmentStorage
+from doctor_directory import DoctorDirectory
+from identity import IdentityCache
+from password_hashing import PasswordHasher
+from throttling import LoginThrottle
+
 db = SQLAlchemy()
 jwt = JWTManager()
-login_manager = LoginManager()
\ No newline at end of file
+login_manager = LoginManager()
+identity = IdentityCache()
+appointments = AppointmentStorage()
+doctors = DoctorDirectory()
+passwords = PasswordHasher()
+login_throttle = LoginThrottle()
@@ -0,0 +1,123 @@
+import threading
+import time
+
+from flask import session
+from flask_login import UserMixin
+
+# Kept in the session; anything else is read from the database when asked for
+IDENTITY_FIELDS = ("id", "full_name", "email")
+
+
+class CachedUser(UserMixin):
+    """The logged-in user as remembered in the session.
+
+    Carries the fields most pages need. Reading any other column, such as
+    dob on the settings page, loads the row once for the request. To change
+    the user, update the row itself and call identity.changed().
+    """
+
+    def __init__(self, data, model):
+        self.__dict__.update(data)
+        self._model = model
+        self._row = None
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name not in self._model.__table__.columns:
+            raise AttributeError(name)
+        if self._row is None:
+            self._row = self._model.query.session.get(self._model, self.id)
+        return getattr(self._row, name)
+
+
+class IdentityCache:
+    """Flask extension serving Flask-Login's user loader from the session.
+
+    At login the user's id, name and email are written into the session
+    with a version number, so @login_required requests need no user-table
+    read. The version is bumped by changed() when the user is edited, and
+    any session holding another version reloads the row and is refreshed.
+    Versions live in each process, so IDENTITY_CACHE_MAX_AGE seconds also
+    bounds how long another server process may serve a stale copy.
+
+    Access tokens carry the same identity through claims(), stamped with
+    when it was read. token_current() refuses a token read before the
+    user's last change, so an API call can authorize from the token alone.
+    Changes are also remembered per process, so in another process a
+    token stays trusted until it expires (JWT_ACCESS_TOKEN_EXPIRES).
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.max_age = 0
+        self._versions = {}
+        self._changed_at = {}
+        self._counts = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("IDENTITY_CACHE_ENABLED", True)
+        app.config.setdefault("IDENTITY_CACHE_MAX_AGE", 300)
+        self.enabled = app.config["IDENTITY_CACHE_ENABLED"]
+        self.max_age = app.config["IDENTITY_CACHE_MAX_AGE"]
+        self._versions = {}
+        self._changed_at = {}
+        self._counts = dict.fromkeys(self._counts, 0)
+        app.extensions["identity"] = self
+
+    def version(self, user_id):
+        with self._lock:
+            return self._versions.get(user_id, 0)
+
+    def _count(self, outcome):
+        with self._lock:
+            self._counts[outcome] += 1
+
+    def remember(self, user):
+        """Write user into the session; call after login_user(user)"""
+        if self.enabled:
+            cached = {field: getattr(user, field) for field in IDENTITY_FIELDS}
+            cached.update(version=self.version(user.id), at=time.time())
+            session["identity"] = cached
+
+    def forget(self):
+        session.pop("identity", None)
+
+    def changed(self, user):
+        """Invalidate every session's copy of user, then refresh this one"""
+        with self._lock:
+            self._versions[user.id] = self._versions.get(user.id, 0) + 1
+            self._changed_at[user.id] = time.time()
+        if session.get("identity", {}).get("id") == user.id:
+            self.remember(user)
+
+    def claims(self, user):
+        """Extra access token claims: the user's email and when it was read"""
+        return {"email": user.email, "identity_at": time.time()}
+
+    def token_current(self, user_id, claims):
+        """False if this process saw the user change after the token's claims were read"""
+        with self._lock:
+            changed_at = self._changed_at.get(int(user_id))
+        return changed_at is None or changed_at < claims.get("identity_at", 0)
+
+    def load(self, user_id, model):
+        """Flask-Login user loader: the session copy if current, else the model's row"""
+        user_id = int(user_id)
+        cached = session.get("identity") if self.enabled else None
+        if (cached and cached["id"] == user_id and cached["version"] == self.version(user_id)
+                and time.time() - cached["at"] < self.max_age):
+            self._count("hits")
+            return CachedUser({field: cached[field] for field in IDENTITY_FIELDS}, model)
+        self._count("misses")
+        user = model.query.session.get(model, user_id)
+        if user is None:
+            self.forget()
+        else:
+            self.remember(user)
+        return user
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counts)
@@ -8,4 +8,46 @@ class User(db.Model, UserMixin):
     password = db.Column(db.String(200), nullable=False)
     dob = db.Column(db.String(10), nullable=False)
     gender = db.Column(db.String(10), nullable=False)
-    
\ No newline at end of file
+
+class Appointment(db.Model):
+    __table_args__ = (
+        db.Index("ix_appointment_email_date", "email", "date"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(100), nullable=False)
+    phone = db.Column(db.String(20), nullable=False)
+    date = db.Column(db.String(10), nullable=False)
+    time = db.Column(db.String(5), nullable=False)
+    reason = db.Column(db.Text, nullable=False)
+    payment_method = db.Column(db.String(20), nullable=False)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "email": self.email,
+            "phone": self.phone,
+            "date": self.date,
+            "time": self.time,
+            "reason": self.reason,
+            "payment_method": self.payment_method
+        }
+
+class Doctor(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    hospital = db.Column(db.String(200), nullable=False, index=True)
+    name = db.Column(db.String(100), nullable=False)
+    specialty = db.Column(db.String(100), nullable=False, index=True)
+    experience = db.Column(db.Integer, nullable=False)
+    fees = db.Column(db.Integer, nullable=False)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "specialty": self.specialty,
+            "experience": self.experience,
+            "fees": self.fees
+        }
@@ -0,0 +1,120 @@
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+# werkzeug's scrypt parameters when the method string leaves them out
+SCRYPT_DEFAULTS = ["32768", "8", "1"]
+
+
+class HashingBusy(Exception):
+    """Too many password hashes are already waiting for the pool"""
+
+
+def normalize_method(method):
+    """Spell a hash method out the way werkzeug writes it into the stored hash.
+
+    'pbkdf2:sha256' -> 'pbkdf2:sha256:1000000', 'scrypt' -> 'scrypt:32768:8:1'
+    """
+    name, *args = method.split(":")
+    if name == "pbkdf2":
+        digest = args[0] if args else "sha256"
+        iterations = args[1] if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{digest}:{iterations}"
+    if name == "scrypt":
+        return ":".join(["scrypt", *args, *SCRYPT_DEFAULTS[len(args):]])
+    return method
+
+
+def needs_rehash(stored, method):
+    return stored.split("$", 1)[0] != normalize_method(method)
+
+
+def hash_password(password, method):
+    return generate_password_hash(password, method=method)
+
+
+def verify_password(stored, password, method):
+    """(matches, new hash or None): rehashes with method when stored used other parameters"""
+    if not check_password_hash(stored, password):
+        return False, None
+    if needs_rehash(stored, method):
+        return True, generate_password_hash(password, method=method)
+    return True, None
+
+
+class PasswordHasher:
+    """Flask extension running password hashes in a bounded process pool.
+
+    PBKDF2 and scrypt are deliberately slow, so hashing on the request
+    thread lets a burst of logins occupy every worker. Here at most
+    PASSWORD_HASH_WORKERS hashes run at once, in separate processes, and
+    at most PASSWORD_HASH_MAX_PENDING wait for them; further callers wait
+    up to PASSWORD_HASH_TIMEOUT seconds for a place and then get
+    HashingBusy rather than piling up. PASSWORD_HASH_METHOD is the cost
+    profile, any werkzeug method string; hashes made with other parameters
+    are upgraded on the next successful login. PASSWORD_HASH_WORKERS = 0
+    hashes inline.
+    """
+
+    def __init__(self, app=None):
+        self.method = "pbkdf2:sha256"
+        self.workers = 0
+        self.max_pending = 0
+        self.timeout = None
+        self._pool = None
+        self._pool_pid = None
+        self._slots = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("PASSWORD_HASH_METHOD", "pbkdf2:sha256")
+        app.config.setdefault("PASSWORD_HASH_WORKERS", os.cpu_count() or 1)
+        app.config.setdefault("PASSWORD_HASH_MAX_PENDING", 64)
+        app.config.setdefault("PASSWORD_HASH_TIMEOUT", 5)
+        self.method = app.config["PASSWORD_HASH_METHOD"]
+        self.workers = app.config["PASSWORD_HASH_WORKERS"]
+        self.max_pending = app.config["PASSWORD_HASH_MAX_PENDING"]
+        self.timeout = app.config["PASSWORD_HASH_TIMEOUT"]
+        self.shutdown()
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_pending)
+        app.extensions["passwords"] = self
+
+    @property
+    def pool(self):
+        # Created on first use, and again in any forked server worker, which
+        # cannot reuse its parent's pool
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                    self._pool_pid = os.getpid()
+        return self._pool
+
+    def shutdown(self):
+        if self._pool is not None and self._pool_pid == os.getpid():
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+
+    def _run(self, func, *args):
+        if not self.workers:
+            return func(*args)
+        if not self._slots.acquire(timeout=self.timeout):
+            raise HashingBusy()
+        try:
+            return self.pool.submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(hash_password, password, self.method)
+
+    def verify(self, stored, password):
+        """(matches, new hash or None); store the new hash when one is returned"""
+        return self._run(verify_password, stored, password, self.method)
+
+    def needs_rehash(self, stored):
+        return needs_rehash(stored, self.method)
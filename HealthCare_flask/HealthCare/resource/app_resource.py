@@ -1,11 +1,14 @@
 from flask_restful import Resource
-from flask import request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import request, jsonify, current_app
 from flask_jwt_extended import create_access_token
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from jwt import algorithms as jwt_algorithms
 
 from models import User
-from extensions import db
+from extensions import db, identity, passwords, login_throttle
+from password_hashing import HashingBusy
+from streaming import stream_rows
+import math
 import re
 
 class RegisterAPI(Resource):
@@ -32,7 +35,10 @@ class RegisterAPI(Resource):
         if len(password) < 8 or not any(char.isdigit() for char in password) or not any(char.isalpha() for char in password):
             return {"message": "Weak password"}, 400
 
-        hashed_password = generate_password_hash(password, method="pbkdf2:sha256")
+        try:
+            hashed_password = passwords.hash(password)
+        except HashingBusy:
+            return {"message": "Too many sign-ups in progress, try again shortly."}, 503, {"Retry-After": "1"}
         new_user = User(full_name=full_name, email=email, password=hashed_password, dob=dob, gender=gender)
 
         try:
@@ -59,16 +65,35 @@ class LoginAPI(Resource):
             
             if not email or not password:
                 return {"message": "Email and password are required"}, 400
+
+            # Turn away floods before they cost a password hash
+            wait = login_throttle.check(request, email)
+            if wait:
+                return (
+                    {"message": "Too many login attempts, try again later."},
+                    429,
+                    {"Retry-After": str(math.ceil(wait))},
+                )
                 
             # Find user by email
             user = User.query.filter_by(email=email).first()
             
             # Check if user exists and password is correct
-            if not user or not check_password_hash(user.password, password):
+            valid, new_hash = passwords.verify(user.password, password) if user else (False, None)
+            if not valid:
                 return {"message": "Invalid email or password"}, 401
+            if new_hash:
+                # Stored with an older cost profile: keep the upgraded hash
+                user.password = new_hash
+                db.session.commit()
+            login_throttle.succeeded(request, email)
                 
             # Create access token with string identity
-            access_token = create_access_token(identity=str(user.id))
+            access_token = create_access_token(
+                identity=str(user.id),
+                additional_claims=identity.claims(user),
+                additional_headers={"kid": current_app.config["JWT_KEY_ID"]}
+            )
             
             return {
                 "message": "Login successful",
@@ -76,36 +101,40 @@ class LoginAPI(Resource):
                 "user_id": user.id
             }, 200
             
+        except HashingBusy:
+            return {"message": "Too many logins in progress, try again shortly."}, 503, {"Retry-After": "1"}
         except Exception as e:
             return {"message": f"Error: {str(e)}"}, 500
  
  
+class LoginThrottleAPI(Resource):
+    @jwt_required()
+    def get(self):
+        """Allowed and blocked login attempt counters"""
+        return login_throttle.stats(), 200
+
+
 class UserListAPI(Resource):
     @jwt_required()
     def get(self):
-        """Get all users from the database"""
-        try:
-            # Get current user from JWT identity (this will be a string now)
-            current_user_id = get_jwt_identity()
-            
-            # Query all users from the database
-            users = User.query.all()
-            
-            # Convert users to dictionary format for JSON response
-            user_list = []
-            for user in users:
-                user_data = {
-                    "id": user.id,
-                    "full_name": user.full_name,
-                    "email": user.email,
-                    "dob": user.dob,
-                    "gender": user.gender
-                }
-                user_list.append(user_data)
-                
-            return user_list, 200
-        except Exception as e:
-            return {"message": f"Error: {str(e)}"}, 500
+        """Stream all users as a JSON array, or as NDJSON with format=ndjson"""
+        # Get current user from JWT identity (this will be a string now)
+        current_user_id = get_jwt_identity()
+
+        # Rows are fetched in batches and serialized as they arrive
+        batch_size = current_app.config.get("STREAM_BATCH_SIZE", 500)
+        users = User.query.order_by(User.id).yield_per(batch_size)
+        user_list = (
+            {
+                "id": user.id,
+                "full_name": user.full_name,
+                "email": user.email,
+                "dob": user.dob,
+                "gender": user.gender
+            }
+            for user in users
+        )
+        return stream_rows(user_list)
 
 # Optional: Class to get a specific user by ID
 class UserDetailAPI(Resource):
@@ -133,4 +162,19 @@ class UserDetailAPI(Resource):
                 
             return user_data, 200
         except Exception as e:
-            return {"message": f"Error: {str(e)}"}, 500
\ No newline at end of file
+            return {"message": f"Error: {str(e)}"}, 500
+
+
+class JWKSAPI(Resource):
+    def get(self):
+        """Publish the token verification key so clients can check JWTs locally"""
+        public_key = current_app.config.get("JWT_PUBLIC_KEY")
+        algorithm = current_app.config["JWT_ALGORITHM"]
+        if not public_key or algorithm.startswith("HS"):
+            # Shared-secret tokens have no public key to publish
+            return {"keys": []}, 200
+
+        signer = jwt_algorithms.get_default_algorithms()[algorithm]
+        jwk = signer.to_jwk(signer.prepare_key(public_key), as_dict=True)
+        jwk.update({"kid": current_app.config["JWT_KEY_ID"], "alg": algorithm, "use": "sig"})
+        return {"keys": [jwk]}, 200
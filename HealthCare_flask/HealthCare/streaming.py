@@ -0,0 +1,54 @@
+import json
+
+from flask import Response, request, stream_with_context
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def wants_ndjson():
+    """True when the client asked for newline-delimited JSON"""
+    if request.args.get("format") == "ndjson":
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def _chunks(parts, flush_every):
+    buffer = []
+    for part in parts:
+        buffer.append(part)
+        if len(buffer) >= flush_every:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+
+def _ndjson_parts(rows):
+    for row in rows:
+        yield json.dumps(row) + "\n"
+
+
+def _json_array_parts(rows):
+    yield "["
+    first = True
+    for row in rows:
+        yield json.dumps(row) if first else "," + json.dumps(row)
+        first = False
+    yield "]"
+
+
+def stream_rows(rows, status=200, flush_every=100):
+    """Stream an iterable of dicts as NDJSON or as a chunked JSON array.
+
+    Rows are serialized as they are produced, so memory use depends on
+    flush_every rather than on how many rows the iterable yields.
+    """
+    if wants_ndjson():
+        parts, mimetype = _ndjson_parts(rows), NDJSON_MIMETYPE
+    else:
+        parts, mimetype = _json_array_parts(rows), "application/json"
+    return Response(
+        stream_with_context(_chunks(parts, flush_every)),
+        status=status,
+        mimetype=mimetype,
+    )
@@ -0,0 +1,63 @@
+import os
+import unittest
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app import app, db, identity  # noqa: E402
+from models import User  # noqa: E402
+
+APPOINTMENT = {"name": "A", "phone": "9876543210", "date": "2030-01-01", "time": "10:00",
+               "reason": "Checkup", "payment_method": "cash"}
+
+
+class CancelWithTokenTests(unittest.TestCase):
+    """DELETE authorizes from the token's email claim unless the user changed since"""
+
+    def setUp(self):
+        app.config["LOGIN_THROTTLE_ENABLED"] = False
+        self.client = app.test_client()
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+        self.client.post("/api/register", json={"full_name": "A", "email": "old@example.com",
+                                                "password": "Passw0rd!x", "dob": "2000-01-01", "gender": "M"})
+        self.headers = self.login()
+
+    def login(self, email="old@example.com"):
+        token = self.client.post("/api/login", json={"email": email, "password": "Passw0rd!x"}).get_json()
+        return {"Authorization": f"Bearer {token['access_token']}"}
+
+    def book(self, email, time="10:00"):
+        response = self.client.post("/api/appointments", json=dict(APPOINTMENT, email=email, time=time),
+                                    headers=self.headers)
+        return response.get_json()["id"]
+
+    def change_email(self, email):
+        with app.test_request_context():
+            user = User.query.filter_by(email="old@example.com").one()
+            user.email = email
+            db.session.commit()
+            identity.changed(user)
+
+    def test_cancel_from_token(self):
+        appointment_id = self.book("old@example.com")
+        other_id = self.book("someone@example.com", time="11:00")
+        self.assertEqual(self.client.delete(f"/api/appointments/{other_id}", headers=self.headers).status_code, 404)
+        self.assertEqual(self.client.delete(f"/api/appointments/{appointment_id}", headers=self.headers).status_code, 200)
+
+    def test_token_from_before_email_change_is_refused(self):
+        appointment_id = self.book("old@example.com")
+        self.change_email("new@example.com")
+        response = self.client.delete(f"/api/appointments/{appointment_id}", headers=self.headers)
+        self.assertEqual(response.status_code, 401)
+        response = self.client.delete("/api/appointments/bulk", json={"ids": [appointment_id]}, headers=self.headers)
+        self.assertEqual(response.status_code, 401)
+
+        self.headers = self.login("new@example.com")
+        new_id = self.book("new@example.com", time="12:00")
+        self.assertEqual(self.client.delete(f"/api/appointments/{appointment_id}", headers=self.headers).status_code, 404)
+        self.assertEqual(self.client.delete(f"/api/appointments/{new_id}", headers=self.headers).status_code, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
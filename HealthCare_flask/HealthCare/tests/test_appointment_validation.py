@@ -0,0 +1,42 @@
+import os
+import unittest
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app import app, db  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+APPOINTMENT = {"name": "A", "email": "a@example.com", "phone": "9876543210", "date": "2030-01-01",
+               "time": "10:00", "reason": "Checkup", "payment_method": "cash"}
+
+
+class SingleBookingContractTests(unittest.TestCase):
+    """POST /api/appointments only requires every field to be present, as it always has"""
+
+    def setUp(self):
+        self.client = app.test_client()
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            self.headers = {"Authorization": f"Bearer {create_access_token(identity='1')}"}
+
+    def post(self, path, payload):
+        return self.client.post(path, json=payload, headers=self.headers)
+
+    def test_previously_accepted_payloads(self):
+        for changes in ({"date": "01/02/2030"}, {"time": "0930"}, {"reason": ""}, {"payment_method": ""}):
+            with self.subTest(changes=changes):
+                response = self.post("/api/appointments", dict(APPOINTMENT, **changes))
+                self.assertEqual(response.status_code, 201, response.get_json())
+
+    def test_missing_field(self):
+        payload = dict(APPOINTMENT)
+        del payload["reason"]
+        response = self.post("/api/appointments", payload)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()["message"], "Missing required fields")
+
+    def test_bulk_stays_strict(self):
+        response = self.post("/api/appointments/bulk", {"appointments": [dict(APPOINTMENT, date="01/02/2030")]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()["results"][0]["message"], "date must be in YYYY-MM-DD format")
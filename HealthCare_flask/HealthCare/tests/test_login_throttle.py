@@ -0,0 +1,50 @@
+import unittest
+
+from flask import Flask, request
+
+from throttling import LoginThrottle
+
+SECRET = "proxy-secret"
+
+
+def throttled_app(secret=SECRET):
+    app = Flask(__name__)
+    app.config.update(LOGIN_THROTTLE_PER_IP=(100, 60), LOGIN_THROTTLE_PER_EMAIL=(3, 900),
+                      LOGIN_THROTTLE_PROXY_SECRET=secret)
+    throttle = LoginThrottle(app)
+    return app, throttle
+
+
+def attempts(app, throttle, headers, count=5, remote_addr="127.0.0.1"):
+    """How many of count attempts on one email the throttle let through"""
+    allowed = 0
+    for _ in range(count):
+        with app.test_request_context("/api/login", method="POST", headers=headers,
+                                      environ_base={"REMOTE_ADDR": remote_addr}):
+            allowed += not throttle.check(request, "victim@example.com")
+    return allowed
+
+
+class ForwardedLoginTests(unittest.TestCase):
+    def test_spoofed_forwarded_for_from_loopback_is_throttled(self):
+        app, throttle = throttled_app()
+        self.assertEqual(attempts(app, throttle, {"X-Forwarded-For": "203.0.113.9"}), 3)
+
+    def test_wrong_secret_is_throttled(self):
+        app, throttle = throttled_app()
+        headers = {"X-Forwarded-For": "203.0.113.9", "X-Login-Proxy-Secret": "guess"}
+        self.assertEqual(attempts(app, throttle, headers), 3)
+
+    def test_front_end_with_secret_is_not_counted_twice(self):
+        app, throttle = throttled_app()
+        headers = {"X-Forwarded-For": "203.0.113.9", "X-Login-Proxy-Secret": SECRET}
+        self.assertEqual(attempts(app, throttle, headers), 5)
+        self.assertEqual(throttle.stats()["forwarded"], 5)
+
+    def test_no_secret_configured_counts_everything(self):
+        app, throttle = throttled_app(secret=None)
+        self.assertEqual(attempts(app, throttle, {"X-Login-Proxy-Secret": ""}), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import hmac
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBuckets:
+    """Token buckets by key, held in process memory.
+
+    A bucket holds up to capacity tokens and refills at capacity per
+    period seconds; each attempt takes one token. Only the most recently
+    used max_keys buckets are kept, so a flood of made-up emails cannot
+    grow memory without bound; an evicted bucket simply starts full again.
+    """
+
+    def __init__(self, capacity, period, max_keys=100_000):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, now=None):
+        """Take a token for key; return 0 if one was available, else seconds until one is"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def give_back(self, key):
+        with self._lock:
+            if key in self._buckets:
+                tokens, updated = self._buckets[key]
+                self._buckets[key] = (min(self.capacity, tokens + 1), updated)
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class LoginThrottle:
+    """Flask extension limiting login attempts per client address and per email.
+
+    Checked before any password hashing, so a credential-stuffing burst
+    is turned away for the cost of a dict lookup. LOGIN_THROTTLE_PER_IP
+    and LOGIN_THROTTLE_PER_EMAIL are (attempts, seconds). An email's token
+    is handed back when its login succeeds, so only failures count against
+    the account. Buckets live in each process, so with several server
+    processes each enforces its own limits.
+
+    These limits are for clients calling the API directly. The Django
+    front end charges its own buckets (accounts/throttling.py) and proves
+    it sent a login by the LOGIN_THROTTLE_PROXY_SECRET it shares with us
+    in the X-Login-Proxy-Secret header; charging those logins here too
+    would halve the limits Django users get, so they go through uncounted.
+    Without a configured secret every attempt is counted. The source
+    address and X-Forwarded-For prove nothing: any local process or
+    reverse proxy can send them.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.by_ip = None
+        self.by_email = None
+        self.proxy_secret = None
+        self._counts = {"allowed": 0, "forwarded": 0, "blocked_ip": 0, "blocked_email": 0}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("LOGIN_THROTTLE_ENABLED", True)
+        app.config.setdefault("LOGIN_THROTTLE_PER_IP", (30, 60))
+        app.config.setdefault("LOGIN_THROTTLE_PER_EMAIL", (10, 900))
+        app.config.setdefault("LOGIN_THROTTLE_PROXY_SECRET", None)
+        app.config.setdefault("LOGIN_THROTTLE_MAX_KEYS", 100_000)
+        max_keys = app.config["LOGIN_THROTTLE_MAX_KEYS"]
+        self.enabled = app.config["LOGIN_THROTTLE_ENABLED"]
+        self.by_ip = TokenBuckets(*app.config["LOGIN_THROTTLE_PER_IP"], max_keys=max_keys)
+        self.by_email = TokenBuckets(*app.config["LOGIN_THROTTLE_PER_EMAIL"], max_keys=max_keys)
+        self.proxy_secret = app.config["LOGIN_THROTTLE_PROXY_SECRET"]
+        self._counts = dict.fromkeys(self._counts, 0)
+        app.extensions["login_throttle"] = self
+
+    def forwarded(self, request):
+        """Whether the Django front end, which throttles logins itself, sent the request on"""
+        if not self.proxy_secret:
+            return False
+        return hmac.compare_digest(request.headers.get("X-Login-Proxy-Secret", "").encode(),
+                                   self.proxy_secret.encode())
+
+    def _count(self, outcome):
+        with self._lock:
+            self._counts[outcome] += 1
+
+    def check(self, request, email):
+        """Return 0 to let a login attempt through, else the seconds to wait before retrying"""
+        if not self.enabled:
+            return 0
+        if self.forwarded(request):
+            self._count("forwarded")
+            return 0
+        wait = self.by_ip.take(request.remote_addr)
+        if wait:
+            self._count("blocked_ip")
+            return wait
+        if email:
+            wait = self.by_email.take(email.strip().lower())
+            if wait:
+                self._count("blocked_email")
+                return wait
+        self._count("allowed")
+        return 0
+
+    def succeeded(self, request, email):
+        if self.enabled and email and not self.forwarded(request):
+            self.by_email.give_back(email.strip().lower())
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+        counts["tracked_ips"] = len(self.by_ip) if self.by_ip else 0
+        counts["tracked_emails"] = len(self.by_email) if self.by_email else 0
+        return counts